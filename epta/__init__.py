@@ -1,3 +1,4 @@
 from . import core
 from . import tools
 from . import utils
+from . import runtime
@@ -0,0 +1,5 @@
+import sys
+
+from epta.main import main
+
+sys.exit(main())
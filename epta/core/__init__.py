@@ -1,7 +1,12 @@
-from .meta import ConfigDependent, UpdateDependent
+from .meta import ConfigDependent, UpdateDependent, Retaining
 from .settings import Settings
 from .config import Config
+from .record import Record, make_record, json_default
 from .tool import Tool
-from .tool_dict import ToolDict
+from .tool_dict import ToolDict, Snapshot
 from .position_dependent import PositionDependent
 from . import base_ops
+from . import deadline
+from . import metrics
+from . import memory
+from . import concurrency
@@ -1,17 +1,90 @@
 from typing import Any, List, Union, Tuple, Iterable, Mapping
-import math
+import operator
 import inspect
+import time
+import numpy as np
 
 from epta.core import Tool
+from .meta import Retaining
+from .concurrency import run_concurrently
+from .record import Record, make_record
+from . import metrics
 
 
-class Lambda(Tool):
+class Break:
+    """
+    Sentinel to stop :class:`~epta.core.base_ops.Sequential` early.
+    If a stage returns ``Break(value)``, the remaining stages are skipped and ``value`` is returned.
+    Only the innermost sequential is stopped: sequential ``ToolDict``-s stop the same way, and in fan-outs
+    (:class:`~epta.core.base_ops.Concatenate`, 'dict' and 'concatenate' ``ToolDict``-s) a break ends its branch
+    only, ``value`` becomes the branch result. Other tools return it as is, so use it inside these containers.
+
+    Args:
+        value (Any): value to return from the stopped sequential.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any = None):
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.value!r})"
+
+
+def _branch_results(results: list) -> list:
+    # a Break ends only its own branch of a fan-out
+    return [result.value if isinstance(result, Break) else result for result in results]
+
+
+class Thunk:
+    """
+    Deferred tool call. Evaluated on the first call, the result is reused afterwards.
+
+    Args:
+        tool (Tool): tool to call.
+        args (tuple): args to call with.
+        kwargs (dict): kwargs to call with.
+    """
+    __slots__ = ('_tool', '_args', '_kwargs', '_evaluated', '_value')
+
+    def __init__(self, tool: 'Tool', args: tuple, kwargs: dict):
+        self._tool = tool
+        self._args = args
+        self._kwargs = kwargs
+        self._evaluated = False
+        self._value = None
+
+    @property
+    def evaluated(self) -> bool:
+        return self._evaluated
+
+    def __call__(self) -> Any:
+        if not self._evaluated:
+            self._value = self._tool(*self._args, **self._kwargs)
+            self._evaluated = True
+            self._args = self._kwargs = None
+        return self._value
+
+
+class _Op(Tool):
+    """
+    Common base of the slotted operations. Their attribute slots are declared here once and subclasses add
+    none, so operations can still be mixed in a single class (e.g. ``class X(Variable, Atomic)``):
+    bases with different non-empty slot layouts can not be combined.
+    Operations keeping more state (:class:`~epta.core.base_ops.Gate`, :class:`~epta.core.base_ops.Parallel`,
+    data tools, ...) have a ``__dict__`` for the same reason.
+    """
+    __slots__ = ('tool', 'key', 'tools', '_fnc', '_allow_kwargs', 'threaded')
+
+
+class Lambda(_Op):
     """
     Lambda tool.
 
     Args:
         fnc (callable, ): object to be called with passed ``*args`` and ``**kwargs``.
     """
+    __slots__ = ()
 
     def __init__(self, fnc: callable, name: str = 'Lambda', **kwargs):
         super(Lambda, self).__init__(name=name, **kwargs)
@@ -27,6 +100,7 @@ class Identity(Tool):
     """
     A tool that returns its first argument, unchanged. A no-op.
     """
+    __slots__ = ()
 
     def __init__(self, name: str = 'Identity', **kwargs):
         super(Identity, self).__init__(name=name, **kwargs)
@@ -35,11 +109,12 @@ class Identity(Tool):
         return args[0] if args else None
 
 
-class Wrapper(Tool):
+class Wrapper(_Op):
     """
     Wrapper to pass tools as ``args`` or ``kwargs`` in :class:`~epta.core.base_ops.Compose`.
     ``.update`` method will not be invoked on the wrapped tool.
     """
+    __slots__ = ()
 
     def __init__(self, tool: Any, name: str = 'Wrapper', **kwargs):
         super(Wrapper, self).__init__(name=name, **kwargs)
@@ -49,13 +124,14 @@ class Wrapper(Tool):
         return self.tool
 
 
-class Variable(Tool):
+class Variable(_Op):
     """
     Track tool as Variable.
 
     Args:
         tool (Tool): tool to store.
     """
+    __slots__ = ()
 
     def __init__(self, tool: 'Tool', name: str = 'Variable', **kwargs):
         super(Variable, self).__init__(name=name, **kwargs)
@@ -69,13 +145,14 @@ class Variable(Tool):
             self.tool.update(*args, **kwargs)
 
 
-class Atomic(Tool):
+class Atomic(_Op):
     """
     Get value from the inputs by :attr:`key`.
 
     Args:
         key (slice, int, str, tuple): key to get.
     """
+    __slots__ = ()
 
     def __init__(self, key: Union[slice, int, str, Tuple], name: str = 'Atomic', **kwargs):
         super(Atomic, self).__init__(name=name, **kwargs)
@@ -114,13 +191,14 @@ class SoftAtomic(Atomic):
         return inp
 
 
-class Sequential(Tool):
+class Sequential(_Op):
     """
     Sequential module application. Handles ``update`` method.
 
     Keyword Args:
         tools (list): List of tools to use sequentially.
     """
+    __slots__ = ()
 
     def __init__(self, tools: List['Tool'] = None, name: str = 'Sequential', **kwargs):
         super(Sequential, self).__init__(name=name, **kwargs)
@@ -136,8 +214,12 @@ class Sequential(Tool):
 
         tool = self.tools[0]
         inp = tool(*args, **kwargs.get(tool.name, kwargs))
+        if isinstance(inp, Break):
+            return inp.value
         for tool in self.tools[1:]:
             inp = tool(inp, **kwargs.get(tool.name, kwargs))
+            if isinstance(inp, Break):
+                return inp.value
         return inp
 
     def update(self, *args, **kwargs):
@@ -153,28 +235,168 @@ class Sequential(Tool):
         return f"{self.__class__.__name__}(name='{self.name}', tools=[{tool_reprs}])"
 
 
-class Product(Sequential):
+class Reduce(Sequential):
+    """
+    Streaming reduction of :attr:`tools` results on the same input. Results are accumulated one by one,
+    so they are not kept alive together. Arrays are accumulated in place: only one new array is allocated.
+    Without tools, the input iterable is reduced instead (e.g. output of ``Parallel(tool, lazy=True)``).
+    A non-iterable input has nothing to reduce, e.g. ``Sum()(5) == 0``.
+    Override ``_ufunc`` and ``_scalar`` for new reductions.
+
+    Keyword Args:
+        tools (list): tools to reduce results of.
+    """
+    __slots__ = ()
+    _ufunc = None
+    _scalar = None
+    _empty = None
+
+    def __init__(self, tools: List['Tool'] = None, name: str = 'Reduce', **kwargs):
+        super(Reduce, self).__init__(name=name, tools=tools, **kwargs)
+
+    def _results(self, *args, **kwargs) -> Iterable:
+        if self.tools:
+            return (tool(*args, **kwargs) for tool in self.tools)
+        if args and isinstance(args[0], Iterable):
+            return args[0]
+        return tuple()
+
+    def _out_dtype(self, accumulator: 'np.ndarray', value: Any) -> 'np.dtype':
+        return np.result_type(accumulator, value)
+
+    def _step(self, accumulator: Any, value: Any, owned: bool) -> Tuple[Any, bool]:
+        if isinstance(accumulator, np.ndarray):
+            if owned and self._out_dtype(accumulator, value) == accumulator.dtype and \
+                    (not isinstance(value, np.ndarray) or value.shape == accumulator.shape
+                     or np.broadcast_shapes(accumulator.shape, value.shape) == accumulator.shape):
+                return self._ufunc(accumulator, value, out=accumulator), True
+            return self._ufunc(accumulator, value), True
+        if isinstance(value, np.ndarray):
+            return self._ufunc(accumulator, value), True
+        return self._scalar(accumulator, value), False
+
+    def _finish(self, accumulator: Any, count: int) -> Any:
+        return accumulator
+
+    def use(self, *args, **kwargs) -> Any:
+        results = iter(self._results(*args, **kwargs))
+        for accumulator in results:
+            break
+        else:
+            return self._empty
+        # the first result is not owned: it is never modified in place.
+        owned = False
+        count = 1
+        for value in results:
+            accumulator, owned = self._step(accumulator, value, owned)
+            count += 1
+        return self._finish(accumulator, count)
+
+
+class Product(Reduce):
+    __slots__ = ()
+    _ufunc = np.multiply
+    _scalar = operator.mul
+    _empty = 1
+
     def __init__(self, tools: List['Tool'] = None, name: str = 'Product', **kwargs):
         super(Product, self).__init__(name=name, tools=tools, **kwargs)
 
-    def use(self, *args, **kwargs):
-        result = list()
-        for tool in self.tools:
-            local_res = tool(*args, **kwargs)
-            result.append(local_res)
-        return math.prod(result)
 
+class Sum(Reduce):
+    __slots__ = ()
+    _ufunc = np.add
+    _scalar = operator.add
+    _empty = 0
 
-class Sum(Sequential):
     def __init__(self, tools: List['Tool'] = None, name: str = 'Sum', **kwargs):
         super(Sum, self).__init__(name=name, tools=tools, **kwargs)
 
-    def use(self, *args, **kwargs):
-        result = list()
-        for tool in self.tools:
-            local_res = tool(*args, **kwargs)
-            result.append(local_res)
-        return sum(result)
+
+class Max(Reduce):
+    """
+    Elementwise maximum for arrays, ``max`` for other values. ``None`` if there is nothing to reduce.
+    """
+    __slots__ = ()
+    _ufunc = np.maximum
+    _scalar = max
+
+    def __init__(self, tools: List['Tool'] = None, name: str = 'Max', **kwargs):
+        super(Max, self).__init__(name=name, tools=tools, **kwargs)
+
+
+class Min(Reduce):
+    """
+    Elementwise minimum for arrays, ``min`` for other values. ``None`` if there is nothing to reduce.
+    """
+    __slots__ = ()
+    _ufunc = np.minimum
+    _scalar = min
+
+    def __init__(self, tools: List['Tool'] = None, name: str = 'Min', **kwargs):
+        super(Min, self).__init__(name=name, tools=tools, **kwargs)
+
+
+class Mean(Sum):
+    """
+    Mean of the results. ``None`` if there is nothing to reduce.
+    """
+    __slots__ = ()
+    _empty = None
+
+    def __init__(self, tools: List['Tool'] = None, name: str = 'Mean', **kwargs):
+        super(Mean, self).__init__(name=name, tools=tools, **kwargs)
+
+    def _step(self, accumulator: Any, value: Any, owned: bool) -> Tuple[Any, bool]:
+        if not owned and isinstance(accumulator, np.ndarray) and accumulator.dtype.kind != 'f':
+            # accumulate integers (uint8 masks, images) in floats, without overflow.
+            return np.add(accumulator, value, dtype=np.float64), True
+        return super(Mean, self)._step(accumulator, value, owned)
+
+    def _finish(self, accumulator: Any, count: int) -> Any:
+        if isinstance(accumulator, np.ndarray) and accumulator.dtype.kind == 'f':
+            return np.divide(accumulator, count, out=accumulator if count > 1 else None)
+        return accumulator / count
+
+
+class LogicalOr(Reduce):
+    """
+    Elementwise ``or`` for masks, ``bool(a or b)`` for other values. ``False`` if there is nothing to reduce.
+    """
+    __slots__ = ()
+    _ufunc = np.logical_or
+    _empty = False
+
+    def __init__(self, tools: List['Tool'] = None, name: str = 'LogicalOr', **kwargs):
+        super(LogicalOr, self).__init__(name=name, tools=tools, **kwargs)
+
+    @staticmethod
+    def _scalar(a: Any, b: Any) -> bool:
+        return bool(a) or bool(b)
+
+    def _out_dtype(self, accumulator: 'np.ndarray', value: Any) -> 'np.dtype':
+        return np.dtype(bool)
+
+    def _finish(self, accumulator: Any, count: int) -> Any:
+        if isinstance(accumulator, np.ndarray):
+            return accumulator.astype(bool, copy=False)
+        return bool(accumulator)
+
+
+class LogicalAnd(LogicalOr):
+    """
+    Elementwise ``and`` for masks, ``bool(a and b)`` for other values. ``True`` if there is nothing to reduce.
+    """
+    __slots__ = ()
+    _ufunc = np.logical_and
+    _empty = True
+
+    def __init__(self, tools: List['Tool'] = None, name: str = 'LogicalAnd', **kwargs):
+        super(LogicalAnd, self).__init__(name=name, tools=tools, **kwargs)
+
+    @staticmethod
+    def _scalar(a: Any, b: Any) -> bool:
+        return bool(a) and bool(b)
 
 
 class Compose(Tool):
@@ -249,20 +471,149 @@ class Compose(Tool):
                 f"func_kwargs={self.func_kwargs})")
 
 
+class LazyCompose(Compose):
+    """
+    Same as :class:`~epta.core.base_ops.Compose` but tools in ``func_args`` and ``func_kwargs`` are passed
+    to the :attr:`fnc` as :class:`~epta.core.base_ops.Thunk`. Call the thunk to get the tool result,
+    tools that are not called are not evaluated.
+
+    Example:
+        ``LazyCompose(lambda cheap, expensive: expensive() if cheap() else None, (cheap_tool, expensive_tool))``
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, name='LazyCompose', **kwargs):
+        super(LazyCompose, self).__init__(*args, name=name, **kwargs)
+
+    def _use_args(self, *args, **kwargs) -> tuple:
+        func_args = tuple(Thunk(arg, args, kwargs) if isinstance(arg, Tool) else arg for arg in
+                          self.func_args)
+        return func_args
+
+    def _use_kwargs(self, *args, **kwargs) -> dict:
+        func_kwargs = {}
+        for key, value in self.func_kwargs.items():
+            if isinstance(value, Tool):
+                value = Thunk(value, args, kwargs)
+            func_kwargs[key] = value
+
+        return func_kwargs
+
+
+class Gate(Tool):
+    """
+    Use :attr:`tool` only if :attr:`predicate` is true for the inputs. The tool is not called otherwise.
+
+    Args:
+        predicate (Tool, callable): called with the inputs, result is tested for truth.
+        tool (Tool): tool to use if predicate is true.
+
+    Keyword Args:
+        default (Any): value to return if predicate is false.
+        stop (bool): if True, return ``Break(default)`` to stop the enclosing
+            :class:`~epta.core.base_ops.Sequential` if predicate is false.
+    """
+
+    def __init__(self, predicate: Union['Tool', callable], tool: 'Tool', default: Any = None, stop: bool = False,
+                 name: str = 'Gate', **kwargs):
+        super(Gate, self).__init__(name=name, **kwargs)
+        if not isinstance(predicate, Tool):
+            predicate = Lambda(predicate)
+        self.predicate = predicate
+        self.tool = tool
+        self.default = default
+        self.stop = stop
+
+    def use(self, *args, **kwargs) -> Any:
+        if self.predicate(*args, **kwargs):
+            return self.tool(*args, **kwargs)
+        if self.stop:
+            return Break(self.default)
+        return self.default
+
+    def update(self, *args, **kwargs):
+        self.predicate.update(*args, **kwargs)
+        if isinstance(self.tool, Tool):
+            self.tool.update(*args, **kwargs)
+
+
+class Switch(Tool):
+    """
+    Use a single tool from :attr:`cases` selected by the :attr:`key` result. Other cases are not called.
+
+    Args:
+        key (Tool, callable): called with the inputs, result is looked up in :attr:`cases`.
+        cases (dict): mapping of key results to tools. Non-tool callables are wrapped
+            with :class:`~epta.core.base_ops.Lambda`, other values are returned as is.
+
+    Keyword Args:
+        default (Tool, Any): tool or value to use if key result is not in :attr:`cases`.
+    """
+
+    def __init__(self, key: Union['Tool', callable], cases: dict, default: Any = None, name: str = 'Switch',
+                 **kwargs):
+        super(Switch, self).__init__(name=name, **kwargs)
+        if not isinstance(key, Tool):
+            key = Lambda(key)
+        self.key = key
+        self.cases = {case: self._as_tool(tool) for case, tool in cases.items()}
+        self.default = self._as_tool(default)
+
+    @staticmethod
+    def _as_tool(tool: Any) -> Any:
+        if callable(tool) and not isinstance(tool, Tool):
+            return Lambda(tool)
+        return tool
+
+    def use(self, *args, **kwargs) -> Any:
+        tool = self.cases.get(self.key(*args, **kwargs), self.default)
+        if isinstance(tool, Tool):
+            return tool(*args, **kwargs)
+        return tool
+
+    def update(self, *args, **kwargs):
+        self.key.update(*args, **kwargs)
+        for tool in (*self.cases.values(), self.default):
+            if isinstance(tool, Tool):
+                tool.update(*args, **kwargs)
+
+
 class Parallel(Variable):
     """
     Apply singe tool for the given inputs.
 
     Args:
         tool (Tool): Tool to use.
+
+    Keyword Args:
+        lazy (bool): return a generator instead of a list, to reduce results without keeping them all.
+        batch_size (int): if set, inputs are split into batches of this size used concurrently
+            on the shared thread pool. Results keep the input order.
     Returns:
         result (list): [:attr:`tool`(inputs), ...]
     """
 
-    def __init__(self, tool: 'Tool', name: str = 'Parallel', **kwargs):
+    def __init__(self, tool: 'Tool', lazy: bool = False, batch_size: int = None, name: str = 'Parallel', **kwargs):
         super(Parallel, self).__init__(tool=tool, name=name, **kwargs)
+        self.lazy = lazy
+        self.batch_size = batch_size
+
+    def stream(self, data: Iterable, **kwargs) -> Iterable:
+        for d in data:
+            yield self.tool(d, **kwargs)
+
+    def _use_batch(self, batch: list, kwargs: dict) -> list:
+        return [self.tool(d, **kwargs) for d in batch]
 
     def use(self, data: Iterable, **kwargs):
+        if self.batch_size:
+            data = list(data)
+            batches = run_concurrently([(self._use_batch, (data[i:i + self.batch_size], kwargs), dict())
+                                        for i in range(0, len(data), self.batch_size)])
+            result = [r for batch in batches for r in batch]
+            return iter(result) if self.lazy else result
+        if self.lazy:
+            return self.stream(data, **kwargs)
         result = list()
         for d in data:
             result.append(self.tool(d, **kwargs))
@@ -275,47 +626,87 @@ class Concatenate(Sequential):
 
     Keyword Args:
         tools (list): Tools to use.
+        threaded (bool): use the tools concurrently on the shared thread pool
+            (see :func:`~epta.core.concurrency.run_concurrently`). Pays off for tools releasing the GIL.
 
     Returns:
         result (list): Multiple tools result.
     """
+    __slots__ = ()
 
-    def __init__(self, tools: List['Tool'] = None, name: str = 'Concatenate', **kwargs):
+    def __init__(self, tools: List['Tool'] = None, threaded: bool = False, name: str = 'Concatenate', **kwargs):
         super(Concatenate, self).__init__(name=name, tools=tools, **kwargs)
+        self.threaded = threaded
 
     def use(self, *args, **kwargs):
+        if self.threaded:
+            return _branch_results(run_concurrently([(tool, args, kwargs) for tool in self.tools]))
         result = list()
         for tool in self.tools:
-            result.append(tool(*args, **kwargs))
+            value = tool(*args, **kwargs)
+            result.append(value.value if isinstance(value, Break) else value)
         return result
 
 
-class DataGather(Tool):
+class DataTool(Tool):
     """
-    Select :attr:`keys` from the input data. dict -> dict.
-    Results may be ``None`` if key is not present.
+    Base for tools working with a :attr:`keys` schema.
+    The schema is fixed on construction, a :class:`~epta.core.record.Record` type is made for it once.
 
     Keyword Args:
-        keys: keys to select on use.
+        keys: keys of the schema.
     """
 
-    def __init__(self, keys: Union[List[Union[tuple, str]], Union[tuple, str]] = None, name='DataGatherer', **kwargs):
-        super(DataGather, self).__init__(name=name, **kwargs)
+    def __init__(self, keys: Union[List[Union[tuple, str]], Union[tuple, str]] = None, name='DataTool', **kwargs):
+        super(DataTool, self).__init__(name=name, **kwargs)
         if keys is None:
             keys = list()
         if isinstance(keys, tuple) or isinstance(keys, str):
             keys = [keys]
         self.keys = keys
+        self._keys = tuple(keys)
+        self._record = make_record(self._keys)
+        self._getters = dict()  # input record type -> getter of the schema values
+
+    def _get_keys(self, **kwargs) -> tuple:
+        keys = kwargs.get("keys", self._keys)
+        if keys is not self._keys:
+            keys = tuple(keys)
+        return keys
+
+    def _select(self, data: Mapping, keys: tuple) -> tuple:
+        if isinstance(data, Record):
+            if keys is not self._keys:
+                return data.select(keys)
+            getter = self._getters.get(data.__class__)
+            if getter is None:
+                getter = self._getters[data.__class__] = data._getter(keys)
+            return getter(data._values)
+        return tuple(data.get(key) for key in keys)
+
+
+class DataGather(DataTool):
+    """
+    Select :attr:`keys` from the input data. dict -> :class:`~epta.core.record.Record`.
+    Results may be ``None`` if key is not present.
+
+    Keyword Args:
+        keys: keys to select on use.
+    """
 
-    def _gather_data(self, data: dict, **kwargs):
-        keys = kwargs.get("keys", self.keys)
-        return {key: data.get(key) for key in keys}
+    def __init__(self, keys: Union[List[Union[tuple, str]], Union[tuple, str]] = None, name='DataGatherer', **kwargs):
+        super(DataGather, self).__init__(keys=keys, name=name, **kwargs)
+
+    def _gather_data(self, data: Mapping, **kwargs) -> Record:
+        keys = self._get_keys(**kwargs) if kwargs else self._keys
+        record = self._record if keys is self._keys else make_record(keys)
+        return record._make(self._select(data, keys))
 
-    def use(self, data: dict, **kwargs) -> dict:
+    def use(self, data: Mapping, **kwargs) -> Record:
         return self._gather_data(data, **kwargs)
 
 
-class DataReduce(Tool):
+class DataReduce(DataTool):
     """
     Select :attr:`keys` from the input data. dict -> tuple.
     Results may be ``None`` if key is not present.
@@ -325,42 +716,38 @@ class DataReduce(Tool):
     """
 
     def __init__(self, keys: Union[List[Union[tuple, str]], Union[tuple, str]] = None, name='DataReduce', **kwargs):
-        super(DataReduce, self).__init__(name=name, **kwargs)
-        if keys is None:
-            keys = list()
-        if isinstance(keys, tuple) or isinstance(keys, str):
-            keys = [keys]
-        self.keys = keys
+        super(DataReduce, self).__init__(keys=keys, name=name, **kwargs)
 
-    def _reduce_data(self, data: dict, **kwargs):
-        keys = kwargs.get("keys", self.keys)
-        return tuple(data.get(key) for key in keys)
+    def _reduce_data(self, data: Mapping, **kwargs) -> tuple:
+        return self._select(data, self._get_keys(**kwargs) if kwargs else self._keys)
 
-    def use(self, data: dict, **kwargs) -> tuple:
+    def use(self, data: Mapping, **kwargs) -> tuple:
         return self._reduce_data(data, **kwargs)
 
 
-class DataSpread(Tool):
+class DataSpread(DataTool):
     """
-    Attach :attr:`keys` to the input data. tuple -> dict.
+    Attach :attr:`keys` to the input data. tuple -> :class:`~epta.core.record.Record`.
+    Extra values or keys are dropped as with ``dict(zip(keys, args))``.
 
     Keyword Args:
         keys: keys to attach on use.
     """
 
     def __init__(self, keys: Union[List[Union[tuple, str]], Union[tuple, str]] = None, name='DataSpreader', **kwargs):
-        super(DataSpread, self).__init__(name=name, **kwargs)
-        if keys is None:
-            keys = list()
-        if isinstance(keys, tuple) or isinstance(keys, str):
-            keys = [keys]
-        self.keys = keys
-
-    def _spread_data(self, args: tuple, **kwargs):
-        keys = kwargs.get("keys", self.keys)
-        return dict(zip(keys, args))
-
-    def use(self, *args, **kwargs) -> dict:
+        super(DataSpread, self).__init__(keys=keys, name=name, **kwargs)
+
+    def _spread_data(self, args: Iterable, **kwargs) -> Record:
+        keys = self._get_keys(**kwargs) if kwargs else self._keys
+        if not isinstance(args, tuple):
+            args = tuple(args)
+        if len(args) != len(keys):
+            size = min(len(args), len(keys))
+            keys, args = keys[:size], args[:size]
+        record = self._record if keys is self._keys else make_record(keys)
+        return record._make(args)
+
+    def use(self, *args, **kwargs) -> Record:
         return self._spread_data(*args)
 
 
@@ -368,6 +755,7 @@ class DataMergeDict(Tool):
     """
     Merge multiple dictionaries. {**a, **b, ...}.
     """
+    __slots__ = ()
 
     def __init__(self, name='DataMergeDict', **kwargs):
         super(DataMergeDict, self).__init__(name=name, **kwargs)
@@ -387,6 +775,7 @@ class DataMergeList(Tool):
     """
     Merge multiple lists. [**a, **b, ...].
     """
+    __slots__ = ()
 
     def __init__(self, name='DataMergeList', **kwargs):
         super(DataMergeList, self).__init__(name=name, **kwargs)
@@ -409,6 +798,7 @@ class InputUnpack(Variable):
     Args:
         tool (Tool): tool to use.
     """
+    __slots__ = ()
 
     def __init__(self, tool: 'Tool', name: str = 'DataUnpack', **kwargs):
         super(InputUnpack, self).__init__(tool=tool, name=name, **kwargs)
@@ -453,3 +843,95 @@ class AddKwargs(Variable):
 
     def use(self, *args, **kwargs) -> Any:
         return self.tool(*args, **{**kwargs, **self.tool_kwargs})
+
+
+class Every(Variable, Retaining):
+    """
+    Use :attr:`tool` once every :attr:`frames` calls and return the last result in between.
+    A tool that was never used (or was updated) is used on the next call. Uses are always at least
+    :attr:`frames` calls apart. Reused results are counted as ``cache_hits`` of the tool in enabled
+    :class:`~epta.core.metrics.MetricsRegistry`-s.
+
+    Args:
+        tool (Tool): tool to use.
+
+    Keyword Args:
+        frames (int): call period.
+        phase (int): extra calls before the first use after the initial one, to spread several tools
+            with the same period over different calls. Applies once per schedule (after construction or update).
+    """
+
+    _retained_attributes = ('last_result',)
+
+    def __init__(self, tool: 'Tool', frames: int = 1, phase: int = 0, name: str = 'Every', **kwargs):
+        super(Every, self).__init__(tool=tool, name=name, **kwargs)
+        self.frames = max(int(frames), 1)
+        self.phase = phase
+        self.last_result = None
+        self.executions = 0
+        self.reuses = 0
+        self._calls = 0
+        self._last = None  # clock of the last use, None to use on the next call
+        self._wait = 0  # clock distance from the last use to the next one
+
+    @property
+    def _period(self):
+        return self.frames
+
+    def _clock(self):
+        self._calls += 1
+        return self._calls
+
+    def use(self, *args, **kwargs) -> Any:
+        now = self._clock()
+        if self._last is not None and now - self._last < self._wait:
+            self.reuses += 1
+            if metrics.enabled():
+                metrics.count(self, 'cache_hits')
+            return self.last_result
+        self.last_result = self.tool(*args, **kwargs)
+        # phase delays only the first scheduled use, later ones are a period apart
+        self._wait = self._period if self._last is not None else self._period + self.phase
+        self._last = now
+        self.executions += 1
+        return self.last_result
+
+    def reset(self):
+        """
+        Force the tool use on the next call.
+        """
+        self._last = None
+
+    def evict(self):
+        super(Every, self).evict()
+        self.reset()
+
+    def update(self, *args, **kwargs):
+        super(Every, self).update(*args, **kwargs)
+        self.reset()
+
+
+class Throttle(Every):
+    """
+    Use :attr:`tool` at most once per :attr:`interval` seconds and return the last result in between.
+    A tool that was never used (or was updated) is used on the next call.
+
+    Args:
+        tool (Tool): tool to use.
+
+    Keyword Args:
+        interval (float): minimal seconds between the starts of two uses.
+        phase (float): extra seconds before the first use after the initial one, to spread several tools
+            with the same interval over different calls. Applies once per schedule (after construction or update).
+    """
+
+    def __init__(self, tool: 'Tool', interval: float, phase: float = 0.0, name: str = 'Throttle', **kwargs):
+        super(Throttle, self).__init__(tool=tool, phase=phase, name=name, **kwargs)
+        self.interval = interval
+
+    @property
+    def _period(self):
+        return self.interval
+
+    def _clock(self):
+        return time.perf_counter()
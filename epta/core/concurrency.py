@@ -0,0 +1,64 @@
+from typing import Any, Callable, List, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait
+import contextvars
+import threading
+import os
+
+_local = threading.local()
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def shared_executor() -> ThreadPoolExecutor:
+    """
+    Thread pool shared by threaded fan-out tools. Created on first use with a thread per cpu.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix='epta_fan_out')
+    return _executor
+
+
+def set_workers(workers: int):
+    """
+    Replace the shared pool with one of ``workers`` threads. Running tasks finish on the old pool.
+    """
+    global _executor
+    with _executor_lock:
+        old, _executor = _executor, ThreadPoolExecutor(max_workers=workers, thread_name_prefix='epta_fan_out')
+    if old is not None:
+        old.shutdown(wait=False)
+
+
+def in_worker() -> bool:
+    return getattr(_local, 'worker', False)
+
+
+def _run_in_worker(context: 'contextvars.Context', fnc: Callable, args: tuple, kwargs: dict) -> Any:
+    _local.worker = True
+    try:
+        return context.run(fnc, *args, **kwargs)
+    finally:
+        _local.worker = False
+
+
+def run_concurrently(calls: Sequence[Tuple[Callable, tuple, dict]]) -> List[Any]:
+    """
+    Results of ``fnc(*args, **kwargs)`` calls, in order. The first call runs in this thread, the rest on
+    :func:`shared_executor`, each in a copy of the current context (so deadlines and other context variables
+    are seen by the calls). Inside a pool thread calls run serially: nested fan-outs can not exhaust the pool.
+    """
+    if len(calls) < 2 or in_worker():
+        return [fnc(*args, **kwargs) for fnc, args, kwargs in calls]
+    executor = shared_executor()
+    futures = [executor.submit(_run_in_worker, contextvars.copy_context(), fnc, args, kwargs)
+               for fnc, args, kwargs in calls[1:]]
+    fnc, args, kwargs = calls[0]
+    try:
+        first = fnc(*args, **kwargs)
+    except BaseException:
+        wait(futures)  # never leave tasks running behind an error
+        raise
+    return [first, *(future.result() for future in futures)]
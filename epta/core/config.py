@@ -1,14 +1,14 @@
-from typing import Union
+from typing import Mapping, Union
 
 from .settings import Settings
 
 
 class Config:
-    def __init__(self, settings: Union[Settings, dict] = None, **kwargs):
+    def __init__(self, settings: Union[Settings, Mapping] = None, **kwargs):
         if settings is None:
             settings = dict()
-        if isinstance(settings, dict):
-            self.settings = Settings.from_dict(settings)
+        if isinstance(settings, Mapping):
+            self.settings = Settings.from_dict(dict(settings))
         else:
             self.settings = settings
         super().__init__(**kwargs)
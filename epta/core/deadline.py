@@ -0,0 +1,166 @@
+from typing import Any, Optional, Union, List
+from collections import Counter
+import contextvars
+import time
+
+from epta.core import Tool
+from .base_ops import Variable
+from .meta import Retaining
+
+_current_deadline = contextvars.ContextVar('epta_deadline', default=None)
+
+
+class DeadlineReport:
+    """
+    Result of a single :class:`~epta.core.deadline.Deadline` invocation.
+
+    Args:
+        expires (float): ``time.perf_counter`` value the invocation must finish at.
+    """
+    __slots__ = ('expires', 'started', 'finished', 'missed', 'skipped')
+
+    def __init__(self, expires: float):
+        self.expires = expires
+        self.started = time.perf_counter()
+        self.finished = None
+        self.missed: List[str] = list()  # tools that ran longer than their budget
+        self.skipped: List[str] = list()  # tools that returned a fallback
+
+    def remaining(self) -> float:
+        return self.expires - time.perf_counter()
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        if self.finished is None:
+            return None
+        return self.finished - self.started
+
+    @property
+    def expired(self) -> bool:
+        end = time.perf_counter() if self.finished is None else self.finished
+        return end > self.expires
+
+    def __repr__(self) -> str:
+        return (f"{self.__class__.__name__}(elapsed={self.elapsed}, "
+                f"missed={self.missed}, skipped={self.skipped})")
+
+
+def current_deadline() -> Optional[DeadlineReport]:
+    """
+    Deadline of the running invocation or ``None`` if there is no enclosing :class:`~epta.core.deadline.Deadline`.
+    """
+    return _current_deadline.get()
+
+
+def remaining_time() -> float:
+    """
+    Seconds left before the current deadline. ``math.inf`` if there is no deadline.
+    """
+    report = _current_deadline.get()
+    if report is None:
+        return float('inf')
+    return report.remaining()
+
+
+class Deadline(Variable):
+    """
+    Use :attr:`tool` with a time :attr:`budget`. The deadline is visible to every tool called inside
+    (through :class:`~epta.core.base_ops.Sequential`, :class:`~epta.core.base_ops.Concatenate`,
+    :class:`~epta.core.tool_dict.ToolDict`, etc.) and is respected by :class:`~epta.core.deadline.Budgeted` tools.
+    Nested deadlines can only shorten the outer one.
+
+    Args:
+        tool (Tool): tool to use.
+        budget (float): seconds for the whole invocation.
+
+    Attributes:
+        report (DeadlineReport): report of the last invocation.
+        missed (Counter): tool name -> number of budget misses over all invocations.
+        skipped (Counter): tool name -> number of fallbacks over all invocations.
+    """
+
+    def __init__(self, tool: 'Tool', budget: float, name: str = 'Deadline', **kwargs):
+        super(Deadline, self).__init__(tool=tool, name=name, **kwargs)
+        self.budget = budget
+        self.report = None
+        self.missed = Counter()
+        self.skipped = Counter()
+        self.expired = 0
+
+    def use(self, *args, **kwargs) -> Any:
+        expires = time.perf_counter() + self.budget
+        parent = _current_deadline.get()
+        if parent is not None:
+            expires = min(expires, parent.expires)
+        report = DeadlineReport(expires)
+        token = _current_deadline.set(report)
+        try:
+            return self.tool(*args, **kwargs)
+        finally:
+            _current_deadline.reset(token)
+            report.finished = time.perf_counter()
+            self.report = report
+            self.missed.update(report.missed)
+            self.skipped.update(report.skipped)
+            self.expired += report.expired
+            if parent is not None:
+                parent.missed.extend(report.missed)
+                parent.skipped.extend(report.skipped)
+
+
+class Budgeted(Variable, Retaining):
+    """
+    Use :attr:`tool` only if the current deadline leaves enough time, otherwise return a fallback.
+    Runs longer than :attr:`budget` are reported as misses to the enclosing :class:`~epta.core.deadline.Deadline`.
+
+    Args:
+        tool (Tool): tool to use.
+
+    Keyword Args:
+        budget (float): expected seconds for the tool. ``None`` to only check that the deadline is not expired.
+        fallback (Tool, str): ``'last'`` to return the last result of :attr:`tool`
+            or a (cheap) tool to use with the same inputs instead.
+        default (Any): value to return with ``'last'`` fallback if :attr:`tool` was never used.
+        require_budget (bool): if True, fallback is used when less than :attr:`budget` is left,
+            otherwise only when the deadline is already expired.
+    """
+
+    _retained_attributes = ('last_result',)
+
+    def __init__(self, tool: 'Tool', budget: float = None, fallback: Union['Tool', str] = 'last',
+                 default: Any = None, require_budget: bool = False, name: str = None, **kwargs):
+        super(Budgeted, self).__init__(tool=tool, name=(name or f'Budgeted_{tool.name}'), **kwargs)
+        self.budget = budget
+        self.fallback = fallback
+        self.require_budget = require_budget
+        self.last_result = default
+        self.misses = 0
+        self.fallbacks = 0
+
+    def _use_fallback(self, *args, **kwargs) -> Any:
+        if isinstance(self.fallback, Tool):
+            return self.fallback(*args, **kwargs)
+        return self.last_result
+
+    def use(self, *args, **kwargs) -> Any:
+        report = _current_deadline.get()
+        if report is not None:
+            reserve = self.budget if (self.require_budget and self.budget) else 0.0
+            if report.remaining() <= reserve:
+                self.fallbacks += 1
+                report.skipped.append(self.tool.name)
+                return self._use_fallback(*args, **kwargs)
+
+        start = time.perf_counter()
+        result = self.tool(*args, **kwargs)
+        if self.budget is not None and time.perf_counter() - start > self.budget:
+            self.misses += 1
+            if report is not None:
+                report.missed.append(self.tool.name)
+        self.last_result = result
+        return result
+
+    def update(self, *args, **kwargs):
+        super(Budgeted, self).update(*args, **kwargs)
+        if isinstance(self.fallback, Tool):
+            self.fallback.update(*args, **kwargs)
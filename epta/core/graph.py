@@ -0,0 +1,88 @@
+from typing import Any, Iterator, Tuple
+
+from .tool import Tool
+
+
+def _attributes(tool: Any) -> Iterator[Tuple[str, Any]]:
+    from .tool_dict import ToolDict, Snapshot
+
+    for attribute, value in getattr(tool, '__dict__', dict()).items():
+        if not isinstance(value, Snapshot):
+            yield attribute, value
+    if isinstance(tool, ToolDict):
+        yield '_tools', tool._tools  # the table of the published snapshot
+    for cls in type(tool).__mro__:
+        for slot in cls.__dict__.get('__slots__', tuple()):
+            if slot not in ('__dict__', '__weakref__'):
+                value = getattr(tool, slot, None)
+                if value is not None:
+                    yield slot, value
+
+
+def _children(tool: Any) -> Iterator[Tuple[str, 'Tool']]:
+    for attribute, value in _attributes(tool):
+        if isinstance(value, Tool):
+            yield f'.{attribute}', value
+        elif isinstance(value, (list, tuple)):
+            yield from ((f'.{attribute}[{i}]', item) for i, item in enumerate(value) if isinstance(item, Tool))
+        elif isinstance(value, dict):
+            yield from ((f'.{attribute}[{key!r}]', item) for key, item in value.items() if isinstance(item, Tool))
+
+
+def named_tools(root: 'Tool') -> Iterator[Tuple[str, 'Tool']]:
+    """
+    ``(path, tool)`` of every tool reachable from ``root`` (including it, with path ``''``) through attributes,
+    lists, tuples and dicts, once. Parents come before their children.
+    Paths look like ``.tools[1]._tools['hp']`` and are stable for pipelines built the same way.
+    """
+    seen = {id(root)}
+    stack = [('', root)]
+    while stack:
+        path, tool = stack.pop()
+        yield path, tool
+        for child_path, child in reversed(list(_children(tool))):
+            if id(child) not in seen:
+                seen.add(id(child))
+                stack.append((path + child_path, child))
+
+
+def iter_tools(root: 'Tool') -> Iterator['Tool']:
+    """
+    Every tool reachable from ``root`` (including it) through attributes, lists, tuples and dicts, once.
+    Parents come before their children.
+    """
+    for _, tool in named_tools(root):
+        yield tool
+
+
+def replace(root: 'Tool', old: 'Tool', new: 'Tool') -> int:
+    """
+    Replace every reference to ``old`` inside the graph of ``root`` with ``new``. Returns the number of references.
+    """
+    from .tool_dict import ToolDict
+
+    replaced = 0
+    for tool in list(iter_tools(root)):
+        if tool is new:
+            continue
+        for attribute, value in list(_attributes(tool)):
+            if value is old:
+                setattr(tool, attribute, new)
+                replaced += 1
+            elif isinstance(value, list):
+                for i, item in enumerate(value):
+                    if item is old:
+                        value[i] = new
+                        replaced += 1
+            elif isinstance(value, tuple) and any(item is old for item in value):
+                setattr(tool, attribute, tuple(new if item is old else item for item in value))
+                replaced += 1
+            elif isinstance(value, dict):
+                for key, item in list(value.items()):
+                    if item is old:
+                        if isinstance(tool, ToolDict) and attribute == '_tools':
+                            tool[key] = new  # respects copy-on-write tables
+                        else:
+                            value[key] = new
+                        replaced += 1
+    return replaced
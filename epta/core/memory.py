@@ -0,0 +1,177 @@
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+import tracemalloc
+import numpy as np
+
+from .tool import Tool
+from .meta import Retaining
+from .record import Record
+from .graph import iter_tools
+
+
+def _root(array: 'np.ndarray') -> 'np.ndarray':
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return array
+
+
+def measure(value: Any, depth: int = 4) -> Tuple[int, int]:
+    """
+    ``(nbytes, pinned)`` of arrays in ``value`` (arrays, lists, tuples, dicts and records are walked).
+    ``pinned`` is the extra memory kept alive by views of larger base arrays.
+    """
+    if isinstance(value, np.ndarray):
+        root = _root(value)
+        return value.nbytes, max(root.nbytes - value.nbytes, 0) if root is not value else 0
+    if depth <= 0:
+        return 0, 0
+    if isinstance(value, Record):
+        value = value.to_tuple()
+    elif isinstance(value, Mapping):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return 0, 0
+    nbytes = pinned = 0
+    for item in value:
+        item_nbytes, item_pinned = measure(item, depth - 1)
+        nbytes += item_nbytes
+        pinned += item_pinned
+    return nbytes, pinned
+
+
+class _ToolMemory:
+    __slots__ = ('calls', 'total_bytes', 'last_bytes', 'max_bytes', 'pinned_bytes', 'views')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_bytes = 0
+        self.last_bytes = 0
+        self.max_bytes = 0
+        self.pinned_bytes = 0
+        self.views = 0
+
+
+class MemoryAccountant:
+    """
+    Opt-in memory accounting of tools.
+    Once :meth:`enable`-d, records bytes of array outputs per tool name and flags outputs that are views
+    keeping a much larger base array alive (e.g. crops pinning whole frames).
+    :class:`~epta.core.meta.Retaining` tools (caches, last results) can be :meth:`track`-ed: their retained bytes
+    are checked against budgets after each of their calls. Over budget, retained views are compacted into copies,
+    then retained values are evicted.
+
+    Keyword Args:
+        view_ratio (float): a view is flagged if its base is at least ``view_ratio`` times larger.
+        budget (int): default retained bytes budget per tracked tool. ``None`` for no limit.
+        budgets (dict): tool name -> retained bytes budget.
+        evict (bool): evict values if compaction is not enough.
+    """
+
+    def __init__(self, view_ratio: float = 4.0, budget: int = None, budgets: Dict[str, int] = None,
+                 evict: bool = True):
+        self.view_ratio = view_ratio
+        self.budget = budget
+        self.budgets = budgets or dict()
+        self.evict = evict
+        self.tools: Dict[str, _ToolMemory] = dict()
+        self.tracked: Dict[int, 'Retaining'] = dict()
+        self.actions: List[Tuple[str, str, int]] = list()  # (tool name, action, retained bytes before)
+
+    def enable(self, trace: bool = False) -> 'MemoryAccountant':
+        """
+        Start accounting. If ``trace``, also start :mod:`tracemalloc` for :meth:`snapshot`.
+        """
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        Tool.add_observer(self)
+        return self
+
+    def disable(self):
+        Tool.remove_observer(self)
+
+    def track(self, *tools: 'Tool') -> 'MemoryAccountant':
+        """
+        Track retained bytes of the given tools and every retaining tool inside them.
+        """
+        for root in tools:
+            for tool in iter_tools(root):
+                if isinstance(tool, Retaining):
+                    self.tracked[id(tool)] = tool
+        return self
+
+    def _is_pinning(self, nbytes: int, pinned: int) -> bool:
+        return pinned > 0 and nbytes + pinned >= self.view_ratio * max(nbytes, 1)
+
+    def observe(self, tool: 'Tool', elapsed: float, result: Any, error: Optional[Exception]):
+        if error is None:
+            nbytes, pinned = measure(result)
+            if nbytes or pinned:
+                stats = self.tools.get(tool.name)
+                if stats is None:
+                    stats = self.tools[tool.name] = _ToolMemory()
+                stats.calls += 1
+                stats.total_bytes += nbytes
+                stats.last_bytes = nbytes
+                stats.max_bytes = max(stats.max_bytes, nbytes)
+                stats.pinned_bytes = pinned
+                stats.views += self._is_pinning(nbytes, pinned)
+        if id(tool) in self.tracked:
+            self.enforce(tool)
+
+    def retained_bytes(self, tool: 'Retaining') -> int:
+        """
+        Bytes kept alive by the tool: retained arrays and the bases they pin.
+        """
+        nbytes, pinned = measure(tool.retained())
+        return nbytes + pinned
+
+    def retained(self) -> Dict[str, int]:
+        return {tool.name: self.retained_bytes(tool) for tool in self.tracked.values()}
+
+    def _compact_value(self, value: Any) -> Any:
+        if isinstance(value, np.ndarray):
+            nbytes, pinned = measure(value)
+            return value.copy() if self._is_pinning(nbytes, pinned) else value
+        if isinstance(value, Record):
+            return value._make(tuple(self._compact_value(item) for item in value.to_tuple()))
+        if isinstance(value, list):
+            return [self._compact_value(item) for item in value]
+        if isinstance(value, tuple):
+            return tuple(self._compact_value(item) for item in value)
+        if isinstance(value, Mapping):
+            return {key: self._compact_value(item) for key, item in value.items()}
+        return value
+
+    def enforce(self, tool: 'Retaining') -> Optional[str]:
+        """
+        Apply the budget of the tool. Returns the action taken: ``'compact'``, ``'evict'`` or ``None``.
+        """
+        budget = self.budgets.get(tool.name, self.budget)
+        if budget is None:
+            return None
+        retained = self.retained_bytes(tool)
+        if retained <= budget:
+            return None
+        tool.compact(self._compact_value)
+        action = 'compact'
+        if self.evict and self.retained_bytes(tool) > budget:
+            tool.evict()
+            action = 'evict'
+        self.actions.append((tool.name, action, retained))
+        return action
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'tools': {name: {attribute: getattr(stats, attribute) for attribute in _ToolMemory.__slots__}
+                      for name, stats in self.tools.items()},
+            'retained': self.retained(),
+            'actions': list(self.actions),
+        }
+
+    @staticmethod
+    def snapshot(limit: int = 10, key_type: str = 'lineno') -> List['tracemalloc.Statistic']:
+        """
+        Top ``limit`` allocation sites from :mod:`tracemalloc`. Tracing is started if it was not.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return tracemalloc.take_snapshot().statistics(key_type)[:limit]
@@ -14,3 +14,26 @@ class ConfigDependent:
     def __init__(self, config: 'Config', **kwargs):
         self.config = config
         super().__init__(**kwargs)
+
+
+class Retaining:
+    """
+    Mixin for tools that keep values between calls (caches, last results).
+    Lets :class:`~epta.core.memory.MemoryAccountant` measure, compact and evict them.
+    By default, handles attributes listed in ``_retained_attributes``.
+    """
+    _retained_attributes = tuple()
+
+    def retained(self) -> list:
+        return [getattr(self, attribute, None) for attribute in self._retained_attributes]
+
+    def compact(self, fnc: callable):
+        """
+        Replace retained values with ``fnc(value)``.
+        """
+        for attribute in self._retained_attributes:
+            setattr(self, attribute, fnc(getattr(self, attribute, None)))
+
+    def evict(self):
+        for attribute in self._retained_attributes:
+            setattr(self, attribute, None)
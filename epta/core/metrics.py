@@ -0,0 +1,325 @@
+from typing import Any, Dict, List, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import bisect
+import time
+import os
+
+from .tool import Tool
+
+# latency bucket upper bounds in seconds: 1us .. ~8.4s, then +inf
+LATENCY_BUCKETS = tuple(1e-6 * 2 ** i for i in range(24))
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Not thread safe, every thread writes into its own one.
+
+    Args:
+        bounds (tuple): sorted bucket upper bounds. The last bucket is unbounded.
+    """
+    __slots__ = ('bounds', 'counts', 'count', 'sum')
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: 'Histogram'):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.sum += other.sum
+
+    def percentile(self, q: float) -> float:
+        """
+        Approximate ``q`` (0..100) percentile, interpolated inside the bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.bounds[i - 1] if i > 0 else 0.0
+                high = self.bounds[i] if i < len(self.bounds) else self.bounds[-1] * 2
+                return low + (high - low) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+
+class _ToolStats:
+    __slots__ = ('calls', 'errors', 'latency', 'counters')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram()
+        self.counters: Dict[str, float] = dict()  # reported by the tool itself, see :func:`count`
+
+
+class _Shard:
+    """
+    Per-thread storage. Written only by its thread, read on snapshots.
+    """
+    __slots__ = ('tools', 'counters')
+
+    def __init__(self):
+        self.tools: Dict[str, _ToolStats] = dict()
+        self.counters: Dict[str, float] = dict()
+
+
+class MetricsRegistry:
+    """
+    Runtime metrics of tools: call counts, errors and latency histograms per tool name,
+    plus custom counters (cache hits, dropped frames) and gauges (queue depths).
+    Every thread writes into its own shard, so recording takes no locks. Shards are merged on :meth:`snapshot`.
+    Tools report automatically once the registry is :meth:`enable`-d, use unique tool names to tell them apart.
+    Tools and runtimes also report their own counters (e.g. cache hits of :class:`~epta.core.base_ops.Every`)
+    and gauges (e.g. queue depths of :class:`~epta.runtime.host.PipelineHost`) with :func:`count` and :func:`gauge`.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = list()
+        self._shards_lock = threading.Lock()
+        self._gauges: Dict[Tuple[str, tuple], float] = dict()  # (name, labels) -> value
+        self._started = time.perf_counter()
+        self.enabled = False
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            self._local.tools = shard.tools
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def enable(self) -> 'MetricsRegistry':
+        global _enabled
+        Tool.add_observer(self)
+        if not self.enabled:
+            self._started = time.perf_counter()
+        self.enabled = True
+        if self not in _enabled:
+            _enabled = (*_enabled, self)
+        return self
+
+    def disable(self):
+        global _enabled
+        Tool.remove_observer(self)
+        self.enabled = False
+        _enabled = tuple(registry for registry in _enabled if registry is not self)
+
+    def reset(self):
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.tools.clear()
+                shard.counters.clear()
+        self._gauges = dict()
+        self._started = time.perf_counter()
+
+    def observe(self, tool: 'Tool', elapsed: float, result: Any, error: Optional[Exception]):
+        # hot path: called after every tool call
+        try:
+            tools = self._local.tools
+        except AttributeError:
+            tools = self._shard().tools
+        stats = tools.get(tool.name)
+        if stats is None:
+            stats = tools[tool.name] = _ToolStats()
+        stats.calls += 1
+        latency = stats.latency
+        latency.counts[bisect.bisect_left(latency.bounds, elapsed)] += 1
+        latency.count += 1
+        latency.sum += elapsed
+        if error is not None:
+            stats.errors += 1
+
+    def inc(self, name: str, value: float = 1):
+        """
+        Increase counter ``name``.
+        """
+        counters = self._shard().counters
+        counters[name] = counters.get(name, 0) + value
+
+    def inc_tool(self, tool_name: str, name: str, value: float = 1):
+        """
+        Increase counter ``name`` of the tool ``tool_name``.
+        """
+        try:
+            tools = self._local.tools
+        except AttributeError:
+            tools = self._shard().tools
+        stats = tools.get(tool_name)
+        if stats is None:
+            stats = tools[tool_name] = _ToolStats()
+        stats.counters[name] = stats.counters.get(name, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """
+        Set gauge ``name``, one value per set of ``labels``.
+        """
+        self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Merged metrics: ``{'tools': {name: {...}}, 'counters': {...}, 'gauges': {...}, 'elapsed': seconds}``.
+        """
+        with self._shards_lock:
+            shards = list(self._shards)
+        tools: Dict[str, _ToolStats] = dict()
+        counters: Dict[str, float] = dict()
+        for shard in shards:
+            for name, stats in list(shard.tools.items()):
+                merged = tools.get(name)
+                if merged is None:
+                    merged = tools[name] = _ToolStats()
+                merged.calls += stats.calls
+                merged.errors += stats.errors
+                merged.latency.merge(stats.latency)
+                for counter, value in list(stats.counters.items()):
+                    merged.counters[counter] = merged.counters.get(counter, 0) + value
+            for name, value in list(shard.counters.items()):
+                counters[name] = counters.get(name, 0) + value
+
+        elapsed = time.perf_counter() - self._started
+        return {
+            'tools': {name: {
+                'calls': stats.calls,
+                'errors': stats.errors,
+                'rate': stats.calls / elapsed if elapsed > 0 else 0.0,
+                'mean': stats.latency.sum / stats.calls if stats.calls else 0.0,
+                'p50': stats.latency.percentile(50),
+                'p95': stats.latency.percentile(95),
+                'p99': stats.latency.percentile(99),
+                'histogram': stats.latency,
+                'counters': stats.counters,
+            } for name, stats in tools.items()},
+            'counters': counters,
+            'gauges': {_sample(name, labels): value for (name, labels), value in list(self._gauges.items())},
+            'elapsed': elapsed,
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Snapshot in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        # family -> (type, samples): every TYPE line is followed by all samples of its family
+        families: Dict[str, Tuple[str, List[str]]] = dict()
+
+        def add(family: str, kind: str, sample: str):
+            families.setdefault(family, (kind, list()))[1].append(sample)
+
+        for name, stats in snapshot['tools'].items():
+            label = f'tool="{_escape(name)}"'
+            if stats['calls']:
+                add('epta_tool_calls_total', 'counter', f'epta_tool_calls_total{{{label}}} {stats["calls"]}')
+                add('epta_tool_errors_total', 'counter', f'epta_tool_errors_total{{{label}}} {stats["errors"]}')
+                histogram = stats['histogram']
+                cumulative = 0
+                for bound, count in zip((*histogram.bounds, '+Inf'), histogram.counts):
+                    cumulative += count
+                    add('epta_tool_latency_seconds', 'histogram',
+                        f'epta_tool_latency_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+                add('epta_tool_latency_seconds', 'histogram',
+                    f'epta_tool_latency_seconds_sum{{{label}}} {histogram.sum}')
+                add('epta_tool_latency_seconds', 'histogram',
+                    f'epta_tool_latency_seconds_count{{{label}}} {histogram.count}')
+            for counter, value in stats['counters'].items():
+                family = f'epta_tool_{_metric_name(counter)}_total'
+                add(family, 'counter', f'{family}{{{label}}} {value}')
+        for name, value in snapshot['counters'].items():
+            family = f'epta_{_metric_name(name)}_total'
+            add(family, 'counter', f'{family} {value}')
+        for (name, labels), value in list(self._gauges.items()):
+            family = f'epta_{_metric_name(name)}'
+            add(family, 'gauge', _sample(family, labels) + f' {value}')
+
+        lines = list()
+        for family, (kind, samples) in families.items():
+            lines.append(f'# TYPE {family} {kind}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str):
+        """
+        Write :meth:`to_prometheus` to ``path`` atomically (for the node exporter textfile collector).
+        """
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+
+    def serve(self, port: int = 0, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+        Serve :meth:`to_prometheus` over HTTP in a background thread. Call ``.shutdown()`` on the result to stop.
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name='epta_metrics', daemon=True).start()
+        return server
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _metric_name(name: str) -> str:
+    return ''.join(c if c.isalnum() or c == '_' else '_' for c in name)
+
+
+def _sample(name: str, labels: tuple) -> str:
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{_metric_name(key)}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+_enabled: Tuple[MetricsRegistry, ...] = tuple()
+
+
+def enabled() -> bool:
+    """
+    Whether any registry records. Check it before computing values for :func:`count` or :func:`gauge`.
+    """
+    return bool(_enabled)
+
+
+def count(tool: 'Tool', name: str, value: float = 1):
+    """
+    Increase counter ``name`` of ``tool`` (e.g. ``'cache_hits'``) in every enabled registry.
+    """
+    for enabled_registry in _enabled:
+        enabled_registry.inc_tool(tool.name, name, value)
+
+
+def gauge(name: str, value: float, **labels):
+    """
+    Set gauge ``name`` (e.g. ``'queue_depth'``) in every enabled registry.
+    """
+    for enabled_registry in _enabled:
+        enabled_registry.set(name, value, **labels)
+
+
+registry = MetricsRegistry()
@@ -28,6 +28,9 @@ class PositionDependent(Atomic):
         positions = self.position_manager.get(key)
         if positions is None:
             return tuple()
+        if isinstance(positions, ToolDict):
+            # one read of all coordinates, a concurrent update can not mix old and new values
+            positions = positions.snapshot()
         starting_x = positions.get('x', 0)
         starting_y = positions.get('y', 0)
 
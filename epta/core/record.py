@@ -0,0 +1,148 @@
+from typing import Any, Callable, Hashable, Iterable, Iterator, Tuple
+from collections.abc import Mapping, KeysView, ItemsView, ValuesView
+from operator import itemgetter
+import functools
+import json
+
+
+class Record:
+    """
+    Read-only mapping backed by a tuple of values with a fixed key schema.
+    Used instead of ``dict`` between data tools: the key -> index map is built once per schema
+    by :func:`~epta.core.record.make_record`, a record itself holds only the values.
+    Behaves like a ``dict`` for reading: ``record[key]``, ``record.get(key)``, ``key in record``, iteration over keys.
+    Registered as :class:`collections.abc.Mapping`, but does not inherit from it to keep ``isinstance`` checks cheap:
+    check inputs with ``isinstance(data, Mapping)``, not ``dict``. Use :meth:`to_dict` for a mutable copy
+    and :meth:`to_json` or :func:`~epta.core.record.json_default` to serialize.
+    """
+    __slots__ = ('_values',)
+    _keys: Tuple[Hashable, ...] = tuple()
+    _index: dict = dict()
+    _getters: dict = dict()
+
+    def __init__(self, values: Iterable = ()):
+        values = tuple(values)
+        if len(values) != len(self._keys):
+            raise ValueError(f'Expected {len(self._keys)} values for keys {self._keys}, got {len(values)}')
+        self._values = values
+
+    @classmethod
+    def _make(cls, values: tuple) -> 'Record':
+        # no checks, values length must match the schema.
+        record = cls.__new__(cls)
+        record._values = values
+        return record
+
+    @classmethod
+    def _getter(cls, keys: Tuple[Hashable, ...]) -> Callable[[tuple], tuple]:
+        getter = cls._getters.get(keys)
+        if getter is None:
+            getter = cls._getters[keys] = _make_getter(tuple(cls._index.get(key) for key in keys))
+        return getter
+
+    def select(self, keys: Tuple[Hashable, ...]) -> tuple:
+        """
+        Values of ``keys`` as a tuple, ``None`` for keys that are not present.
+        """
+        return self._getter(keys)(self._values)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._values[self._index[key]]
+
+    def get(self, key: Hashable, default_value: Any = None) -> Any:
+        index = self._index.get(key)
+        if index is None:
+            return default_value
+        return self._values[index]
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def keys(self) -> KeysView:
+        return KeysView(self)
+
+    def items(self) -> ItemsView:
+        return ItemsView(self)
+
+    def values(self) -> ValuesView:
+        return ValuesView(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Record) and self._keys == other._keys:
+            return self._values == other._values
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.to_dict() == dict(other.items())
+
+    __hash__ = None
+
+    def to_tuple(self) -> tuple:
+        return self._values
+
+    def to_dict(self) -> dict:
+        return dict(zip(self._keys, self._values))
+
+    def to_json(self, **kwargs) -> str:
+        """
+        ``json.dumps`` of the record, nested records included. ``kwargs`` are passed to ``json.dumps``.
+        """
+        kwargs.setdefault('default', json_default)
+        return json.dumps(self, **kwargs)
+
+    def __reduce__(self):
+        return _rebuild_record, (self._keys, self._values)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.to_dict()!r})"
+
+
+Mapping.register(Record)
+
+
+def json_default(value: Any) -> Any:
+    """
+    ``default`` for ``json.dump``: records and other mappings are written as objects.
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _make_getter(indices: Tuple[Any, ...]) -> Callable[[tuple], tuple]:
+    if any(index is None for index in indices):
+        return lambda values: tuple(None if index is None else values[index] for index in indices)
+    if not indices:
+        return lambda values: tuple()
+    if len(indices) == 1:
+        index = indices[0]
+        return lambda values: (values[index],)
+    return itemgetter(*indices)
+
+
+@functools.lru_cache(maxsize=None)
+def make_record(keys: Tuple[Hashable, ...]) -> type:
+    """
+    :class:`~epta.core.record.Record` type for the given key schema. Types are cached per schema.
+
+    Args:
+        keys (tuple): keys of the schema.
+    """
+    keys = tuple(keys)
+    return type('Record', (Record,), {
+        '__slots__': tuple(),
+        '_keys': keys,
+        '_index': {key: i for i, key in enumerate(keys)},
+        '_getters': dict(),
+    })
+
+
+def _rebuild_record(keys: tuple, values: tuple) -> Record:
+    return make_record(keys)._make(values)
@@ -1,16 +1,26 @@
 from typing import Any
 import itertools
+import weakref
+import time
 from epta.core.meta import UpdateDependent
 
 
-class Tool(UpdateDependent):
+class Tool:
     """
     Base class for tool instance.
+    Slotted and not abstract, so graphs of many small tools stay cheap. Subclasses without ``__slots__``
+    get a ``__dict__`` as usual. Subclasses whose instances have no ``__dict__`` (all classes in the MRO
+    define ``__slots__``) are called straight through ``use``, skipping the ``__call__`` frame.
+    Such instances, e.g. of :class:`~epta.core.base_ops.Lambda` or :class:`~epta.core.base_ops.Sequential`,
+    do not accept attributes other than their slots: subclass them without ``__slots__`` to add some.
 
     Args:
         name (str): Tool name. If None, a unique name will be generated.
     """
+    __slots__ = ('name', '__weakref__')
     _ids = itertools.count(0)
+    _observers = tuple()
+    _dispatch = weakref.WeakKeyDictionary()  # class -> True if called straight through ``use``
 
     def __init__(self, name: str = None, **kwargs):
         super().__init__(**kwargs)
@@ -19,6 +29,16 @@ class Tool(UpdateDependent):
         else:
             self.name = name
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '__call__' in cls.__dict__:
+            return  # custom call
+        owner = next(base for base in cls.__mro__ if '__call__' in base.__dict__)
+        if owner is Tool or owner in Tool._dispatch:
+            # an instance ``use`` can not shadow the class one without ``__dict__``
+            Tool._dispatch[cls] = cls.__dictoffset__ == 0
+            _set_call(cls)
+
     def use(self, *args, **kwargs) -> Any:
         pass
 
@@ -30,3 +50,53 @@ class Tool(UpdateDependent):
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(name='{self.name}')"
+
+    @classmethod
+    def add_observer(cls, observer: Any):
+        """
+        Report every tool call to ``observer.observe(tool, elapsed, result, error)``.
+        Calls are not timed while there are no observers.
+        """
+        if observer not in Tool._observers:
+            Tool._observers = (*Tool._observers, observer)
+        _set_calls()
+
+    @classmethod
+    def remove_observer(cls, observer: Any):
+        Tool._observers = tuple(o for o in Tool._observers if o is not observer)
+        _set_calls()
+
+
+UpdateDependent.register(Tool)
+
+_call = Tool.__call__
+
+
+def _observed_call(self, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        result = self.use(*args, **kwargs)
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        for observer in Tool._observers:
+            observer.observe(self, elapsed, None, e)
+        raise
+    elapsed = time.perf_counter() - start
+    for observer in Tool._observers:
+        observer.observe(self, elapsed, result, None)
+    return result
+
+
+def _set_call(cls: type):
+    if Tool._observers:
+        cls.__call__ = _observed_call
+    elif Tool._dispatch.get(cls, False):
+        cls.__call__ = cls.use
+    else:
+        cls.__call__ = _call
+
+
+def _set_calls():
+    _set_call(Tool)
+    for cls in list(Tool._dispatch.keys()):
+        _set_call(cls)
@@ -1,6 +1,57 @@
 from typing import Dict, Iterator, ItemsView, Iterable, Union, List, Sequence, Any
+from collections.abc import Mapping
+from contextlib import contextmanager
+import threading
 
 from epta.core import Tool
+from .base_ops import Break, _branch_results
+from .concurrency import run_concurrently
+
+
+class Snapshot:
+    """
+    Immutable versioned view of a :class:`~epta.core.tool_dict.ToolDict` table.
+    Holding a snapshot gives consistent reads of many keys while the table is being updated.
+
+    Args:
+        version (int): table version.
+        table (dict): published table. Not copied, must not be mutated.
+    """
+    __slots__ = ('version', '_table')
+
+    def __init__(self, version: int, table: dict):
+        self.version = version
+        self._table = table
+
+    def __getitem__(self, key: str) -> Any:
+        return self._table[key]
+
+    def get(self, key: str, default_value=None) -> Any:
+        return self._table.get(key, default_value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._table
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._table)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def keys(self) -> Iterable[str]:
+        return self._table.keys()
+
+    def items(self) -> ItemsView[str, Any]:
+        return self._table.items()
+
+    def values(self) -> Iterable[Any]:
+        return self._table.values()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(version={self.version}, keys={list(self._table)})"
+
+
+Mapping.register(Snapshot)
 
 
 class ToolDict(Tool):
@@ -12,28 +63,46 @@ class ToolDict(Tool):
             If list is passed - keys are tool.name.
     Keyword Args:
         use_behaviour (str): One of 'sequential', 'concatenate', 'dict' to specify ``use`` behaviour.
+        copy_on_write (bool): never mutate the table in place. Every change builds a new table
+            and publishes it with a single reference swap, so readers in other threads see either the old
+            or the new table, without locks. Writers are serialized. See :meth:`batch` and :meth:`snapshot`.
+            Without it the table is changed in place, :attr:`version` is still bumped by every change.
+        threaded (bool): with 'dict' and 'concatenate' behaviours, use the tools concurrently on the shared
+            thread pool (see :func:`~epta.core.concurrency.run_concurrently`).
     """
 
     def __init__(self,
                  tools: Union[Dict[str, Tool], List[Tool]] = None,
                  name='ToolDict',
                  use_behaviour: str = 'dict',
+                 copy_on_write: bool = False,
+                 threaded: bool = False,
                  **kwargs) -> None:
         super(ToolDict, self).__init__(name=name, **kwargs)
         if tools is None:
             tools = dict()
         if isinstance(tools, list):
             tools = {tool.name: tool for tool in tools}
-        self._tools = tools
         self._use_behaviour = use_behaviour
+        self.copy_on_write = copy_on_write
+        self.threaded = threaded
+        # the only reference to the table: a reader gets the version and the table in one read
+        self._snapshot = Snapshot(0, tools)
+        self._write_lock = threading.RLock()
+        # plain function: dispatched by the class ``use``, so subclasses can still override ``use``
+        self._use = self._use_mapping.get(use_behaviour, ToolDict._dict_use)
 
-        # TODO: metaclass?
-        __use_mapping = {
-            'dict': self._dict_use,
-            'sequential': self._sequential_use,
-            'concatenate': self._concatenate_use,
-        }
-        self.use = __use_mapping.get(use_behaviour, self._dict_use)
+    def use(self, *args, **kwargs) -> Any:
+        return self._use(self, *args, **kwargs)
+
+    @property
+    def _tools(self) -> dict:
+        return self._snapshot._table
+
+    def _changed(self):
+        # in place change of the table (without copy_on_write)
+        with self._write_lock:
+            self._snapshot = Snapshot(self._snapshot.version + 1, self._snapshot._table)
 
     def __getitem__(self, key: str) -> Tool:
         return self._tools[key]
@@ -42,7 +111,12 @@ class ToolDict(Tool):
         self.add_tool(key, tool)
 
     def __delitem__(self, key: str) -> None:
-        del self._tools[key]
+        if self.copy_on_write:
+            with self.batch() as table:
+                del table[key]
+        else:
+            del self._tools[key]
+            self._changed()
 
     def __len__(self) -> int:
         return len(self._tools)
@@ -54,7 +128,11 @@ class ToolDict(Tool):
         return key in self._tools
 
     def clear(self) -> None:
-        self._tools.clear()
+        if self.copy_on_write:
+            self.publish(dict())
+        else:
+            self._tools.clear()
+            self._changed()
 
     def pop(self, key: str) -> Tool:
         v = self[key]
@@ -71,11 +149,56 @@ class ToolDict(Tool):
         return self._tools.values()
 
     def add_tool(self, key: str, tool: Tool):
-        self._tools[key] = tool
+        if self.copy_on_write:
+            with self.batch() as table:
+                table[key] = tool
+        else:
+            self._tools[key] = tool
+            self._changed()
 
     def get(self, key: str, default_value=None):
         return self._tools.get(key, default_value)
 
+    @property
+    def version(self) -> int:
+        """
+        Number of changes of the table: tables published with :meth:`publish` and in place changes.
+        """
+        return self._snapshot.version
+
+    def snapshot(self) -> Snapshot:
+        """
+        Versioned immutable view of the current table. Lock free with ``copy_on_write``,
+        otherwise the table is copied (and may be caught half-updated by a concurrent writer).
+        """
+        snapshot = self._snapshot
+        if self.copy_on_write:
+            return snapshot
+        return Snapshot(snapshot.version, dict(snapshot._table))
+
+    def publish(self, table: dict):
+        """
+        Replace the table with ``table`` (not copied, must not be mutated afterwards) in one reference swap.
+        """
+        with self._write_lock:
+            self._snapshot = Snapshot(self._snapshot.version + 1, table)
+
+    @contextmanager
+    def batch(self):
+        """
+        Build the next table off to the side and :meth:`publish` it on exit::
+
+            with position_manager.batch() as table:
+                table['hp'] = {'x': 10, 'y': 5}
+                del table['mana']
+
+        Readers keep using the previous table until the block is over. Nothing is published on an exception.
+        """
+        with self._write_lock:
+            table = dict(self._tools)
+            yield table
+            self.publish(table)
+
     @property
     def tools(self) -> Sequence[Tool]:
         return list(self._tools.values())
@@ -88,25 +211,45 @@ class ToolDict(Tool):
     def _sequential_use(self, *args, **kwargs) -> Any:
         # kwargs are passed via key or are common for all tools.
 
-        tools = list(self.items())
+        tools = list(self._tools.items())
 
         if not tools:
             return None
 
         key, tool = tools[0]
         inp = tool(*args, **kwargs.get(key, kwargs))
+        if isinstance(inp, Break):
+            return inp.value
         for key, tool in tools[1:]:
             inp = tool(inp, **kwargs.get(key, kwargs))
+            if isinstance(inp, Break):
+                return inp.value
         return inp
 
     def _concatenate_use(self, *args, **kwargs) -> List:
+        tools = self.tools
+        if self.threaded:
+            return _branch_results(run_concurrently([(tool, args, kwargs) for tool in tools]))
         result = list()
-        for tool in self.tools:
-            result.append(tool(*args, **kwargs))
+        for tool in tools:
+            value = tool(*args, **kwargs)
+            result.append(value.value if isinstance(value, Break) else value)
         return result
 
     def _dict_use(self, *args, **kwargs) -> dict:
+        items = list(self._tools.items())
+        if self.threaded:
+            return dict(zip((key for key, _ in items),
+                            _branch_results(run_concurrently([(tool, args, kwargs) for _, tool in items]))))
         data = dict()
-        for key, tool in self.items():
-            data[key] = tool(*args, **kwargs)
+        for key, tool in items:
+            value = tool(*args, **kwargs)
+            data[key] = value.value if isinstance(value, Break) else value
         return data
+
+
+ToolDict._use_mapping = {
+    'dict': ToolDict._dict_use,
+    'sequential': ToolDict._sequential_use,
+    'concatenate': ToolDict._concatenate_use,
+}
@@ -1,3 +1,46 @@
+import argparse
+import json
+import sys
+
+from epta.runtime.batch import BatchRunner, open_source
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='python -m epta',
+                                     description='Run a pipeline over an image directory, a video or a recorded '
+                                                 'capture. Interrupted runs resume from checkpoints in the output.')
+    parser.add_argument('factory', help='pipeline factory, module:callable or path/to/file.py:callable')
+    parser.add_argument('source', help='image directory, video file or BufferedSink capture directory')
+    parser.add_argument('output', help='output directory for results and checkpoints')
+    parser.add_argument('--kind', default='auto', choices=('auto', 'images', 'video', 'capture'),
+                        help='source kind (default: guessed from the path)')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes, one shard each')
+    parser.add_argument('--format', default='jsonl', choices=('jsonl', 'npz'), help='output format')
+    parser.add_argument('--checkpoint-every', type=int, default=256, help='frames between checkpoints')
+    parser.add_argument('--max-frames', type=int, default=None, help='stop every shard after this many frames')
+    parser.add_argument('--factory-kwargs', type=json.loads, default=None, help='JSON kwargs for the factory')
+    parser.add_argument('--color', default='RGB', help='color space of frames passed to the pipeline')
+    parser.add_argument('--stride', type=int, default=1, help='use every stride-th video frame')
+    parser.add_argument('--recursive', action='store_true', help='include image subdirectories')
+    parser.add_argument('--restart', action='store_true', help='drop checkpoints and results of a previous run')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    source = open_source(args.source, args.kind, color=args.color, stride=args.stride, recursive=args.recursive)
+    runner = BatchRunner(args.factory, source, args.output, workers=args.workers, factory_kwargs=args.factory_kwargs,
+                         format=args.format, checkpoint_every=args.checkpoint_every, max_frames=args.max_frames)
+    if args.restart:
+        runner.restart()
+    try:
+        result = runner.run()
+    except KeyboardInterrupt:
+        print('Interrupted, run again to resume from the last checkpoint.', file=sys.stderr)
+        return 130
+    print(runner.report(result))
+    return 0
+
 
 if __name__ == '__main__':
-    print('Hi')
+    sys.exit(main())
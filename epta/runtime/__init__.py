@@ -0,0 +1,5 @@
+from .host import PipelineHost, HostedPipeline
+from .remote import RemoteTool, ToolServer
+from .batch import BatchRunner, FrameSource, ImageDirectorySource, VideoSource, CaptureSource, open_source, iter_results
+from .load import LoadGenerator
+from .tuner import AutoTuner, Tuning, Profiler
@@ -0,0 +1,389 @@
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from collections.abc import Mapping
+import importlib.util
+import abc
+import importlib
+import glob
+import json
+import time
+import os
+import numpy as np
+
+from epta.core import Tool
+from epta.core.metrics import MetricsRegistry
+from epta.utils.frame import Frame
+from epta.tools.sinks import BufferedSink, iter_chunks, iter_rows
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+
+class FrameSource(abc.ABC):
+    """
+    Indexed frames that can be split into contiguous shards. Sources are pickled to worker processes,
+    so they only keep paths and options and open files in :meth:`iter_range`.
+    """
+    step = 1  # index distance between consecutive frames
+
+    def ranges(self, parts: int) -> List[Tuple[int, int]]:
+        """
+        Split the source into at most ``parts`` contiguous ``(start, stop)`` index ranges.
+        """
+        length = len(self)
+        bounds = [round(length * i / parts) for i in range(parts + 1)]
+        return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if a < b]
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abc.abstractmethod
+    def iter_range(self, start: int, stop: int) -> Iterator[Tuple[int, str, Any]]:
+        """
+        ``(index, key, frame)`` for frames in ``[start, stop)``. ``key`` identifies the frame in the output.
+        """
+        pass
+
+
+class ImageDirectorySource(FrameSource):
+    """
+    Images of a directory, sorted by path.
+
+    Args:
+        path (str): directory.
+
+    Keyword Args:
+        color (str): color space of frames.
+        recursive (bool): include subdirectories.
+    """
+
+    def __init__(self, path: str, color: str = 'RGB', recursive: bool = False):
+        pattern = os.path.join(path, '**', '*') if recursive else os.path.join(path, '*')
+        self.paths = sorted(p for p in glob.glob(pattern, recursive=recursive)
+                            if p.lower().endswith(IMAGE_EXTENSIONS))
+        self.root = path
+        self.color = color
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Tuple[int, str, Any]]:
+        from epta.tools.hookers.image_hookers import ImreadHooker
+
+        hooker = ImreadHooker(color=self.color)
+        for index in range(start, min(stop, len(self.paths))):
+            path = self.paths[index]
+            yield index, os.path.relpath(path, self.root), hooker(path)
+
+
+class VideoSource(FrameSource):
+    """
+    Frames of a video file, indexed by frame number.
+
+    Args:
+        path (str): video file.
+
+    Keyword Args:
+        color (str): color space of frames.
+        stride (int): use every ``stride``-th frame.
+    """
+
+    def __init__(self, path: str, color: str = 'RGB', stride: int = 1):
+        from epta.tools.hookers.image_hookers import VideoFileHooker
+
+        self.path = path
+        self.color = color
+        self.step = max(int(stride), 1)
+        self.frame_count, _ = VideoFileHooker.probe(path)
+
+    def __len__(self) -> int:
+        return self.frame_count
+
+    def ranges(self, parts: int) -> List[Tuple[int, int]]:
+        from epta.tools.hookers.image_hookers import VideoFileHooker
+
+        return VideoFileHooker.split(self.path, parts, stride=self.step)
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Tuple[int, str, Any]]:
+        from epta.tools.hookers.image_hookers import VideoFileHooker
+
+        hooker = VideoFileHooker(self.path, stride=self.step, start=start, stop=stop, color=self.color)
+        try:
+            for frame in hooker:
+                yield frame['index'], f"{frame['timestamp']:.3f}", frame['image']
+        finally:
+            hooker.close()
+
+
+class CaptureSource(FrameSource):
+    """
+    Frames recorded with :class:`~epta.tools.sinks.buffered_sink.BufferedSink`, one row per frame.
+
+    Args:
+        path (str): sink directory.
+
+    Keyword Args:
+        prefix (str): sink file prefix.
+        key (str): column with frames.
+        color (str): color space the frames were recorded in.
+    """
+
+    def __init__(self, path: str, prefix: str = 'sink', key: str = 'image', color: str = 'RGB'):
+        self.path = path
+        self.prefix = prefix
+        self.key = key
+        self.color = color
+        self.length = sum(len(next(iter(chunk.values()), ())) for chunk in iter_chunks(path, prefix))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Tuple[int, str, Any]]:
+        for index, row in enumerate(iter_rows(self.path, self.prefix)):
+            if index >= stop:
+                break
+            if index >= start:
+                yield index, str(index), Frame(np.asarray(row[self.key], dtype=np.uint8), self.color)
+
+
+def open_source(path: str, kind: str = 'auto', **kwargs) -> FrameSource:
+    """
+    Frame source for ``path``. ``kind`` is one of ``'images'``, ``'video'``, ``'capture'`` or ``'auto'``:
+    video files are videos, directories with sink chunks are captures, other directories are images.
+    """
+    if kind == 'auto':
+        if os.path.isfile(path):
+            kind = 'video'
+        elif glob.glob(os.path.join(path, f"{kwargs.get('prefix', 'sink')}-*.*")):
+            kind = 'capture'
+        else:
+            kind = 'images'
+    if kind == 'images':
+        return ImageDirectorySource(path, color=kwargs.get('color', 'RGB'), recursive=kwargs.get('recursive', False))
+    if kind == 'video':
+        return VideoSource(path, color=kwargs.get('color', 'RGB'), stride=kwargs.get('stride', 1))
+    if kind == 'capture':
+        return CaptureSource(path, prefix=kwargs.get('prefix', 'sink'), key=kwargs.get('key', 'image'),
+                             color=kwargs.get('color', 'RGB'))
+    raise ValueError(f'Unknown source kind {kind}')
+
+
+def load_factory(factory: Union[str, Callable[..., 'Tool']]) -> Callable[..., 'Tool']:
+    """
+    Resolve ``'package.module:callable'`` or ``'path/to/file.py:callable'``.
+    """
+    if callable(factory):
+        return factory
+    module_name, _, attribute = factory.rpartition(':')
+    if not module_name:
+        raise ValueError(f'Factory must look like module:callable, got {factory}')
+    if module_name.endswith('.py'):
+        spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(module_name))[0],
+                                                      module_name)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(module_name)
+    return getattr(module, attribute)
+
+
+def _row(index: int, key: str, result: Any) -> dict:
+    row = {'index': index, 'source': key}
+    if isinstance(result, Mapping):
+        row.update(result)
+    elif result is not None:
+        row['value'] = result
+    return row
+
+
+class _Shard:
+    """
+    Checkpointed progress of one shard. Output files are committed at checkpoints,
+    files written after the last checkpoint are removed on resume.
+    """
+
+    def __init__(self, output: str, shard: int, start: int, stop: int):
+        self.output = output
+        self.prefix = f'shard{shard:03d}'
+        self.path = os.path.join(output, f'checkpoint-{shard:03d}.json')
+        self.start, self.stop = start, stop
+        self.next = start
+        self.rows = 0
+        self.files = 0
+        self.elapsed = 0.0
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                state = json.load(f)
+            self.next, self.rows, self.files, self.elapsed = (state['next'], state['rows'], state['files'],
+                                                              state['elapsed'])
+
+    def rollback(self):
+        for path in sorted(glob.glob(os.path.join(self.output, f'{self.prefix}-*.*')))[self.files:]:
+            os.remove(path)
+
+    def commit(self, next_index: int, rows: int, elapsed: float):
+        self.next, self.rows, self.elapsed = next_index, self.rows + rows, self.elapsed + elapsed
+        self.files = len(glob.glob(os.path.join(self.output, f'{self.prefix}-*.*')))
+        state = {'start': self.start, 'stop': self.stop, 'next': self.next, 'rows': self.rows,
+                 'files': self.files, 'elapsed': self.elapsed}
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, self.path)
+
+    @property
+    def done(self) -> bool:
+        return self.next >= self.stop
+
+
+def run_shard(factory: Union[str, Callable[..., 'Tool']], source: FrameSource, output: str, shard: int,
+              start: int, stop: int, factory_kwargs: dict = None, format: str = 'jsonl', checkpoint_every: int = 256,
+              max_frames: int = None) -> Dict[str, Any]:
+    """
+    Run the pipeline over frames ``[start, stop)`` of the source, resuming from the shard checkpoint.
+    Returns ``{'frames', 'elapsed', 'done', 'tools': {name: (calls, seconds)}}`` of this run.
+    """
+    state = _Shard(output, shard, start, stop)
+    if state.done:
+        return {'shard': shard, 'frames': 0, 'elapsed': 0.0, 'done': True, 'tools': dict()}
+    state.rollback()
+
+    pipeline = load_factory(factory)(**(factory_kwargs or dict()))
+    pipeline.update()
+    # own registry: the process-wide one may be used by the code embedding the runner
+    registry = MetricsRegistry().enable()
+
+    frames = 0
+    pending = 0
+    started = checkpoint_started = time.perf_counter()
+    sink = BufferedSink(output, prefix=state.prefix, format=format, max_rows=checkpoint_every, max_interval=None)
+    try:
+        for index, key, frame in source.iter_range(state.next, stop):
+            sink.write(_row(index, key, pipeline(frame)))
+            frames += 1
+            pending += 1
+            if pending >= checkpoint_every or frames == max_frames:
+                sink.close()  # rows are on disk
+                now = time.perf_counter()
+                state.commit(index + source.step, pending, now - checkpoint_started)
+                checkpoint_started, pending = now, 0
+                if frames == max_frames:
+                    break
+                sink = BufferedSink(output, prefix=state.prefix, format=format, max_rows=checkpoint_every,
+                                    max_interval=None)
+        else:
+            sink.close()
+            state.commit(stop, pending, time.perf_counter() - checkpoint_started)
+    finally:
+        sink.close()
+        registry.disable()
+
+    tools = {name: (stats['calls'], stats['histogram'].sum) for name, stats in registry.snapshot()['tools'].items()}
+    return {'shard': shard, 'frames': frames, 'elapsed': time.perf_counter() - started, 'done': state.done,
+            'tools': tools}
+
+
+def iter_results(output: str) -> Iterator[dict]:
+    """
+    Rows written by :class:`~epta.runtime.batch.BatchRunner` into ``output``, shard by shard.
+    """
+    prefixes = sorted({os.path.basename(path).split('-')[0] for path in glob.glob(os.path.join(output, 'shard*-*.*'))})
+    for prefix in prefixes:
+        yield from iter_rows(output, prefix)
+
+
+class BatchRunner:
+    """
+    Runs a pipeline over a frame source, sharded across worker processes.
+    Every shard writes its results through :class:`~epta.tools.sinks.buffered_sink.BufferedSink` into
+    ``output`` and checkpoints its progress, so an interrupted run continues where it stopped.
+    Results are rows of ``index``, ``source`` (frame key) and the pipeline output fields.
+
+    Args:
+        factory (str, callable): ``'module:callable'`` (or ``'file.py:callable'``) returning the pipeline tool.
+            Called once per worker.
+        source (FrameSource): frames to process. See :func:`~epta.runtime.batch.open_source`.
+        output (str): output directory.
+
+    Keyword Args:
+        workers (int): worker processes. ``1`` runs in this process.
+        factory_kwargs (dict): kwargs for ``factory``.
+        format (str): sink format, ``'jsonl'`` or ``'npz'``.
+        checkpoint_every (int): frames between checkpoints.
+        max_frames (int): stop every shard after this many frames in this run. ``None`` for no limit.
+    """
+
+    def __init__(self, factory: Union[str, Callable[..., 'Tool']], source: FrameSource, output: str, workers: int = 1,
+                 factory_kwargs: dict = None, format: str = 'jsonl', checkpoint_every: int = 256,
+                 max_frames: int = None):
+        self.factory = factory
+        self.source = source
+        self.output = output
+        self.workers = max(int(workers), 1)
+        self.factory_kwargs = factory_kwargs or dict()
+        self.format = format
+        self.checkpoint_every = max(int(checkpoint_every), 1)
+        self.max_frames = max_frames
+
+    def _job(self) -> dict:
+        """
+        Job description. A resumed job must match the checkpointed one.
+        """
+        os.makedirs(self.output, exist_ok=True)
+        job = {'source': type(self.source).__name__, 'length': len(self.source), 'format': self.format,
+               'shards': self.source.ranges(self.workers)}
+        path = os.path.join(self.output, 'job.json')
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            saved['shards'] = [tuple(bounds) for bounds in saved['shards']]
+            if saved != job:
+                raise ValueError(f'{self.output} holds a different job: {saved}. Use another output or restart.')
+        else:
+            with open(path, 'w') as f:
+                json.dump(job, f)
+        return job
+
+    def restart(self):
+        """
+        Remove checkpoints and results of a previous run in :attr:`output`.
+        """
+        for pattern in ('job.json', 'checkpoint-*.json', 'shard*-*.*'):
+            for path in glob.glob(os.path.join(self.output, pattern)):
+                os.remove(path)
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Process the source. Returns the :meth:`report` input: per shard results.
+        """
+        job = self._job()
+        jobs = [(self.factory, self.source, self.output, shard, start, stop, self.factory_kwargs, self.format,
+                 self.checkpoint_every, self.max_frames) for shard, (start, stop) in enumerate(job['shards'])]
+        started = time.perf_counter()
+        if self.workers == 1:
+            shards = [run_shard(*args) for args in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+                shards = list(pool.map(run_shard, *zip(*jobs)))
+        return {'elapsed': time.perf_counter() - started, 'shards': shards}
+
+    @staticmethod
+    def report(result: Dict[str, Any]) -> str:
+        """
+        Throughput and per-stage timing of :meth:`run` result.
+        """
+        frames = sum(shard['frames'] for shard in result['shards'])
+        elapsed = result['elapsed']
+        lines = [f"frames: {frames}, elapsed: {elapsed:.2f}s, throughput: {frames / elapsed if elapsed else 0:.1f} fps, "
+                 f"shards done: {sum(shard['done'] for shard in result['shards'])}/{len(result['shards'])}"]
+        tools: Dict[str, List[float]] = dict()
+        for shard in result['shards']:
+            for name, (calls, seconds) in shard['tools'].items():
+                total = tools.setdefault(name, [0, 0.0])
+                total[0] += calls
+                total[1] += seconds
+        if tools:
+            lines.append(f"{'stage':<32} {'calls':>10} {'total s':>10} {'mean ms':>10}")
+            for name, (calls, seconds) in sorted(tools.items(), key=lambda item: -item[1][1]):
+                lines.append(f'{name[:32]:<32} {calls:>10} {seconds:>10.3f} {1000 * seconds / calls:>10.3f}')
+        return '\n'.join(lines)
@@ -0,0 +1,267 @@
+from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import os
+
+from epta.core import metrics
+
+
+class HostedPipeline:
+    """
+    Scheduling state of a single pipeline inside :class:`~epta.runtime.host.PipelineHost`.
+
+    Args:
+        tool (Tool): top-level pipeline tool.
+        name (str): unique pipeline name.
+
+    Keyword Args:
+        priority (float): higher priority pipelines are started first.
+        rate (float): target runs per second. ``None`` to run as often as possible.
+        args (tuple): args to pass to the tool on every run.
+        kwargs (dict): kwargs to pass to the tool on every run.
+    """
+
+    def __init__(self, tool: 'Tool', name: str, priority: float = 0, rate: float = None,
+                 args: tuple = None, kwargs: dict = None):
+        self.tool = tool
+        self.name = name
+        self.priority = priority
+        self.period = 1.0 / rate if rate else 0.0
+        self.args = args or tuple()
+        self.kwargs = kwargs or dict()
+
+        self.paused = False
+        self.running = False
+        self.next_due = 0.0
+        self.pending_updates = list()
+
+        self.runs = 0
+        self.errors = 0
+        self.late = 0  # runs started more than a period after they were due
+        self.busy_time = 0.0
+        self.max_latency = 0.0
+        self.last_result = None
+        self.last_error = None
+        self.started_at = None
+
+    @property
+    def rate(self) -> Optional[float]:
+        return 1.0 / self.period if self.period else None
+
+    def effective_priority(self, now: float, aging: float) -> float:
+        # the longer a due pipeline waits, the higher it goes. Protects low priorities from starvation.
+        return self.priority + aging * (now - self.next_due)
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        active = (now - self.started_at) if self.started_at is not None else 0.0
+        return {
+            'runs': self.runs,
+            'errors': self.errors,
+            'late': self.late,
+            'paused': self.paused,
+            'priority': self.priority,
+            'target_rate': self.rate,
+            'rate': self.runs / active if active > 0 else 0.0,
+            'mean_latency': self.busy_time / self.runs if self.runs else 0.0,
+            'max_latency': self.max_latency,
+        }
+
+
+class PipelineHost:
+    """
+    Runs many independent pipelines on a fixed-size thread pool.
+    Each pipeline runs at most once at a time at its target rate. If more pipelines are due than there are workers,
+    they are started by priority, aged by the time they already wait.
+    ``update`` of a pipeline is never called concurrently with its ``use``: updates are queued and applied
+    right before the next run.
+
+    While a :class:`~epta.core.metrics.MetricsRegistry` is enabled, reports the gauges ``host_queue_depth``
+    (due pipelines waiting for a worker) and ``host_running``, labelled with the host ``name``.
+
+    Keyword Args:
+        workers (int): number of worker threads. Defaults to the number of cpus.
+        aging (float): priority gained per second of waiting after the pipeline was due.
+        name (str): host name in metrics.
+    """
+
+    def __init__(self, workers: int = None, aging: float = 1.0, name: str = 'PipelineHost'):
+        self.workers = workers or os.cpu_count() or 1
+        self.aging = aging
+        self.name = name
+        self._pipelines: Dict[str, HostedPipeline] = dict()
+        self._condition = threading.Condition()
+        self._executor = None
+        self._dispatcher = None
+        self._running = 0
+        self._stopped = True
+        self._started_at = None
+
+    def add(self, tool: 'Tool', name: str = None, **kwargs) -> HostedPipeline:
+        name = name or tool.name
+        with self._condition:
+            if name in self._pipelines:
+                raise KeyError(f'Pipeline {name} is already hosted')
+            pipeline = HostedPipeline(tool, name, **kwargs)
+            if not self._stopped:
+                pipeline.started_at = pipeline.next_due = time.perf_counter()
+            self._pipelines[name] = pipeline
+            self._condition.notify_all()
+        return pipeline
+
+    def remove(self, name: str) -> HostedPipeline:
+        with self._condition:
+            return self._pipelines.pop(name)
+
+    def __getitem__(self, name: str) -> HostedPipeline:
+        return self._pipelines[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._pipelines
+
+    def __len__(self) -> int:
+        return len(self._pipelines)
+
+    def update(self, name: str, *args, **kwargs):
+        """
+        Queue ``tool.update(*args, **kwargs)`` to be called before the next run of the pipeline.
+        """
+        with self._condition:
+            self._pipelines[name].pending_updates.append((args, kwargs))
+
+    def pause(self, name: str):
+        with self._condition:
+            self._pipelines[name].paused = True
+
+    def resume(self, name: str, *args, **kwargs):
+        """
+        Resume the pipeline. It is updated with the given ``args`` and ``kwargs`` before the next run.
+        """
+        with self._condition:
+            pipeline = self._pipelines[name]
+            pipeline.pending_updates.append((args, kwargs))
+            pipeline.paused = False
+            pipeline.next_due = time.perf_counter()
+            self._condition.notify_all()
+
+    def start(self):
+        with self._condition:
+            if not self._stopped:
+                return
+            self._stopped = False
+            self._started_at = now = time.perf_counter()
+            for pipeline in self._pipelines.values():
+                pipeline.started_at = now
+                pipeline.next_due = now
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='epta_host')
+        self._dispatcher = threading.Thread(target=self._dispatch, name='epta_host_dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    def stop(self, wait: bool = True):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+            self._dispatcher = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def run(self, duration: float):
+        """
+        Blocking run for ``duration`` seconds.
+        """
+        self.start()
+        try:
+            time.sleep(duration)
+        finally:
+            self.stop()
+
+    def __enter__(self) -> 'PipelineHost':
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
+
+    def _select(self, now: float) -> Optional[HostedPipeline]:
+        selected, selected_priority = None, None
+        for pipeline in self._pipelines.values():
+            if pipeline.paused or pipeline.running or pipeline.next_due > now:
+                continue
+            priority = pipeline.effective_priority(now, self.aging)
+            if selected is None or priority > selected_priority:
+                selected, selected_priority = pipeline, priority
+        return selected
+
+    def _next_wakeup(self, now: float) -> Optional[float]:
+        due = [p.next_due for p in self._pipelines.values() if not (p.paused or p.running)]
+        if not due:
+            return None
+        return max(min(due) - now, 0.0)
+
+    def _report(self, now: float):
+        waiting = sum(1 for p in self._pipelines.values()
+                      if not (p.paused or p.running) and p.next_due <= now)
+        metrics.gauge('host_queue_depth', waiting, host=self.name)
+        metrics.gauge('host_running', self._running, host=self.name)
+
+    def _dispatch(self):
+        with self._condition:
+            while not self._stopped:
+                now = time.perf_counter()
+                if metrics.enabled():
+                    self._report(now)
+                pipeline = self._select(now) if self._running < self.workers else None
+                if pipeline is None:
+                    timeout = self._next_wakeup(now) if self._running < self.workers else None
+                    self._condition.wait(timeout)
+                    continue
+                pipeline.running = True
+                self._running += 1
+                if pipeline.period and now - pipeline.next_due > pipeline.period:
+                    pipeline.late += 1
+                updates, pipeline.pending_updates = pipeline.pending_updates, list()
+                self._executor.submit(self._run_pipeline, pipeline, updates)
+
+    def _run_pipeline(self, pipeline: HostedPipeline, updates: list):
+        start = time.perf_counter()
+        try:
+            for args, kwargs in updates:
+                pipeline.tool.update(*args, **kwargs)
+            pipeline.last_result = pipeline.tool(*pipeline.args, **pipeline.kwargs)
+        except Exception as e:
+            pipeline.errors += 1
+            pipeline.last_error = e
+        end = time.perf_counter()
+        latency = end - start
+
+        with self._condition:
+            pipeline.runs += 1
+            pipeline.busy_time += latency
+            pipeline.max_latency = max(pipeline.max_latency, latency)
+            # do not accumulate a backlog if the pipeline is slower than its rate.
+            pipeline.next_due = max(start + pipeline.period, end) if pipeline.period else end
+            pipeline.running = False
+            self._running -= 1
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-pipeline and aggregate throughput statistics.
+        """
+        with self._condition:
+            now = time.perf_counter()
+            pipelines = {name: pipeline.stats(now) for name, pipeline in self._pipelines.items()}
+            elapsed = (now - self._started_at) if self._started_at is not None else 0.0
+            runs = sum(p['runs'] for p in pipelines.values())
+            busy = sum(p.busy_time for p in self._pipelines.values())
+            return {
+                'pipelines': pipelines,
+                'runs': runs,
+                'errors': sum(p['errors'] for p in pipelines.values()),
+                'throughput': runs / elapsed if elapsed > 0 else 0.0,
+                'utilization': busy / (elapsed * self.workers) if elapsed > 0 else 0.0,
+                'workers': self.workers,
+            }
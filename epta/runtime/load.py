@@ -0,0 +1,164 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import time
+import numpy as np
+
+from epta.core.base_ops import Variable
+from .host import HostedPipeline, PipelineHost
+
+
+class _Probe(Variable):
+    """
+    Hooks a frame and runs the stream pipeline on it, recording latency and thread cpu time of every run.
+    Latency is counted from the time the frame was due on the host, so time spent waiting for a worker is included.
+    """
+
+    def __init__(self, hooker: 'Tool', tool: 'Tool', name: str = 'Probe', **kwargs):
+        super(_Probe, self).__init__(tool=tool, name=name, **kwargs)
+        self.hooker = hooker
+        self.pipeline: Optional[HostedPipeline] = None
+        self.latencies: List[float] = list()
+        self.cpu = 0.0
+
+    def reset(self):
+        self.latencies = list()
+        self.cpu = 0.0
+
+    def use(self, *args, **kwargs) -> Any:
+        due = self.pipeline.next_due if self.pipeline is not None else time.perf_counter()
+        cpu_start = time.thread_time()
+        result = self.tool(self.hooker())
+        self.latencies.append(time.perf_counter() - due)
+        self.cpu += time.thread_time() - cpu_start
+        return result
+
+
+class LoadGenerator:
+    """
+    Load test of a pipeline: runs ``streams`` copies of it on a :class:`~epta.runtime.host.PipelineHost`,
+    each fed by its own synthetic image hooker at a target ``rate``, and ramps the number of streams step by step.
+    Every step reports achieved fps, latency percentiles, dropped frames and cpu per stream.
+    The ramp stops at the knee: the first step that misses the latency target or drops too many frames.
+
+    Args:
+        factory (callable): returns a new pipeline tool taking a frame. Called once per stream.
+
+    Keyword Args:
+        streams (Iterable[int]): numbers of concurrent streams to ramp through.
+        rates (Iterable[float]): target fps per stream. The streams are ramped for every rate.
+        duration (float): measured seconds per step.
+        warmup (float): seconds per step before measuring.
+        latency_target (float): seconds the ``percentile`` latency must stay under. Defaults to the frame period.
+        percentile (float): latency percentile checked against the target.
+        max_drop_ratio (float): largest fraction of frames that may be dropped.
+        workers (int): host worker threads. Defaults to the number of cpus.
+        hooker_kwargs (dict): kwargs of :class:`~epta.tools.hookers.image_hookers.SyntheticImageHooker`,
+            e.g. frame ``shape``.
+    """
+
+    def __init__(self, factory: Callable[[], 'Tool'], streams: Iterable[int] = (1, 2, 4, 8, 16, 32),
+                 rates: Iterable[float] = (30.0,), duration: float = 5.0, warmup: float = 1.0,
+                 latency_target: Optional[float] = None, percentile: float = 95.0, max_drop_ratio: float = 0.01,
+                 workers: int = None, hooker_kwargs: dict = None):
+        self.factory = factory
+        self.streams = sorted(set(streams))
+        self.rates = list(rates)
+        self.duration = duration
+        self.warmup = warmup
+        self.latency_target = latency_target
+        self.percentile = percentile
+        self.max_drop_ratio = max_drop_ratio
+        self.workers = workers
+        self.hooker_kwargs = hooker_kwargs or dict()
+
+    def run_step(self, streams: int, rate: float) -> Dict[str, Any]:
+        """
+        Run ``streams`` streams at ``rate`` fps each and measure them.
+        """
+        from epta.tools.hookers.image_hookers import SyntheticImageHooker
+
+        probes = [_Probe(SyntheticImageHooker(seed=i, **self.hooker_kwargs), self.factory(), name=f'stream_{i}')
+                  for i in range(streams)]
+        host = PipelineHost(workers=self.workers)
+        for probe in probes:
+            probe.pipeline = host.add(probe, rate=rate)
+        host.start()
+        try:
+            time.sleep(self.warmup)
+            for probe in probes:
+                probe.reset()
+            warmup_errors = host.stats()['errors']
+            process_start, start = time.process_time(), time.perf_counter()
+            time.sleep(self.duration)
+            elapsed = time.perf_counter() - start
+            process_cpu = time.process_time() - process_start
+            latencies = np.array([latency for probe in probes for latency in list(probe.latencies)])
+            cpu = sum(probe.cpu for probe in probes)
+            errors = host.stats()['errors'] - warmup_errors
+        finally:
+            host.stop()
+
+        expected = streams * rate * elapsed
+        frames = len(latencies)
+        dropped = max(int(round(expected - frames)), 0)
+        target = self.latency_target if self.latency_target is not None else 1.0 / rate
+        p50, p95, p99, tail = (np.percentile(latencies, [50, 95, 99, self.percentile]) if frames
+                               else (float('inf'),) * 4)
+        drop_ratio = dropped / expected if expected else 0.0
+        return {
+            'streams': streams,
+            'rate': rate,
+            'fps': frames / elapsed,
+            'fps_per_stream': frames / elapsed / streams,
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'dropped': dropped,
+            'drop_ratio': drop_ratio,
+            'cpu_per_stream': cpu / elapsed / streams,  # cores
+            'process_cpu': process_cpu / elapsed,  # cores, including the host and hookers
+            'errors': errors,
+            'ok': bool(frames) and not errors and tail <= target and drop_ratio <= self.max_drop_ratio,
+        }
+
+    def run(self, log: Callable[[str], Any] = None) -> Dict[float, Dict[str, Any]]:
+        """
+        Ramp every rate up to its knee.
+
+        Args:
+            log (callable): called with a line per finished step, e.g. ``print``.
+
+        Returns:
+            rate -> ``{'steps': [...], 'knee': first failed step or None, 'capacity': streams of the last good step}``.
+        """
+        results = dict()
+        for rate in self.rates:
+            steps = list()
+            knee = None
+            for streams in self.streams:
+                step = self.run_step(streams, rate)
+                steps.append(step)
+                if log is not None:
+                    log(self.format_step(step))
+                if not step['ok']:
+                    knee = step
+                    break
+            good = [step['streams'] for step in steps if step['ok']]
+            results[rate] = {'steps': steps, 'knee': knee, 'capacity': good[-1] if good else 0}
+        return results
+
+    @staticmethod
+    def format_step(step: Dict[str, Any]) -> str:
+        return (f"{step['streams']:>4} x {step['rate']:>6.1f} fps: {step['fps']:>8.1f} fps "
+                f"({step['fps_per_stream']:.1f}/stream), p50 {1000 * step['p50']:.1f} ms, "
+                f"p95 {1000 * step['p95']:.1f} ms, p99 {1000 * step['p99']:.1f} ms, dropped {step['dropped']} "
+                f"({100 * step['drop_ratio']:.1f}%), cpu {step['cpu_per_stream']:.2f} cores/stream"
+                f"{'' if step['ok'] else '  <- knee'}")
+
+    @classmethod
+    def report(cls, results: Dict[float, Dict[str, Any]]) -> str:
+        lines = list()
+        for rate, result in results.items():
+            lines.append(f"rate {rate} fps: capacity {result['capacity']} streams"
+                         f"{'' if result['knee'] else ' (no knee reached)'}")
+            lines.extend(cls.format_step(step) for step in result['steps'])
+        return '\n'.join(lines)
@@ -0,0 +1,354 @@
+from typing import Any, Callable, Dict, List, Tuple, Union
+from concurrent.futures import Future
+import multiprocessing
+import itertools
+import threading
+import pickle
+import socket
+import struct
+
+from epta.core import Tool
+
+# request id, number of out-of-band buffers, payload length
+_HEADER = struct.Struct('!QIQ')
+
+Address = Union[Tuple[str, int], str]
+
+
+def _send_frame(sock: socket.socket, request_id: int, obj: Any):
+    """
+    Frame: header, buffer lengths, pickled object skeleton, raw buffers.
+    Contiguous arrays are not copied into the pickle, their memory is sent as is.
+    """
+    buffers = list()
+    payload = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+    parts = [
+        _HEADER.pack(request_id, len(raws), len(payload)),
+        struct.pack(f'!{len(raws)}Q', *(raw.nbytes for raw in raws)),
+        payload,
+        *raws,
+    ]
+    if hasattr(sock, 'sendmsg'):
+        total = sum(memoryview(part).nbytes for part in parts)
+        sent = sock.sendmsg(parts)
+        if sent < total:
+            # partial scatter-gather write, send the rest sequentially.
+            data = memoryview(b''.join(parts))
+            sock.sendall(data[sent:])
+    else:
+        for part in parts:
+            sock.sendall(part)
+
+
+def _recv_into(sock: socket.socket, view: memoryview):
+    while view.nbytes:
+        received = sock.recv_into(view)
+        if not received:
+            raise ConnectionError('Connection closed')
+        view = view[received:]
+
+
+def _recv_raw(sock: socket.socket) -> Tuple[int, bytearray, List[bytearray]]:
+    header = bytearray(_HEADER.size)
+    _recv_into(sock, memoryview(header))
+    request_id, n_buffers, payload_size = _HEADER.unpack(header)
+
+    lengths = bytearray(8 * n_buffers)
+    _recv_into(sock, memoryview(lengths))
+    payload = bytearray(payload_size)
+    _recv_into(sock, memoryview(payload))
+    # received arrays are backed by these buffers, no extra copy
+    buffers = list()
+    for length in struct.unpack(f'!{n_buffers}Q', lengths):
+        buffer = bytearray(length)
+        _recv_into(sock, memoryview(buffer))
+        buffers.append(buffer)
+    return request_id, payload, buffers
+
+
+def _recv_frame(sock: socket.socket) -> Tuple[int, Any]:
+    request_id, payload, buffers = _recv_raw(sock)
+    return request_id, pickle.loads(payload, buffers=buffers)
+
+
+def _make_socket(address: Address) -> socket.socket:
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    return socket.socket(family, socket.SOCK_STREAM)
+
+
+class ToolServer:
+    """
+    Serves a tool over TCP (``(host, port)`` address) or Unix socket (path address).
+    Each connection is handled by its own thread, requests of a connection are answered in order.
+    Messages are pickled, use it only between trusted hosts.
+
+    Args:
+        tool (Tool): tool to serve.
+        address (tuple, str): address to bind. Port ``0`` picks a free port, see :attr:`address`.
+
+    Keyword Args:
+        concurrent (bool): if False, tool calls from different connections are serialized.
+    """
+
+    def __init__(self, tool: 'Tool', address: Address = ('127.0.0.1', 0), concurrent: bool = False):
+        self.tool = tool
+        self._lock = threading.Lock() if not concurrent else None
+        self._socket = _make_socket(address)
+        if not isinstance(address, str):
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(address)
+        self._socket.listen()
+        self.address = self._socket.getsockname()
+        self._closed = threading.Event()
+
+    def _call(self, method: str, args: tuple, kwargs: dict) -> Any:
+        if method == 'use':
+            return self.tool(*args, **kwargs)
+        elif method == 'update':
+            return self.tool.update(*args, **kwargs)
+        raise ValueError(f'Unknown method {method}')
+
+    def _handle(self, connection: socket.socket):
+        with connection:
+            while not self._closed.is_set():
+                try:
+                    request_id, (method, args, kwargs) = _recv_frame(connection)
+                except (ConnectionError, OSError):
+                    return
+                try:
+                    if self._lock is not None:
+                        with self._lock:
+                            response = (True, self._call(method, args, kwargs))
+                    else:
+                        response = (True, self._call(method, args, kwargs))
+                except Exception as e:
+                    response = (False, e)
+                if not self._respond(connection, request_id, response):
+                    return
+
+    @staticmethod
+    def _respond(connection: socket.socket, request_id: int, response: Tuple[bool, Any]) -> bool:
+        # the response is pickled before anything is sent: on a serialization error the client gets that error
+        try:
+            _send_frame(connection, request_id, response)
+        except (ConnectionError, OSError):
+            return False
+        except Exception as e:
+            try:
+                _send_frame(connection, request_id, (False, e))
+            except (ConnectionError, OSError):
+                return False
+            except Exception:
+                _send_frame(connection, request_id, (False, pickle.PicklingError(repr(e))))
+        return True
+
+    def serve_forever(self):
+        while not self._closed.is_set():
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                break
+            if connection.family != getattr(socket, 'AF_UNIX', None):
+                connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._handle, args=(connection,), daemon=True).start()
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name='epta_tool_server', daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        self._closed.set()
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+
+    @classmethod
+    def spawn(cls, factory: Callable[[], 'Tool'], address: Address = ('127.0.0.1', 0),
+              **kwargs) -> Tuple[multiprocessing.Process, Address]:
+        """
+        Serve ``factory()`` in a new local worker process.
+
+        Returns:
+            (process, address): worker process and the address it listens on.
+        """
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_serve_worker, args=(factory, address, sender, kwargs), daemon=True)
+        process.start()
+        sender.close()
+        address = receiver.recv()
+        receiver.close()
+        return process, address
+
+
+def _serve_worker(factory: Callable[[], 'Tool'], address: Address, sender, kwargs: dict):
+    server = ToolServer(factory(), address, **kwargs)
+    sender.send(server.address)
+    sender.close()
+    server.serve_forever()
+
+
+class _Connection:
+    """
+    Client connection. Requests are pipelined: many can be sent before the responses are read.
+    Responses are read by a background thread and resolve the pending futures.
+    """
+
+    def __init__(self, address: Address, timeout: float = None):
+        if isinstance(address, str):
+            self._socket = _make_socket(address)
+            self._socket.settimeout(timeout)
+            self._socket.connect(address)
+        else:
+            self._socket = socket.create_connection(address, timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.settimeout(None)
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = dict()
+        self._ids = itertools.count()
+        self.alive = True
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, method: str, args: tuple, kwargs: dict) -> Future:
+        future = Future()
+        with self._send_lock:
+            if not self.alive:
+                raise ConnectionError('Connection closed')
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            try:
+                _send_frame(self._socket, request_id, (method, args, kwargs))
+            except OSError:
+                self._pending.pop(request_id, None)
+                self.close()
+                raise
+        return future
+
+    def discard(self, future: Future):
+        """
+        Forget a request whose result is not awaited any more (e.g. timed out). A late response is dropped.
+        """
+        for request_id, pending in list(self._pending.items()):
+            if pending is future:
+                self._pending.pop(request_id, None)
+
+    def _read(self):
+        try:
+            while True:
+                request_id, payload, buffers = _recv_raw(self._socket)
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                # the frame is read whole: a response that can not be unpickled fails its request only
+                try:
+                    ok, value = pickle.loads(payload, buffers=buffers)
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        except Exception as e:
+            error = e
+        self.alive = False
+        for future in list(self._pending.values()):
+            if not future.done():
+                future.set_exception(ConnectionError(f'Connection lost: {error}'))
+        self._pending.clear()
+
+    def close(self):
+        self.alive = False
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._socket.close()
+
+
+class RemoteTool(Tool):
+    """
+    Proxy to a tool served by :class:`~epta.runtime.remote.ToolServer`. Can be used as any other tool.
+    ``update`` is forwarded to the remote tool.
+
+    Args:
+        address (tuple, str): ``(host, port)`` or Unix socket path of the server.
+
+    Keyword Args:
+        connections (int): size of the connection pool.
+        timeout (float): seconds to wait for a result. ``None`` to wait forever.
+    """
+
+    def __init__(self, address: Address, connections: int = 1, timeout: float = None, name: str = 'RemoteTool',
+                 **kwargs):
+        super(RemoteTool, self).__init__(name=name, **kwargs)
+        self.address = address
+        self.timeout = timeout
+        self._pool: List[Union[_Connection, None]] = [None] * max(connections, 1)
+        self._pool_lock = threading.Lock()
+
+    def _connection(self) -> _Connection:
+        with self._pool_lock:
+            # least loaded live connection, reconnect dead ones.
+            for i, connection in enumerate(self._pool):
+                if connection is None or not connection.alive:
+                    self._pool[i] = _Connection(self.address, self.timeout)
+            return min(self._pool, key=len)
+
+    def _submit(self, method: str, args: tuple, kwargs: dict) -> Tuple[_Connection, Future]:
+        connection = self._connection()
+        return connection, connection.submit(method, args, kwargs)
+
+    def _results(self, requests: List[Tuple[_Connection, Future]]) -> List[Any]:
+        try:
+            return [future.result(self.timeout) for _, future in requests]
+        except TimeoutError:
+            # timed out requests must not stay pending on the pooled connections
+            for connection, future in requests:
+                if not future.done():
+                    connection.discard(future)
+            raise
+
+    def submit(self, *args, **kwargs) -> Future:
+        """
+        Send a request without waiting for the result.
+        """
+        return self._connection().submit('use', args, kwargs)
+
+    def use(self, *args, **kwargs) -> Any:
+        return self._results([self._submit('use', args, kwargs)])[0]
+
+    def map(self, inputs: List[Any], **kwargs) -> List[Any]:
+        """
+        Pipelined ``use`` over ``inputs``: all requests are sent before the results are awaited.
+        """
+        return self._results([self._submit('use', (inp,), kwargs) for inp in inputs])
+
+    def update(self, *args, **kwargs):
+        self._results([self._submit('update', args, kwargs)])
+
+    def close(self):
+        with self._pool_lock:
+            for connection in self._pool:
+                if connection is not None:
+                    connection.close()
+            self._pool = [None] * len(self._pool)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['name'] = self.name  # slot of Tool
+        state['_pool'] = [None] * len(self._pool)
+        del state['_pool_lock']
+        return state
+
+    def __setstate__(self, state: dict):
+        self.name = state.pop('name')
+        self.__dict__.update(state)
+        self._pool_lock = threading.Lock()
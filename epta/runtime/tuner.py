@@ -0,0 +1,268 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from collections.abc import Mapping
+import copy
+import json
+import numpy as np
+
+from epta.core import Tool, ToolDict, Record, Retaining
+from epta.core.base_ops import Concatenate, Parallel, Every
+from epta.core.graph import named_tools, replace
+from epta.core.memory import measure
+
+
+def same(a: Any, b: Any) -> bool:
+    """
+    Deep equality of tool results: arrays, records, mappings, lists and tuples are compared by value.
+    """
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return (isinstance(a, np.ndarray) and isinstance(b, np.ndarray) and a.shape == b.shape
+                and a.dtype == b.dtype and bool(np.array_equal(a, b, equal_nan=a.dtype.kind in 'fc')))
+    if isinstance(a, (Record, Mapping)) and isinstance(b, (Record, Mapping)):
+        return list(a.keys()) == list(b.keys()) and all(same(a[key], b[key]) for key in a.keys())
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return type(a) is type(b) and len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+
+def _freeze(value: Any) -> Any:
+    # results may be reused buffers, keep a copy for later comparisons
+    try:
+        return copy.deepcopy(value)
+    except Exception:
+        return value
+
+
+class _ToolProfile:
+    __slots__ = ('calls', 'time', 'bytes', 'stable', 'last')
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0
+        self.bytes = 0
+        self.stable = 0  # calls returning the same result as the previous one
+        self.last = None
+
+
+class Profiler:
+    """
+    Tool observer recording per tool instance: calls, time, output bytes and how often the result
+    is the same as on the previous call. See :meth:`~epta.core.tool.Tool.add_observer`.
+    """
+
+    def __init__(self):
+        self.tools: Dict[int, _ToolProfile] = dict()
+
+    def observe(self, tool: 'Tool', elapsed: float, result: Any, error: Optional[Exception]):
+        profile = self.tools.get(id(tool))
+        if profile is None:
+            profile = self.tools[id(tool)] = _ToolProfile()
+        if profile.calls and error is None and same(result, profile.last):
+            profile.stable += 1
+        profile.calls += 1
+        profile.time += elapsed
+        profile.bytes += measure(result)[0]
+        profile.last = _freeze(result) if error is None else None
+
+    def summary(self, paths: Iterable[Tuple[str, 'Tool']]) -> Dict[str, Dict[str, Any]]:
+        summary = dict()
+        for path, tool in paths:
+            profile = self.tools.get(id(tool))
+            if profile is None or not profile.calls:
+                continue
+            summary[path] = {
+                'type': type(tool).__name__,
+                'name': tool.name,
+                'calls': profile.calls,
+                'mean': profile.time / profile.calls,
+                'bytes': profile.bytes // profile.calls,
+                'stability': profile.stable / (profile.calls - 1) if profile.calls > 1 else 0.0,
+            }
+        return summary
+
+
+class Tuning:
+    """
+    Execution settings per tool of a pipeline, addressed by graph paths
+    (see :func:`~epta.core.graph.named_tools`). Apply it to every new instance of the pipeline.
+
+    Args:
+        nodes (dict): path -> ``{'type', 'name'}`` of the tool and settings:
+            ``threaded`` (fan-out nodes), ``batch_size`` (:class:`~epta.core.base_ops.Parallel`),
+            ``cache_frames`` (wrap into :class:`~epta.core.base_ops.Every`).
+        profile (dict): profile the tuning was made from, for reference.
+    """
+
+    def __init__(self, nodes: Dict[str, Dict[str, Any]] = None, profile: Dict[str, Dict[str, Any]] = None):
+        self.nodes = nodes or dict()
+        self.profile = profile or dict()
+
+    def with_node(self, path: str, tool: 'Tool', **settings) -> 'Tuning':
+        nodes = copy.deepcopy(self.nodes)
+        nodes.setdefault(path, {'type': type(tool).__name__, 'name': tool.name}).update(settings)
+        return Tuning(nodes, self.profile)
+
+    def without(self, setting: str, paths: Iterable[str] = None) -> 'Tuning':
+        paths = set(self.nodes if paths is None else paths)
+        nodes = dict()
+        for path, node in self.nodes.items():
+            node = {key: value for key, value in node.items() if not (key == setting and path in paths)}
+            if set(node) - {'type', 'name'}:
+                nodes[path] = node
+        return Tuning(nodes, self.profile)
+
+    def paths_with(self, setting: str) -> List[str]:
+        return [path for path, node in self.nodes.items() if setting in node]
+
+    def apply(self, pipeline: 'Tool') -> List[str]:
+        """
+        Configure ``pipeline`` in place. The root tool is never replaced.
+        Returns paths that were not applied because the pipeline has changed.
+        """
+        tools = dict(named_tools(pipeline))
+        skipped = list()
+        caches = list()
+        for path, node in self.nodes.items():
+            tool = tools.get(path)
+            if tool is None or type(tool).__name__ != node['type'] or tool.name != node['name']:
+                skipped.append(path)
+                continue
+            if 'threaded' in node:
+                tool.threaded = node['threaded']
+            if 'batch_size' in node:
+                tool.batch_size = node['batch_size']
+            if 'cache_frames' in node and tool is not pipeline:
+                caches.append((tool, node['cache_frames']))
+        for tool, frames in caches:
+            # same name: kwargs routed by name still reach the tool
+            replace(pipeline, tool, Every(tool, frames=frames, name=tool.name))
+        return skipped
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'nodes': self.nodes, 'profile': self.profile}
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, path: str) -> 'Tuning':
+        with open(path) as f:
+            data = json.load(f)
+        return cls(data.get('nodes'), data.get('profile'))
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(nodes={self.nodes})"
+
+
+class AutoTuner:
+    """
+    Profile-guided tuning of a pipeline. Runs fresh pipelines from ``factory`` over ``samples`` and picks:
+
+    * serial or threaded execution per fan-out node (:class:`~epta.core.base_ops.Concatenate`,
+      :class:`~epta.core.tool_dict.ToolDict`), kept only if the node gets faster;
+    * the batch size of threaded :class:`~epta.core.base_ops.Parallel` nodes;
+    * result caching (:class:`~epta.core.base_ops.Every`) of costly tools whose result was the same on every sample.
+
+    Every choice is verified: the tuned pipeline must return the same results on the samples as the original one,
+    otherwise the offending settings are dropped. Samples should be consecutive frames representative of the
+    workload: caching trusts that a result stable over them stays stable.
+
+    Args:
+        factory (callable): returns a new pipeline tool.
+        samples (Sequence): inputs, the pipeline is called with each of them.
+
+    Keyword Args:
+        min_cost (float): mean seconds per call below which a tool is not worth tuning.
+        min_gain (float): fraction of the time a setting must save to be kept.
+        cache_frames (int): frames a cached result is reused for.
+        batch_sizes (Iterable[int]): batch sizes tried for :class:`~epta.core.base_ops.Parallel`.
+    """
+
+    def __init__(self, factory: Callable[[], 'Tool'], samples: Sequence[Any], min_cost: float = 1e-3,
+                 min_gain: float = 0.1, cache_frames: int = 4, batch_sizes: Iterable[int] = (1, 2, 4, 8, 16)):
+        self.factory = factory
+        self.samples = list(samples)
+        self.min_cost = min_cost
+        self.min_gain = min_gain
+        self.cache_frames = cache_frames
+        self.batch_sizes = tuple(batch_sizes)
+
+    def run(self, tuning: 'Tuning' = None) -> Tuple[List[Any], Dict[str, Dict[str, Any]]]:
+        """
+        Results on the samples and the profile of a fresh pipeline with ``tuning`` applied.
+        """
+        pipeline = self.factory()
+        if tuning is not None:
+            tuning.apply(pipeline)
+        pipeline.update()
+        profiler = Profiler()
+        Tool.add_observer(profiler)
+        try:
+            results = [_freeze(pipeline(sample)) for sample in self.samples]
+        finally:
+            Tool.remove_observer(profiler)
+        return results, profiler.summary(named_tools(pipeline))
+
+    def verify(self, tuning: 'Tuning', expected: List[Any]) -> bool:
+        results, _ = self.run(tuning)
+        return same(results, expected)
+
+    @staticmethod
+    def _is_fan_out(tool: 'Tool') -> bool:
+        if isinstance(tool, Concatenate):
+            return len(tool.tools) > 1
+        if isinstance(tool, ToolDict):
+            return tool._use_behaviour in ('dict', 'concatenate') and len(tool) > 1 and type(tool).use is ToolDict.use
+        return False
+
+    def _faster(self, base: Dict[str, Any], trial: Optional[Dict[str, Any]]) -> bool:
+        return trial is not None and trial['mean'] < base['mean'] * (1 - self.min_gain)
+
+    def tune(self) -> 'Tuning':
+        expected, profile = self.run()
+        tools = dict(named_tools(self.factory()))
+        tuning = Tuning(profile=profile)
+
+        for path, stats in profile.items():
+            tool = tools.get(path)
+            if tool is None or stats['mean'] < self.min_cost:
+                continue
+            if self._is_fan_out(tool):
+                _, trial = self.run(Tuning().with_node(path, tool, threaded=True))
+                if self._faster(stats, trial.get(path)):
+                    tuning = tuning.with_node(path, tool, threaded=True)
+            elif isinstance(tool, Parallel):
+                best, best_stats = None, stats
+                for batch_size in self.batch_sizes:
+                    _, trial = self.run(Tuning().with_node(path, tool, batch_size=batch_size))
+                    if self._faster(best_stats, trial.get(path)):
+                        best, best_stats = batch_size, trial[path]
+                if best is not None:
+                    tuning = tuning.with_node(path, tool, batch_size=best)
+
+        cached: List[str] = list()
+        for path, stats in profile.items():
+            tool = tools.get(path)
+            if (tool is None or path == '' or isinstance(tool, Retaining) or stats['mean'] < self.min_cost
+                    or stats['calls'] != len(self.samples) or stats['stability'] < 1.0
+                    or any(path.startswith(parent + '.') for parent in cached)):
+                continue
+            cached.append(path)
+            tuning = tuning.with_node(path, tool, cache_frames=self.cache_frames)
+
+        if self.verify(tuning, expected):
+            return tuning
+        # keep only settings that are right on their own
+        strategies = tuning.without('cache_frames')
+        if not self.verify(strategies, expected):
+            strategies = Tuning(profile=profile)
+        for path in tuning.paths_with('cache_frames'):
+            trial = strategies.with_node(path, tools[path], cache_frames=self.cache_frames)
+            if self.verify(trial, expected):
+                strategies = trial
+        if self.verify(strategies, expected):
+            return strategies
+        return strategies.without('cache_frames')
@@ -1,6 +1,5 @@
 from .wrapper import ToolWrapper, PositionMapperWrapper
 from .cropper import Cropper
 from . position_cropper import PositionCropper
-
-
-
+from .integral import IntegralImage, Integral, RegionStatistics
+from .pyramid import FramePyramid, Pyramid, PyramidCropper
@@ -0,0 +1,164 @@
+from typing import Iterable, List, Optional, Union
+import numpy as np
+import cv2 as cv
+
+from epta.core import Tool, PositionDependent
+
+
+def _integral(image: 'np.ndarray', square: bool = False) -> Union['np.ndarray', tuple]:
+    if image.ndim == 2:
+        image = image[..., None]
+    if image.shape[2] <= 4:
+        if square:
+            table, square_table = cv.integral2(image, sdepth=cv.CV_64F, sqdepth=cv.CV_64F)
+            return table.reshape(*table.shape[:2], -1), square_table.reshape(*square_table.shape[:2], -1)
+        table = cv.integral(image, sdepth=cv.CV_64F)
+        return table.reshape(*table.shape[:2], -1)
+
+    # opencv handles up to 4 channels
+    def table_of(data):
+        table = np.zeros((data.shape[0] + 1, data.shape[1] + 1, data.shape[2]), dtype=np.float64)
+        np.cumsum(data, axis=0, dtype=np.float64, out=table[1:, 1:])
+        np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+        return table
+
+    if square:
+        image = image.astype(np.float64)
+        return table_of(image), table_of(image * image)
+    return table_of(image)
+
+
+class IntegralImage:
+    """
+    Summed-area tables of an image. Any rectangle sum is 4 lookups, so queries cost O(1) per region
+    regardless of its size. Rectangles are ``(N, 4)`` arrays of ``(x0, y0, x1, y1)``;
+    negative ends mean "up to the image border", as ``None`` ends of crops do.
+
+    Args:
+        image (np.ndarray): ``(H, W)`` or ``(H, W, C)`` image.
+
+    Keyword Args:
+        squares (bool): also build the table of squares for :meth:`variance`.
+        thresholds (Iterable[float]): build tables of ``image > threshold`` for :meth:`count`.
+    """
+
+    def __init__(self, image: 'np.ndarray', squares: bool = False, thresholds: Iterable[float] = None):
+        self.height, self.width = image.shape[:2]
+        if squares:
+            self.table, self.square_table = _integral(image, square=True)
+        else:
+            self.table, self.square_table = _integral(image), None
+        self.count_tables = dict()
+        for threshold in (thresholds or tuple()):
+            self.count_tables[threshold] = _integral((image > threshold).astype(np.uint8))
+
+    def _clip(self, rects: 'np.ndarray') -> tuple:
+        rects = np.asarray(rects, dtype=np.intp).reshape(-1, 4)
+        x0, y0, x1, y1 = rects.T
+        x1 = np.where(x1 < 0, self.width, x1)
+        y1 = np.where(y1 < 0, self.height, y1)
+        x0, x1 = np.clip(x0, 0, self.width), np.clip(x1, 0, self.width)
+        y0, y1 = np.clip(y0, 0, self.height), np.clip(y1, 0, self.height)
+        return x0, y0, np.maximum(x1, x0), np.maximum(y1, y0)
+
+    @staticmethod
+    def _lookup(table: 'np.ndarray', x0, y0, x1, y1) -> 'np.ndarray':
+        return table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0]
+
+    def area(self, rects: 'np.ndarray') -> 'np.ndarray':
+        """
+        ``(N,)`` pixel count of each rectangle.
+        """
+        x0, y0, x1, y1 = self._clip(rects)
+        return (x1 - x0) * (y1 - y0)
+
+    def sum(self, rects: 'np.ndarray') -> 'np.ndarray':
+        """
+        ``(N, C)`` per-channel sums.
+        """
+        return self._lookup(self.table, *self._clip(rects))
+
+    def mean(self, rects: 'np.ndarray') -> 'np.ndarray':
+        """
+        ``(N, C)`` per-channel means. ``nan`` for empty rectangles.
+        """
+        x0, y0, x1, y1 = clipped = self._clip(rects)
+        area = ((x1 - x0) * (y1 - y0))[:, None].astype(np.float64)
+        return np.divide(self._lookup(self.table, *clipped), area, out=np.full((len(area), self.table.shape[2]),
+                                                                               np.nan), where=area > 0)
+
+    def variance(self, rects: 'np.ndarray') -> 'np.ndarray':
+        """
+        ``(N, C)`` per-channel variances. Requires ``squares=True``.
+        """
+        if self.square_table is None:
+            raise ValueError('IntegralImage was built without squares')
+        x0, y0, x1, y1 = clipped = self._clip(rects)
+        area = ((x1 - x0) * (y1 - y0))[:, None].astype(np.float64)
+        out = np.full((len(area), self.table.shape[2]), np.nan)
+        mean = np.divide(self._lookup(self.table, *clipped), area, out=out.copy(), where=area > 0)
+        square_mean = np.divide(self._lookup(self.square_table, *clipped), area, out=out, where=area > 0)
+        return np.maximum(square_mean - mean * mean, 0.0)
+
+    def count(self, rects: 'np.ndarray', threshold: float) -> 'np.ndarray':
+        """
+        ``(N, C)`` per-channel counts of pixels above ``threshold``. The threshold must be built.
+        """
+        return self._lookup(self.count_tables[threshold], *self._clip(rects)).astype(np.int64)
+
+
+class Integral(Tool):
+    """
+    Build :class:`~epta.tools.base.integral.IntegralImage` of the input image. Use it once per frame
+    and share the result between :class:`~epta.tools.base.integral.RegionStatistics` tools.
+
+    Keyword Args:
+        squares (bool): build the table of squares for variance queries.
+        thresholds (Iterable[float]): build thresholded tables for count queries.
+    """
+
+    def __init__(self, squares: bool = False, thresholds: Iterable[float] = None, name: str = 'Integral', **kwargs):
+        super(Integral, self).__init__(name=name, **kwargs)
+        self.squares = squares
+        self.thresholds = tuple(thresholds or tuple())
+
+    def use(self, image: 'np.ndarray', **kwargs) -> IntegralImage:
+        return IntegralImage(image, squares=self.squares, thresholds=self.thresholds)
+
+
+class RegionStatistics(PositionDependent):
+    """
+    Statistic of many regions from the :attr:`position_manager` in one vectorized call.
+    Takes :class:`~epta.tools.base.integral.IntegralImage` and returns ``(N, C)`` array ordered as :attr:`keys`.
+
+    Args:
+        position_manager (ToolDict): a mapping tool dictionary.
+        keys (list): keys of the regions in the :attr:`position_manager`.
+
+    Keyword Args:
+        statistic (str): one of ``'sum'``, ``'mean'``, ``'variance'``, ``'count'``, ``'area'``.
+        threshold (float): threshold for ``'count'``.
+    """
+
+    def __init__(self, position_manager: 'ToolDict', keys: List[str], statistic: str = 'mean',
+                 threshold: Optional[float] = None, name: str = 'RegionStatistics', **kwargs):
+        super(RegionStatistics, self).__init__(position_manager=position_manager, key=tuple(keys), name=name,
+                                               **kwargs)
+        self.keys = list(keys)
+        self.statistic = statistic
+        self.threshold = threshold
+
+    def make_inner_position(self, *args, **kwargs) -> 'np.ndarray':
+        rects = np.zeros((len(self.keys), 4), dtype=np.intp)  # missing regions are empty
+        for i, key in enumerate(self.keys):
+            position = self.make_single_position(key)
+            if position:
+                rects[i] = [-1 if value is None else value for value in position]
+        return rects
+
+    def use(self, integral: IntegralImage, rects: 'np.ndarray' = None, **kwargs) -> 'np.ndarray':
+        if rects is None:
+            rects = self.inner_position
+        if self.statistic == 'count':
+            return integral.count(rects, self.threshold)
+        return getattr(integral, self.statistic)(rects)
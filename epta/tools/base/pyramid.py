@@ -0,0 +1,163 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+import numpy as np
+import cv2 as cv
+
+from epta.core import Tool
+from epta.utils.frame import Frame
+
+from .position_cropper import PositionCropper
+
+
+def _level_size(height: int, width: int, level: int) -> Tuple[int, int]:
+    for _ in range(level):
+        height, width = (height + 1) // 2, (width + 1) // 2
+    return height, width
+
+
+def scale_position(position: tuple, level: int) -> tuple:
+    """
+    Map ``(x0, y0, x1, y1)`` of the full resolution frame to the pyramid ``level``.
+    Starts are rounded down and ends up, so the mapped rectangle covers the original one. ``None`` ends are kept.
+    """
+    if not position or not level:
+        return position
+    factor = 2 ** level
+    x0, y0, x1, y1 = position
+    return (x0 // factor, y0 // factor,
+            None if x1 is None else -(-x1 // factor), None if y1 is None else -(-y1 // factor))
+
+
+class FramePyramid:
+    """
+    Levels of one frame, level ``n`` being downscaled ``2 ** n`` times. Level ``0`` is the frame itself.
+    Levels are built on the first request and shared by every consumer of the frame.
+    Level arrays are buffers of the :class:`~epta.tools.base.pyramid.Pyramid` stage, reused a few frames later:
+    copy a level to keep it longer.
+
+    Args:
+        image (np.ndarray): full resolution frame.
+        buffers (dict): level -> preallocated output array.
+        interpolation (int): ``None`` for ``cv.pyrDown``, otherwise ``cv.resize`` interpolation flag.
+    """
+
+    def __init__(self, image: 'np.ndarray', buffers: Dict[int, 'np.ndarray'], interpolation: Optional[int] = None):
+        self.image = image
+        self.depth = max(buffers, default=0)
+        self._buffers = buffers
+        self._levels: List[Optional['np.ndarray']] = [image] + [None] * self.depth
+        self._interpolation = interpolation
+        self._lock = threading.Lock()
+        self.built = 0  # levels built for this frame
+
+    @property
+    def shape(self) -> tuple:
+        return self.image.shape
+
+    def level(self, level: int) -> 'np.ndarray':
+        """
+        Frame downscaled ``2 ** level`` times.
+        """
+        if level > self.depth or level < 0:
+            raise KeyError(f'Pyramid level {level} is not declared, levels go up to {self.depth}')
+        built = self._levels[level]
+        if built is not None:
+            return built
+        with self._lock:
+            for i in range(1, level + 1):
+                if self._levels[i] is None:
+                    self._levels[i] = self._build(self._levels[i - 1], self._buffers[i])
+                    self.built += 1
+        return self._levels[level]
+
+    def _build(self, source: 'np.ndarray', buffer: 'np.ndarray') -> 'np.ndarray':
+        height, width = buffer.shape[:2]
+        plain = source.view(np.ndarray) if isinstance(source, Frame) else source
+        if self._interpolation is None:
+            cv.pyrDown(plain, dst=buffer, dstsize=(width, height))
+        else:
+            cv.resize(plain, (width, height), dst=buffer, interpolation=self._interpolation)
+        if isinstance(self.image, Frame):
+            return Frame(buffer, self.image.color)
+        return buffer
+
+    def __getitem__(self, level: int) -> 'np.ndarray':
+        return self.level(level)
+
+    def crop(self, position: tuple, level: int = 0) -> 'np.ndarray':
+        """
+        Crop of the full resolution ``position`` ``(x0, y0, x1, y1)`` at ``level``.
+        """
+        x0, y0, x1, y1 = scale_position(position, level)
+        return self.level(level)[y0:y1, x0:x1]
+
+
+class Pyramid(Tool):
+    """
+    Shared multi-resolution stage. Takes a frame and returns its :class:`~epta.tools.base.pyramid.FramePyramid`,
+    levels are built lazily, so a level nobody requests in a frame costs nothing.
+    Pass the result to every consumer instead of letting each of them resize the frame.
+    Level buffers are preallocated and reused (in a ring of ``buffers`` frames) while the frame shape is the same.
+    Can be shared by threads: every call takes the next slot of the ring under a lock.
+
+    Args:
+        levels (Iterable[int]): levels the pipeline uses, level ``n`` is ``2 ** n`` times smaller.
+            Intermediate levels are built as needed.
+
+    Keyword Args:
+        interpolation (int): ``None`` for gaussian ``cv.pyrDown``, or a ``cv.resize`` flag such as ``cv.INTER_AREA``.
+        buffers (int): number of frames whose levels stay valid.
+    """
+
+    def __init__(self, levels: Iterable[int] = (1, 2), interpolation: Optional[int] = None, buffers: int = 2,
+                 name: str = 'Pyramid', **kwargs):
+        super(Pyramid, self).__init__(name=name, **kwargs)
+        self.levels = tuple(sorted(set(levels)))
+        self.depth = max(self.levels, default=0)
+        self.interpolation = interpolation
+        self._ring: List[Tuple[Optional[tuple], Dict[int, 'np.ndarray']]] = [(None, dict())] * max(buffers, 1)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _buffers(self, image: 'np.ndarray') -> Dict[int, 'np.ndarray']:
+        key = (image.shape, image.dtype)
+        with self._lock:
+            index = self._next
+            self._next = (index + 1) % len(self._ring)
+            allocated_for, buffers = self._ring[index]
+            if allocated_for != key:
+                height, width = image.shape[:2]
+                buffers = {level: np.empty((*_level_size(height, width, level), *image.shape[2:]), dtype=image.dtype)
+                           for level in range(1, self.depth + 1)}
+                self._ring[index] = (key, buffers)
+        return buffers
+
+    def use(self, image: 'np.ndarray', *args, **kwargs) -> FramePyramid:
+        if isinstance(image, FramePyramid):
+            return image
+        return FramePyramid(image, self._buffers(image), self.interpolation)
+
+
+class PyramidCropper(PositionCropper):
+    """
+    :class:`~epta.tools.base.position_cropper.PositionCropper` working at a pyramid :attr:`level`.
+    Positions stay in full resolution coordinates, they are mapped to the level on update.
+    Takes a :class:`~epta.tools.base.pyramid.FramePyramid` (or a plain frame, cropped at full resolution).
+
+    Keyword Args:
+        level (int): pyramid level to crop from.
+    """
+
+    def __init__(self, level: int = 1, name: str = 'PyramidCropper', **kwargs):
+        super(PyramidCropper, self).__init__(name=name, **kwargs)
+        self.level = level
+        self.level_position = None
+
+    def update(self, *args, **kwargs):
+        super(PyramidCropper, self).update(*args, **kwargs)
+        self.level_position = scale_position(self.inner_position, self.level)
+
+    def use(self, image: 'np.ndarray', *args, **kwargs) -> 'np.ndarray':
+        if isinstance(image, FramePyramid):
+            return self.crop(image.level(self.level), self.level_position)
+        return self.crop(image, self.inner_position)
@@ -1,19 +1,29 @@
-from epta.core import ToolDict
+from epta.core import ToolDict, Retaining
 
 
-class ToolWrapper(ToolDict):
+class ToolWrapper(ToolDict, Retaining):
     """
     Stores :attr:`tool` values after use.
+    Values are copy-on-write by default: a use builds the new table off to the side and publishes it at once,
+    so threads reading positions during an update see the old or the new values, never a mix.
 
     Args:
         tool (ToolDict): Tool to store values from.
+
+    Keyword Args:
+        copy_on_write (bool): publish new values with a single reference swap.
     """
 
-    def __init__(self, tool: 'ToolDict', name: str = None, **kwargs):
+    def __init__(self, tool: 'ToolDict', name: str = None, copy_on_write: bool = True, **kwargs):
         self.tool = tool
-        super(ToolWrapper, self).__init__(name=(name or tool.name), **kwargs)
+        super(ToolWrapper, self).__init__(name=(name or tool.name), copy_on_write=copy_on_write, **kwargs)
 
     def use(self, *args, **kwargs):  # update cached values
+        if self.copy_on_write:
+            values = {key: self.tool[key](*args, **kwargs) for key in self.tool}
+            with self.batch() as table:
+                table.update(values)
+            return
         for key in self.tool:
             value = self.tool[key]
             self[key] = value(*args, **kwargs)
@@ -21,6 +31,22 @@ class ToolWrapper(ToolDict):
     def update(self, *args, **kwargs):
         self.tool.update(*args, **kwargs)
 
+    def retained(self) -> list:
+        return list(self._tools.values())
+
+    def compact(self, fnc: callable):
+        if self.copy_on_write:
+            with self.batch() as table:
+                for key, value in table.items():
+                    table[key] = fnc(value)
+            return
+        for key, value in list(self._tools.items()):
+            self[key] = fnc(value)
+
+    def evict(self):
+        # stored values are looked up by other tools, they can only be compacted.
+        pass
+
 
 class PositionMapperWrapper(ToolWrapper):
     """
@@ -1,5 +1,8 @@
 from .image_hooker import ImageHooker
 from .imread_hooker import ImreadHooker
 from .mss_screen_hooker import MssScreenHooker
+from .video_file_hooker import VideoFileHooker
+from .grab_coordinator import GrabCoordinator, MssBackend, SyntheticBackend
+from .synthetic_hooker import SyntheticImageHooker
 from . import utils
 
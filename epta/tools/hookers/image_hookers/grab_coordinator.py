@@ -0,0 +1,215 @@
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import threading
+import mss
+import numpy as np
+
+from epta.core import Tool
+from epta.utils.frame import Frame
+
+Box = Tuple[int, int, int, int]  # (x0, y0, x1, y1) screen coordinates
+
+
+def _area(box: Box) -> int:
+    return (box[2] - box[0]) * (box[3] - box[1])
+
+
+def _union(a: Box, b: Box) -> Box:
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
+
+
+def plan_boxes(boxes: List[Box], max_waste: Optional[float] = None) -> List[Box]:
+    """
+    Boxes to grab so every box in ``boxes`` lies inside one of them.
+    Boxes are greedily merged while the merged box is at most ``max_waste`` times larger than the area it covers.
+    ``None`` merges everything into the union bounding box.
+    """
+    groups = [(box, _area(box)) for box in dict.fromkeys(boxes)]
+    if not groups:
+        return list()
+    if max_waste is None:
+        union = groups[0][0]
+        for box, _ in groups[1:]:
+            union = _union(union, box)
+        return [union]
+
+    merged = True
+    while merged and len(groups) > 1:
+        merged = False
+        best = None
+        for i in range(len(groups)):
+            for j in range(i + 1, len(groups)):
+                union = _union(groups[i][0], groups[j][0])
+                covered = groups[i][1] + groups[j][1]
+                waste = _area(union) / max(covered, 1)
+                if waste <= max_waste and (best is None or waste < best[0]):
+                    best = (waste, i, j, union, covered)
+        if best is not None:
+            _, i, j, union, covered = best
+            groups = [group for k, group in enumerate(groups) if k not in (i, j)] + [(union, covered)]
+            merged = True
+    return [box for box, _ in groups]
+
+
+class MssBackend:
+    """
+    Grabs screen boxes with ``mss``. Sessions are kept per thread, as ``mss`` is not thread safe.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _session(self) -> 'mss.base.MSSBase':
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = mss.mss()
+        return session
+
+    def bounds(self) -> Box:
+        """
+        Box of the whole screen (all monitors).
+        """
+        monitor = self._session().monitors[0]
+        return monitor['left'], monitor['top'], monitor['left'] + monitor['width'], monitor['top'] + monitor['height']
+
+    def grab(self, box: Box) -> 'np.ndarray':
+        x0, y0, x1, y1 = box
+        return np.asarray(self._session().grab({"top": y0, "left": x0, "width": x1 - x0, "height": y1 - y0}))
+
+
+class SyntheticBackend:
+    """
+    Grabs boxes of a synthetic screen, for tests and benchmarks.
+
+    Args:
+        screen (np.ndarray, callable): BGRA screen array or ``callable(grab_index) -> array`` producing a screen per grab.
+    """
+
+    def __init__(self, screen: Union['np.ndarray', Callable[[int], 'np.ndarray']]):
+        self.screen = screen
+        self.grabs = 0
+
+    def bounds(self) -> Box:
+        screen = self.screen(self.grabs) if callable(self.screen) else self.screen
+        return 0, 0, screen.shape[1], screen.shape[0]
+
+    def grab(self, box: Box) -> 'np.ndarray':
+        screen = self.screen(self.grabs) if callable(self.screen) else self.screen
+        self.grabs += 1
+        x0, y0, x1, y1 = box
+        return screen[y0:y1, x0:x1].copy()  # a real grab is a fresh buffer
+
+
+class GrabCoordinator(Tool):
+    """
+    Serves many screen region hookers from one grab per tick.
+    :meth:`update` collects ``inner_position`` of every registered hooker and plans the boxes to grab:
+    the union bounding box, or a few boxes if the regions are far apart (see ``max_waste``).
+    Each hooker gets a view of a grabbed box in its own ``color``, no pixels are copied. Grabbed boxes are
+    converted once per tick and color space. A hooker without position (``inner_position`` is ``None``)
+    gets the whole screen.
+
+    A new tick is grabbed on use of the coordinator, or automatically when a hooker asks for its region again
+    within the same tick. So either put the coordinator before the hookers in the pipeline or just use the hookers.
+
+    Keyword Args:
+        backend: object with ``grab((x0, y0, x1, y1)) -> BGRA array`` and ``bounds() -> (x0, y0, x1, y1)``
+            of the whole screen. :class:`MssBackend` by default.
+        color (str): color space of boxes returned on use, and of views for hookers without ``color``.
+            ``None`` to keep BGRA.
+        max_waste (float): merge boxes only while the merged box is at most ``max_waste`` times
+            larger than the regions it covers. ``None`` to always grab the union bounding box.
+    """
+
+    def __init__(self, backend=None, color: Optional[str] = 'RGB', max_waste: Optional[float] = None,
+                 name: str = 'Grab_coordinator', **kwargs):
+        super(GrabCoordinator, self).__init__(name=name, **kwargs)
+        self.backend = MssBackend() if backend is None else backend
+        self.color = color
+        self.max_waste = max_waste
+        self.hookers: List['Tool'] = list()
+        self.boxes: List[Box] = list()
+        self.ticks = 0
+        self._slices: Dict[int, Tuple[int, tuple]] = dict()  # hooker id -> (box index, slices)
+        self._frames: Optional[List['Frame']] = None  # grabbed boxes, BGRA
+        self._converted: Dict[Optional[str], List['Frame']] = dict()  # color -> boxes of the current tick
+        self._served = set()
+        self._lock = threading.Lock()
+
+    def register(self, hooker: 'Tool'):
+        """
+        Serve ``hooker`` or replan after its position changed.
+        It must have ``inner_position`` as ``{"top", "left", "width", "height"}`` or ``None`` for the whole screen.
+        """
+        with self._lock:
+            if all(h is not hooker for h in self.hookers):
+                self.hookers.append(hooker)
+            self._slices.clear()
+
+    def unregister(self, hooker: 'Tool'):
+        with self._lock:
+            self.hookers = [h for h in self.hookers if h is not hooker]
+            self._slices.pop(id(hooker), None)
+
+    def _box_of(self, hooker: 'Tool') -> Box:
+        position = getattr(hooker, 'inner_position', None)
+        if position is None:
+            return self.backend.bounds()
+        x0, y0 = position['left'], position['top']
+        return x0, y0, x0 + position['width'], y0 + position['height']
+
+    def _plan(self):
+        hookers = list(self.hookers)
+        regions = [self._box_of(hooker) for hooker in hookers]
+        self.boxes = plan_boxes(regions, self.max_waste)
+        self._slices = dict()
+        for hooker, (x0, y0, x1, y1) in zip(hookers, regions):
+            for index, box in enumerate(self.boxes):
+                if box[0] <= x0 and box[1] <= y0 and x1 <= box[2] and y1 <= box[3]:
+                    self._slices[id(hooker)] = (index, (slice(y0 - box[1], y1 - box[1]),
+                                                        slice(x0 - box[0], x1 - box[0])))
+                    break
+        self._frames = None
+
+    def update(self, *args, **kwargs):
+        with self._lock:
+            self._plan()
+
+    def _tick(self):
+        if not self._slices:
+            self._plan()
+        self._frames = [Frame(self.backend.grab(box), 'BGRA') for box in self.boxes]
+        self._converted = {'BGRA': self._frames}
+        self._served = set()
+        self.ticks += 1
+
+    def _frames_in(self, color: Optional[str]) -> List['Frame']:
+        # the only color conversion of grabs: once per box, color and tick
+        frames = self._converted.get(color or 'BGRA')
+        if frames is None:
+            frames = self._converted[color] = [frame.to(color) for frame in self._frames]
+        return frames
+
+    def use(self, *args, **kwargs) -> List['Frame']:
+        """
+        Grab a new tick. Returns the grabbed boxes in :attr:`color`.
+        """
+        with self._lock:
+            self._tick()
+            return self._frames_in(self.color)
+
+    def view(self, hooker: 'Tool') -> 'Frame':
+        """
+        Region of ``hooker`` in the current tick, in the color space of ``hooker.color``
+        (:attr:`color` if the hooker has none, ``None`` keeps BGRA).
+        """
+        with self._lock:
+            key = id(hooker)
+            if key not in self._slices:
+                if all(h is not hooker for h in self.hookers):
+                    self.hookers.append(hooker)
+                self._plan()
+            if self._frames is None or key in self._served:
+                self._tick()
+            self._served.add(key)
+            index, slices = self._slices[key]
+            return self._frames_in(getattr(hooker, 'color', self.color))[index][slices]
@@ -1,14 +1,23 @@
 import cv2 as cv
 
+from epta.utils.frame import Frame
+
 from .image_hooker import ImageHooker
 
 
 class ImreadHooker(ImageHooker):
-    def __init__(self, name: str = 'Imread_hooker', **kwargs):
+    """
+    Reads images from disk.
+
+    Keyword Args:
+        color (str): color space of the returned :class:`~epta.utils.frame.Frame`.
+            ``None`` to keep BGR as read and defer the conversion to the consumers.
+    """
+
+    def __init__(self, name: str = 'Imread_hooker', color: str = 'RGB', **kwargs):
         super(ImreadHooker, self).__init__(name=name, **kwargs)
+        self.color = color
 
-    @staticmethod
-    def hook_image(image_path: str, **kwargs) -> 'np.ndarray':
-        image = cv.imread(image_path)
-        image = cv.cvtColor(image, cv.COLOR_BGR2RGB)
-        return image
+    def hook_image(self, image_path: str, **kwargs) -> 'Frame':
+        image = Frame(cv.imread(image_path), 'BGR')
+        return image.to(self.color)
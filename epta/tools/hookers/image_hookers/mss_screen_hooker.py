@@ -1,25 +1,42 @@
 import mss
 import numpy as np
-import cv2 as cv
 
 from epta.core import PositionDependent
+from epta.utils.frame import Frame
 
 from .image_hooker import ImageHooker
 
 
 class MssScreenHooker(ImageHooker, PositionDependent):
-    def __init__(self, name: str = 'Mss_hooker', **kwargs):
+    """
+    Grabs a screen region.
+
+    Keyword Args:
+        color (str): color space of the returned :class:`~epta.utils.frame.Frame`.
+            ``None`` to keep BGRA as grabbed and defer the conversion to the consumers.
+        coordinator (GrabCoordinator): share one grab per tick with other hookers of the coordinator.
+            The region is then a view of the shared grab.
+    """
+
+    def __init__(self, name: str = 'Mss_hooker', color: str = 'RGB', coordinator: 'GrabCoordinator' = None,
+                 **kwargs):
         super(MssScreenHooker, self).__init__(name=name, **kwargs)
+        self.color = color
+        self.coordinator = coordinator
 
     def update(self, *args, **kwargs):
         x, y, x_end, y_end = self.make_single_position()
         w = x_end - x
         h = y_end - y
         self.inner_position = {"top": y, "left": x, "width": w, "height": h}
+        if self.coordinator is not None:
+            self.coordinator.register(self)
 
-    def hook_image(self, *args, **kwargs) -> 'np.ndarray':
+    def hook_image(self, *args, **kwargs) -> 'Frame':
+        if self.coordinator is not None:
+            return self.coordinator.view(self)  # converted to self.color by the coordinator
         with mss.mss() as sct:
             data = sct.grab(self.inner_position)
-            img_array = np.array(data)[..., :3]
-            img_array = cv.cvtColor(img_array, cv.COLOR_BGR2RGB)
+            # single conversion straight from BGRA
+            img_array = Frame(np.asarray(data), 'BGRA').to(self.color)
         return img_array
@@ -0,0 +1,32 @@
+from typing import Tuple
+import numpy as np
+
+from epta.utils.frame import Frame
+
+from .image_hooker import ImageHooker
+
+
+class SyntheticImageHooker(ImageHooker):
+    """
+    Returns generated frames, for load tests and benchmarks without a screen or files.
+    A few random frames are generated once and returned in turn, so hooking costs nothing
+    but consumers still get changing images.
+
+    Keyword Args:
+        shape (tuple): frame shape.
+        frames (int): number of distinct frames.
+        color (str): color tag of the frames.
+        seed (int): random seed.
+    """
+
+    def __init__(self, shape: Tuple[int, ...] = (720, 1280, 3), frames: int = 8, color: str = 'RGB', seed: int = 0,
+                 name: str = 'Synthetic_hooker', **kwargs):
+        super(SyntheticImageHooker, self).__init__(name=name, **kwargs)
+        rng = np.random.default_rng(seed)
+        self.frames = [Frame(rng.integers(0, 256, size=shape, dtype=np.uint8), color) for _ in range(max(frames, 1))]
+        self.index = 0
+
+    def hook_image(self, *args, **kwargs) -> 'Frame':
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return frame
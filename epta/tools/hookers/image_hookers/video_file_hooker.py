@@ -0,0 +1,179 @@
+from typing import Iterator, List, Optional, Tuple
+import threading
+import queue
+import cv2 as cv
+
+from epta.core import make_record, Record
+from epta.utils.frame import Frame
+
+from .image_hooker import ImageHooker
+
+VideoFrame = make_record(('image', 'index', 'timestamp'))
+_END = object()
+_POLL_INTERVAL = 0.5  # seconds between checks that the decoder thread is alive
+
+
+class VideoFileHooker(ImageHooker):
+    """
+    Reads frames of a video file. Frames are decoded ahead on a background thread into a bounded queue.
+    Every use returns the next :class:`~epta.core.record.Record` of ``image``, ``index`` and ``timestamp`` (seconds),
+    or ``None`` when the video is over.
+
+    Args:
+        path (str): video file path.
+
+    Keyword Args:
+        stride (int): return every ``stride``-th frame. Skipped frames are only grabbed, not retrieved.
+        start (int): first frame index.
+        stop (int): frame index to stop before. ``None`` for the end of the file.
+        queue_size (int): number of frames decoded ahead.
+        seek_stride (int): strides from this value on skip frames by seeking (to the nearest keyframe
+            and decoding forward) instead of grabbing every frame in between.
+        color (str): color space of the returned :class:`~epta.utils.frame.Frame`. ``None`` to keep BGR.
+    """
+
+    def __init__(self, path: str, stride: int = 1, start: int = 0, stop: int = None, queue_size: int = 8,
+                 seek_stride: int = 64, color: str = 'RGB', name: str = 'Video_file_hooker', **kwargs):
+        super(VideoFileHooker, self).__init__(name=name, **kwargs)
+        self.path = path
+        self.stride = max(int(stride), 1)
+        self.start = start
+        self.stop = stop
+        self.seek_stride = seek_stride
+        self.color = color
+        self._queue = queue.Queue(maxsize=max(queue_size, 1))
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._position = start
+        self.fps = None
+        self.frame_count = None
+
+    @staticmethod
+    def probe(path: str) -> Tuple[int, float]:
+        """
+        ``(frame_count, fps)`` of the video file.
+        """
+        capture = cv.VideoCapture(path)
+        try:
+            return int(capture.get(cv.CAP_PROP_FRAME_COUNT)), capture.get(cv.CAP_PROP_FPS)
+        finally:
+            capture.release()
+
+    @classmethod
+    def split(cls, path: str, parts: int, stride: int = 1) -> List[Tuple[int, int]]:
+        """
+        Split the video into ``parts`` contiguous ``(start, stop)`` frame ranges for parallel workers.
+        Range starts are aligned to ``stride``, so the union of parts yields the same frames as a single hooker.
+        """
+        frame_count, _ = cls.probe(path)
+        steps = -(-frame_count // stride)
+        bounds = [round(steps * i / parts) * stride for i in range(parts + 1)]
+        bounds[-1] = frame_count
+        return [(a, b) for a, b in zip(bounds[:-1], bounds[1:]) if a < b]
+
+    def _decode(self, position: int):
+        # always ends the queue: with _END, or with the error for hook_image to raise
+        end = _END
+        capture = None
+        try:
+            capture = cv.VideoCapture(self.path)
+            self.fps = capture.get(cv.CAP_PROP_FPS) or None
+            self.frame_count = int(capture.get(cv.CAP_PROP_FRAME_COUNT))
+            stop = float('inf') if self.stop is None else self.stop
+            if self.frame_count > 0:
+                stop = min(stop, self.frame_count)
+            if position:
+                capture.set(cv.CAP_PROP_POS_FRAMES, position)
+            index = position
+            while index < stop and not self._stop_event.is_set():
+                ok, image = capture.read()
+                if not ok:
+                    break
+                if self.fps:
+                    timestamp = index / self.fps
+                else:
+                    timestamp = capture.get(cv.CAP_PROP_POS_MSEC) / 1000.0
+                frame = VideoFrame._make((Frame(image, 'BGR').to(self.color), index, timestamp))
+                if not self._put(frame):
+                    return
+
+                next_index = index + self.stride
+                if self.stride >= self.seek_stride:
+                    capture.set(cv.CAP_PROP_POS_FRAMES, next_index)
+                else:
+                    for _ in range(self.stride - 1):
+                        if not capture.grab():
+                            next_index = stop
+                            break
+                index = next_index
+        except Exception as error:
+            end = error
+        finally:
+            if capture is not None:
+                capture.release()
+            self._put(end)
+
+    def _put(self, item) -> bool:
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def open(self):
+        """
+        Start decoding ahead. Called on the first use.
+        """
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._decode, args=(self._position,), daemon=True,
+                                            name=f'epta_{self.name}')
+            self._thread.start()
+
+    def close(self):
+        """
+        Stop decoding and release the file.
+        """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+
+    def seek(self, index: int):
+        """
+        Continue from the frame ``index``. Frames decoded ahead are dropped.
+        """
+        self.close()
+        self._position = index
+
+    def _get(self):
+        while True:
+            try:
+                return self._queue.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                # checked before emptiness: a finished decoder has put its last item
+                if not self._thread.is_alive() and self._queue.empty():
+                    raise RuntimeError(f'{self.name}: decoder stopped without ending the video')
+
+    def hook_image(self, *args, **kwargs) -> Optional[Record]:
+        """
+        Next frame, ``None`` when the video is over. Errors of the decoder (e.g. codec or seek failures)
+        are raised here.
+        """
+        self.open()
+        frame = self._get()
+        if frame is _END or isinstance(frame, Exception):
+            self._thread.join()  # let the decoder release the file
+            self._queue.put(frame)  # keep returning None or raising
+            if frame is _END:
+                return None
+            raise frame
+        self._position = frame['index'] + self.stride
+        return frame
+
+    def __iter__(self) -> Iterator[Record]:
+        while (frame := self.hook_image()) is not None:
+            yield frame
@@ -1 +1,2 @@
 from .recogniser import Recogniser
+from .micro_batch import MicroBatch, BatchSlot, Pending
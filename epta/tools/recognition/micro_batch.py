@@ -0,0 +1,125 @@
+from typing import Any, List, Mapping
+import contextvars
+
+from epta.core import Tool, Record, metrics
+from epta.core.base_ops import Variable
+
+from .recogniser import Recogniser
+
+
+class Pending:
+    """
+    Placeholder for a result of :class:`~epta.tools.recognition.micro_batch.BatchSlot` until the batch is done.
+    """
+    __slots__ = ('image', 'result')
+
+    def __init__(self, image: Any):
+        self.image = image
+        self.result = None
+
+
+class BatchSlot(Tool):
+    """
+    Collects its input into the running :class:`~epta.tools.recognition.micro_batch.MicroBatch`
+    and returns a :class:`~epta.tools.recognition.micro_batch.Pending` placeholder.
+    Outside a micro batch, recognises the input directly. Should be the last stage of a branch:
+    the placeholder is replaced by the result only when the micro batch finishes.
+
+    Args:
+        batch (MicroBatch): micro batch to collect into.
+    """
+
+    def __init__(self, batch: 'MicroBatch', name: str = 'BatchSlot', **kwargs):
+        super(BatchSlot, self).__init__(name=name, **kwargs)
+        self.batch = batch
+
+    def use(self, image: Any, **kwargs) -> Any:
+        pending = self.batch._pending.get()
+        if pending is None:
+            return self.batch.recogniser(image, **self.batch.recogniser_kwargs)
+        placeholder = Pending(image)
+        pending.append(placeholder)
+        return placeholder
+
+
+class MicroBatch(Variable):
+    """
+    Batches recogniser calls from many branches of a single frame.
+    :attr:`tool` (e.g. :class:`~epta.core.base_ops.Concatenate` or :class:`~epta.core.tool_dict.ToolDict`)
+    is used as usual, but its :meth:`slot` tools only collect their crops. Then
+    :meth:`~epta.tools.recognition.recogniser.Recogniser.image_to_data_batch` is called once
+    and the results are scattered back into the output lists, tuples, dicts and records.
+
+    Args:
+        tool (Tool): fan-out tool with slots in its branches.
+        recogniser (Recogniser): recogniser to batch.
+
+    While a :class:`~epta.core.metrics.MetricsRegistry` is enabled, reports the number of collected images
+    as the ``micro_batch_queue_depth`` gauge and the ``batched_images`` counter of the tool.
+
+    Keyword Args:
+        max_batch (int): maximum images per batch call. ``None`` for no limit.
+        recogniser_kwargs (dict): kwargs for the batch call.
+    """
+
+    def __init__(self, tool: 'Tool', recogniser: 'Recogniser', max_batch: int = None, recogniser_kwargs: dict = None,
+                 name: str = 'MicroBatch', **kwargs):
+        super(MicroBatch, self).__init__(tool=tool, name=name, **kwargs)
+        self.recogniser = recogniser
+        self.max_batch = max_batch
+        self.recogniser_kwargs = recogniser_kwargs or dict()
+        self._pending = contextvars.ContextVar(f'epta_micro_batch_{id(self)}', default=None)
+
+    def slot(self, name: str = None) -> BatchSlot:
+        """
+        New slot tool to put at the end of a branch of :attr:`tool`.
+        """
+        return BatchSlot(self, name=name or f'{self.name}_slot')
+
+    def _recognise(self, images: List[Any]) -> List[Any]:
+        if isinstance(self.recogniser, Recogniser):
+            batch = self.recogniser.image_to_data_batch
+        else:
+            def batch(items, **kwargs):
+                return [self.recogniser(item, **kwargs) for item in items]
+        size = self.max_batch or len(images)
+        results = list()
+        for start in range(0, len(images), size):
+            results.extend(batch(images[start:start + size], **self.recogniser_kwargs))
+        return results
+
+    def use(self, *args, **kwargs) -> Any:
+        pending = list()
+        token = self._pending.set(pending)
+        try:
+            output = self.tool(*args, **kwargs)
+        finally:
+            self._pending.reset(token)
+        if metrics.enabled():
+            metrics.gauge('micro_batch_queue_depth', len(pending), tool=self.name)
+            metrics.count(self, 'batched_images', len(pending))
+        if not pending:
+            return output
+        for placeholder, result in zip(pending, self._recognise([p.image for p in pending])):
+            placeholder.result = result
+            placeholder.image = None
+        return _resolve(output)
+
+    def update(self, *args, **kwargs):
+        super(MicroBatch, self).update(*args, **kwargs)
+        if isinstance(self.recogniser, Tool):
+            self.recogniser.update(*args, **kwargs)
+
+
+def _resolve(output: Any) -> Any:
+    if isinstance(output, Pending):
+        return output.result
+    if isinstance(output, list):
+        return [_resolve(item) for item in output]
+    if isinstance(output, tuple):
+        return tuple(_resolve(item) for item in output)
+    if isinstance(output, Record):
+        return output._make(tuple(_resolve(item) for item in output.to_tuple()))
+    if isinstance(output, Mapping):
+        return {key: _resolve(value) for key, value in output.items()}
+    return output
@@ -1,12 +1,13 @@
 import abc
-from typing import Any
+from typing import Any, List, Union
 
 from epta.core import Tool
 
 
-class Recogniser(Tool):
+class Recogniser(Tool, abc.ABC):
     """
     Tool to inherit from for more complex recognition tools.
+    Override :meth:`image_to_data_batch` if the recogniser benefits from batching.
     """
     def __init__(self, name: str = 'Recogniser', **kwargs):
         super(Recogniser, self).__init__(name=name, **kwargs)
@@ -15,5 +16,20 @@ class Recogniser(Tool):
     def image_to_data(self, *args, **kwargs) -> str:
         pass
 
+    def image_to_data_batch(self, images: Union[List['np.ndarray'], 'np.ndarray'], *args, **kwargs) -> List[Any]:
+        """
+        Recognise many images at once. By default, calls :meth:`image_to_data` for each image.
+
+        Args:
+            images (list, np.ndarray): list of images or a stacked ``(N, ...)`` array.
+
+        Returns:
+            results (list): result per image, in order.
+        """
+        return [self.image_to_data(image, *args, **kwargs) for image in images]
+
     def use(self, *args, **kwargs) -> Any:
         return self.image_to_data(*args, **kwargs)
+
+    def use_batch(self, images: Union[List['np.ndarray'], 'np.ndarray'], *args, **kwargs) -> List[Any]:
+        return self.image_to_data_batch(images, *args, **kwargs)
@@ -0,0 +1,2 @@
+from .sink import Sink
+from .buffered_sink import BufferedSink, iter_chunks, iter_rows
@@ -0,0 +1,243 @@
+from typing import Any, Dict, Iterator, List, Mapping
+import threading
+import queue
+import json
+import glob
+import time
+import os
+import numpy as np
+
+from .sink import Sink
+
+_CLOSE = object()
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _column_array(column: List[Any]) -> 'np.ndarray':
+    try:
+        array = np.asarray(column)
+    except ValueError:  # ragged values
+        array = None
+    if array is None or array.dtype == object:
+        array = np.empty(len(column), dtype=object)
+        array[:] = column
+    return array
+
+
+class BufferedSink(Sink):
+    """
+    Buffers pipeline outputs (dicts, :class:`~epta.core.record.Record` or tuples) in columns and writes them
+    in bulk from a background thread, to JSON Lines files or compressed ``.npz`` chunks.
+    A flush happens every :attr:`max_rows` rows or :attr:`max_interval` seconds, whichever comes first.
+    Read the output back with :func:`~epta.tools.sinks.buffered_sink.iter_rows`.
+
+    Args:
+        directory (str): output directory.
+
+    Keyword Args:
+        prefix (str): file name prefix.
+        format (str): ``'jsonl'`` or ``'npz'``.
+        keys (list): column names for tuple inputs. Defaults to the tuple positions.
+        max_rows (int): rows to buffer before a flush.
+        max_interval (float): maximum seconds between flushes. ``None`` to flush on size only.
+        rotate_rows (int): rows per JSON Lines file before starting a new one. ``None`` for a single file.
+            ``.npz`` chunks are always separate files.
+    """
+
+    def __init__(self, directory: str, prefix: str = 'sink', format: str = 'jsonl', keys: List[str] = None,
+                 max_rows: int = 1024, max_interval: float = 1.0, rotate_rows: int = None, name: str = 'BufferedSink',
+                 **kwargs):
+        super(BufferedSink, self).__init__(name=name, **kwargs)
+        if format not in ('jsonl', 'npz'):
+            raise ValueError(f'Unknown format {format}')
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.format = format
+        self.keys = keys
+        self.max_rows = max_rows
+        self.max_interval = max_interval
+        self.rotate_rows = rotate_rows
+
+        self.rows = 0  # rows written to disk
+        self.flushes = 0
+        self._columns: Dict[str, List[Any]] = dict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._last_flush = time.perf_counter()
+        self._chunk = self._next_chunk()
+        self._file = None
+        self._file_rows = 0
+        self._error = None
+        self._thread = threading.Thread(target=self._write_loop, name=f'epta_{name}', daemon=True)
+        self._thread.start()
+
+    def _files(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.directory, f'{self.prefix}-*.{self.format}')))
+
+    def _next_chunk(self) -> int:
+        # continue after the last existing chunk, files may have been removed in between
+        chunks = [os.path.basename(path)[len(self.prefix) + 1:-len(self.format) - 1] for path in self._files()]
+        return max((int(chunk) for chunk in chunks if chunk.isdigit()), default=-1) + 1
+
+    def _row_items(self, data: Any):
+        if isinstance(data, Mapping):
+            return data.items()
+        if isinstance(data, (tuple, list)):
+            keys = self.keys or [str(i) for i in range(len(data))]
+            return zip(keys, data)
+        return (('value', data),)
+
+    def write(self, data: Any, **kwargs):
+        if self._error is not None:
+            raise self._error
+        with self._lock:
+            if self._thread is None:
+                raise ValueError('sink is closed')
+            size = self._size
+            columns = self._columns
+            for key, value in self._row_items(data):
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [None] * size
+                column.append(value)
+            self._size = size = size + 1
+            for column in columns.values():
+                if len(column) < size:  # key missing in this row
+                    column.append(None)
+            if size >= self.max_rows:
+                self._swap()
+
+    def _swap(self):
+        # under lock: hand the buffer to the writer thread
+        if self._size:
+            self._queue.put((self._columns, self._size))
+            self._columns, self._size = dict(), 0
+        self._last_flush = time.perf_counter()
+
+    def flush(self, wait: bool = True):
+        """
+        Write buffered rows. If ``wait``, block until they are on disk.
+        """
+        with self._lock:
+            if self._thread is None:
+                raise ValueError('sink is closed')
+            self._swap()
+        if wait:
+            self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._swap()
+        self._queue.put(_CLOSE)
+        thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> 'BufferedSink':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def _write_loop(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.max_interval)
+            except queue.Empty:
+                with self._lock:
+                    if self.max_interval is not None and time.perf_counter() - self._last_flush >= self.max_interval:
+                        self._swap()
+                continue
+            try:
+                if item is _CLOSE:
+                    if self._file is not None:
+                        self._file.close()
+                        self._file = None
+                    return
+                self._write_chunk(*item)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _path(self) -> str:
+        path = os.path.join(self.directory, f'{self.prefix}-{self._chunk:05d}.{self.format}')
+        self._chunk += 1
+        return path
+
+    def _write_chunk(self, columns: Dict[str, List[Any]], size: int):
+        if self.format == 'npz':
+            np.savez_compressed(self._path(), **{key: _column_array(column) for key, column in columns.items()})
+        else:
+            keys = list(columns)
+            for row in zip(*columns.values()):
+                if self._file is None or (self.rotate_rows and self._file_rows >= self.rotate_rows):
+                    if self._file is not None:
+                        self._file.close()
+                    self._file = open(self._path(), 'w')
+                    self._file_rows = 0
+                self._file.write(json.dumps(dict(zip(keys, row)), default=_to_json))
+                self._file.write('\n')
+                self._file_rows += 1
+            self._file.flush()
+        self.rows += size
+        self.flushes += 1
+
+
+def iter_chunks(directory: str, prefix: str = 'sink') -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read :class:`~epta.tools.sinks.buffered_sink.BufferedSink` output chunk by chunk as columns.
+    JSON Lines files are read as one chunk per file.
+    """
+    for path in sorted(glob.glob(os.path.join(directory, f'{prefix}-*.*'))):
+        if path.endswith('.npz'):
+            with np.load(path, allow_pickle=True) as data:
+                yield {key: data[key] for key in data.files}
+        elif path.endswith('.jsonl'):
+            columns = dict()
+            for i, row in enumerate(_iter_jsonl(path)):
+                for key in columns.keys() - row.keys():
+                    columns[key].append(None)
+                for key, value in row.items():
+                    columns.setdefault(key, [None] * i).append(value)
+            yield columns
+
+
+def _iter_jsonl(path: str) -> Iterator[dict]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_rows(directory: str, prefix: str = 'sink') -> Iterator[dict]:
+    """
+    Lazily read :class:`~epta.tools.sinks.buffered_sink.BufferedSink` output row by row.
+    """
+    for path in sorted(glob.glob(os.path.join(directory, f'{prefix}-*.*'))):
+        if path.endswith('.jsonl'):
+            yield from _iter_jsonl(path)
+        elif path.endswith('.npz'):
+            with np.load(path, allow_pickle=True) as data:
+                columns = {key: data[key] for key in data.files}
+            keys = list(columns)
+            for row in zip(*columns.values()):
+                yield dict(zip(keys, row))
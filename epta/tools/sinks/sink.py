@@ -0,0 +1,21 @@
+import abc
+from typing import Any
+
+from epta.core import Tool
+
+
+class Sink(Tool, abc.ABC):
+    """
+    Tool to inherit from for pipeline outputs storage. Returns its input unchanged.
+    """
+
+    def __init__(self, name: str = 'Sink', **kwargs):
+        super(Sink, self).__init__(name=name, **kwargs)
+
+    @abc.abstractmethod
+    def write(self, data: Any, **kwargs):
+        pass
+
+    def use(self, data: Any, **kwargs) -> Any:
+        self.write(data, **kwargs)
+        return data
@@ -0,0 +1,97 @@
+from typing import Optional
+import numpy as np
+import cv2 as cv
+
+COLORS = ('BGR', 'RGB', 'BGRA', 'RGBA', 'GRAY', 'HSV', 'HLS', 'LAB')
+
+
+def _conversion_code(source: str, target: str) -> Optional[int]:
+    return getattr(cv, f'COLOR_{source}2{target}', None)
+
+
+def _is_spatial(key) -> bool:
+    # indexing that keeps all channels in place, so converted and source pixels stay aligned.
+    if not isinstance(key, tuple):
+        key = (key,)
+    return len(key) <= 2 and all(isinstance(k, slice) for k in key)
+
+
+class Frame(np.ndarray):
+    """
+    Image array tagged with its :attr:`color` space.
+    Conversions are done on request with :meth:`to`, so a frame can stay in the capture color space
+    until a consumer needs another one. Crops (slices) of a frame keep the tag,
+    so only the cropped pixels are converted.
+    A converted frame remembers its source: converting back returns the source (or its crop) without
+    a second conversion.
+
+    Args:
+        image (np.ndarray): image data. Not copied.
+        color (str): color space, one of ``COLORS``. ``None`` if unknown.
+    """
+
+    def __new__(cls, image: 'np.ndarray', color: Optional[str] = 'RGB'):
+        frame = np.asarray(image).view(cls)
+        frame.color = color
+        return frame
+
+    def __array_finalize__(self, obj):
+        self.color = getattr(obj, 'color', None)
+        self._source = None
+
+    def __getitem__(self, key):
+        item = super(Frame, self).__getitem__(key)
+        if isinstance(item, Frame):
+            if _is_spatial(key):
+                if self._source is not None:
+                    item._source = self._source[key]
+            else:
+                item.color = None
+        return item
+
+    def to(self, color: Optional[str]) -> 'Frame':
+        """
+        Same image in the given color space. ``self`` if it is already in it.
+
+        Args:
+            color (str): target color space. ``None`` to keep the current one.
+        """
+        if color is None or color == self.color:
+            return self
+        source = self._source
+        if source is not None and source.color == color:
+            return source
+        code = _conversion_code(self.color, color)
+        if code is None:
+            raise ValueError(f'Can not convert {self.color} to {color}')
+        converted = Frame(cv.cvtColor(self.view(np.ndarray), code), color)
+        converted._source = self
+        return converted
+
+    def detach(self) -> 'Frame':
+        """
+        Drop the reference to the source frame, so it can be freed.
+        """
+        self._source = None
+        return self
+
+    def __reduce__(self):
+        reconstruct, args, state = super(Frame, self).__reduce__()
+        return reconstruct, args, (state, self.color)
+
+    def __setstate__(self, state):
+        state, color = state
+        super(Frame, self).__setstate__(state)
+        self.color = color
+        self._source = None
+
+
+def as_color(image: 'np.ndarray', color: str, default_color: str = 'RGB') -> 'np.ndarray':
+    """
+    Get ``image`` in ``color`` space. Untagged arrays are treated as ``default_color``.
+    """
+    if not isinstance(image, Frame):
+        image = Frame(image, default_color)
+    elif image.color is None:
+        image = Frame(image.view(np.ndarray), default_color)
+    return image.to(color)
@@ -1,11 +1,13 @@
 import cv2 as cv
 import os
-from typing import Union
+from typing import Mapping, Union
 
+from .frame import as_color
 
-def _save_crops(crops: Union[dict, 'np.ndarray'], save_path: str, prefix: str = ''):
-    # single leveled dictionary
-    if isinstance(crops, dict):
+
+def _save_crops(crops: Union[Mapping, 'np.ndarray'], save_path: str, prefix: str = ''):
+    # single leveled dictionary or record
+    if isinstance(crops, Mapping):
         for name, crop in crops.items():
             _save_crops(crop, save_path, prefix=f'{prefix}_{name}')
     else:
@@ -16,11 +18,12 @@ def _save_crops(crops: Union[dict, 'np.ndarray'], save_path: str, prefix: str =
                 save_name = os.path.join(save_path, f'{prefix}.png')
             else:
                 save_name = save_path
-            crop = cv.cvtColor(crops, cv.COLOR_RGB2BGR)
+            # no conversion if the crop comes from a BGR frame
+            crop = as_color(crops, 'BGR')
             cv.imwrite(save_name, crop)
 
 
-def save_crops(crops: dict, save_path: str):
+def save_crops(crops: Mapping, save_path: str):
     # 2 leveled dictionary
     if not os.path.exists(temp := os.path.dirname(save_path)):
         os.makedirs(temp)
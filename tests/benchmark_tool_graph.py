@@ -0,0 +1,88 @@
+"""
+Memory per node and calls per second of large tool graphs.
+Slotted base_ops tools are compared with the same classes with ``__dict__`` (regular subclasses),
+which have the pre-slots layout and call path.
+
+    python tests/benchmark_tool_graph.py --sizes 10000 100000
+"""
+import argparse
+import time
+import tracemalloc
+
+import epta.core.base_ops as eco
+
+
+class DictAtomic(eco.Atomic):
+    pass
+
+
+class DictLambda(eco.Lambda):
+    pass
+
+
+class DictWrapper(eco.Wrapper):
+    pass
+
+
+def _increment(x):
+    return x + 1
+
+
+def build(size: int, atomic=eco.Atomic, lambda_=eco.Lambda, wrapper=eco.Wrapper) -> list:
+    nodes = list()
+    for i in range(size // 3):
+        nodes.append(atomic(key=i % 8, name=f'atomic_{i}'))
+        nodes.append(lambda_(_increment, name=f'lambda_{i}'))
+        nodes.append(wrapper(i, name=f'wrapper_{i}'))
+    return nodes
+
+
+def memory_per_node(size: int, **classes) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = build(size, **classes)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(nodes)
+
+
+def calls_per_second(size: int, repeat: int = 3, **classes) -> float:
+    nodes = build(size, **classes)
+    atomics, lambdas = nodes[0::3], nodes[1::3]
+    data = list(range(8))
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for atomic, lambda_ in zip(atomics, lambdas):
+            lambda_(atomic(data))
+        best = min(best, time.perf_counter() - start)
+    return 2 * len(atomics) / best
+
+
+def sequential_calls_per_second(size: int, repeat: int = 3, lambda_=eco.Lambda) -> float:
+    chain = eco.Sequential([lambda_(_increment) for _ in range(size)])
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert chain(0) == size
+        best = min(best, time.perf_counter() - start)
+    return size / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    dict_classes = dict(atomic=DictAtomic, lambda_=DictLambda, wrapper=DictWrapper)
+    print(f'{"tools":>8} {"layout":>8} {"bytes/node":>11} {"calls/s":>12} {"sequential calls/s":>19}')
+    for size in args.sizes:
+        for layout, classes in (('slots', dict()), ('dict', dict_classes)):
+            memory = memory_per_node(size, **classes)
+            calls = calls_per_second(size, **classes)
+            sequential = sequential_calls_per_second(size, lambda_=classes.get('lambda_', eco.Lambda))
+            print(f'{size:>8} {layout:>8} {memory:>11.1f} {calls:>12,.0f} {sequential:>19,.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -170,9 +170,1063 @@ def tool_dict_test():
     assert c(0) == [0, 0, 0]
 
 
+def tool_slots_test():
+    import epta.core.base_ops as eco
+
+    lambda_tool = eco.Lambda(lambda x: x + 1)
+    assert not hasattr(lambda_tool, '__dict__') and lambda_tool(1) == 2
+    try:
+        lambda_tool.extra = 1
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError('slotted tools do not take new attributes')
+
+    class Tagged(eco.Lambda):  # no __slots__: attributes can be added again
+        pass
+
+    tagged = Tagged(lambda x: x * 2)
+    tagged.extra = 1
+    assert tagged.extra == 1 and tagged(2) == 4
+    tagged.use = lambda x: x  # an instance use is honoured with a __dict__
+    assert tagged(2) == 2
+    assert all('__dict__' not in vars(cls) for cls in (eco.Max, eco.Min, eco.Mean))
+    assert eco.Max([eco.Identity(), eco.Lambda(lambda x: x + 1)])(1) == 2
+
+    # slotted operations can still be combined with each other and with dict-based ones
+    from epta.core.position_dependent import PositionDependent
+
+    class VariablePosition(eco.Variable, PositionDependent):
+        pass
+
+    class VariableAtomic(eco.Variable, eco.Atomic):
+        def __init__(self, tool, key):
+            eco.Atomic.__init__(self, key)
+            self.tool = tool
+
+        def use(self, data, **kwargs):
+            return self.tool(data[self.key])
+
+    class WrapperVariable(eco.Wrapper, eco.Variable):
+        def __init__(self, tool):
+            eco.Tool.__init__(self, name='WrapperVariable')
+            self.tool = tool
+
+    class LambdaSequential(eco.Lambda, eco.Sequential):
+        pass
+
+    class ParallelAtomic(eco.Parallel, eco.Atomic):
+        pass
+
+    assert 'tool' not in vars(VariablePosition)
+    assert VariableAtomic(eco.Lambda(lambda x: x * 3), 'a')({'a': 2}) == 6
+    assert WrapperVariable(5)(1) == 5
+    assert LambdaSequential(lambda x: x - 1)(1) == 0
+    assert ParallelAtomic(eco.Identity(), key=0)([1, 2]) == [1, 2]
+    assert all('__dict__' not in vars(cls) for cls in (eco.Sum, eco.Product, eco.Concatenate))
+    assert eco.Sum([eco.Identity(), eco.Identity()])(2) == 4
+
+
+def control_flow_test():
+    import epta.core as ec
+    import epta.core.base_ops as eco
+
+    calls = list()
+
+    def expensive(x):
+        calls.append(x)
+        return x * 10
+
+    switch = eco.Switch(lambda x: x > 0, {True: eco.Lambda(expensive), False: 'negative'})
+    assert switch(1) == 10
+    assert switch(-1) == 'negative'
+    assert calls == [1]
+
+    gate = eco.Gate(lambda x: x % 2 == 0, eco.Lambda(expensive), default=-1)
+    assert gate(2) == 20
+    assert gate(3) == -1
+    assert calls == [1, 2]
+
+    pipeline = eco.Sequential([
+        eco.Gate(lambda x: x is not None, eco.Identity(), default='stopped', stop=True),
+        eco.Lambda(expensive),
+    ])
+    assert pipeline(None) == 'stopped'
+    assert pipeline(3) == 30
+    assert calls == [1, 2, 3]
+
+    lazy = eco.LazyCompose(
+        lambda flag, value: value() if flag() else None,
+        (eco.Lambda(lambda x: x > 5), eco.Lambda(expensive))
+    )
+    assert lazy(1) is None
+    assert lazy(6) == 60
+    assert calls == [1, 2, 3, 6]
+
+    # in fan-outs a break ends its own branch only
+    def branch():
+        return eco.Sequential([eco.Gate(lambda x: x > 0, eco.Identity(), default='stopped', stop=True),
+                               eco.Lambda(lambda x: x + 1)])
+
+    stopping = eco.Gate(lambda x: x > 0, eco.Identity(), default='bare', stop=True)
+    for threaded in (False, True):
+        fan_out = eco.Concatenate([branch(), stopping, eco.Identity()], threaded=threaded)
+        assert fan_out(-1) == ['stopped', 'bare', -1] and fan_out(1) == [2, 1, 1]
+        keyed = ec.ToolDict({'branch': branch(), 'stopping': stopping}, threaded=threaded)
+        assert keyed(-1) == {'branch': 'stopped', 'stopping': 'bare'}
+        listed = ec.ToolDict({'stopping': stopping}, use_behaviour='concatenate', threaded=threaded)
+        assert listed(-1) == ['bare']
+    outer = eco.Sequential([eco.Concatenate([stopping]), eco.Lambda(lambda x: x + ['next'])])
+    assert outer(-1) == ['bare', 'next']  # the enclosing sequential goes on
+
+
+def deadline_test():
+    import time
+    import epta.core.base_ops as eco
+    from epta.core.deadline import Deadline, Budgeted
+
+    def slow(x):
+        time.sleep(0.02)
+        return x + 1
+
+    slow_tool = Budgeted(eco.Lambda(slow, name='slow'), budget=0.001)
+    cheap_tool = Budgeted(eco.Lambda(lambda x: x + 2, name='slow_2'), fallback=eco.Lambda(lambda x: -x))
+    pipeline = Deadline(eco.Concatenate([slow_tool, cheap_tool]), budget=0.01)
+
+    assert pipeline(1) == [2, -1]  # slow tool used all the time
+    assert pipeline.report.missed == ['slow']
+    assert pipeline.report.skipped == ['slow_2']
+
+    pipeline.budget = 0.0
+    assert pipeline(5) == [2, -5]  # last result of the slow tool
+    assert pipeline.skipped == {'slow': 1, 'slow_2': 2}
+    assert pipeline.missed == {'slow': 1}
+
+
+def host_test():
+    import time
+    import epta.core.base_ops as eco
+    from epta.core import Tool
+    from epta.runtime import PipelineHost
+
+    class Counter(Tool):
+        def __init__(self, **kwargs):
+            super(Counter, self).__init__(**kwargs)
+            self.value = 0
+            self.updates = 0
+
+        def use(self, *args, **kwargs):
+            time.sleep(0.001)
+            self.value += 1
+            return self.value
+
+        def update(self, *args, **kwargs):
+            self.updates += 1
+
+    fast, slow, paused = Counter(name='fast'), Counter(name='slow'), Counter(name='paused')
+    host = PipelineHost(workers=2)
+    host.add(fast, priority=1)
+    host.add(slow, rate=20)
+    host.add(paused)
+    host.pause('paused')
+    host.run(0.3)
+
+    stats = host.stats()
+    assert fast.value > slow.value > 0  # slow is not starved by the faster pipeline
+    assert slow.value <= 8
+    assert paused.value == 0
+    assert stats['runs'] == fast.value + slow.value
+
+    host.resume('paused', 'new config')
+    host.run(0.05)
+    assert paused.updates == 1 and paused.value > 0
+
+
+def _remote_tool_factory():
+    import epta.core.base_ops as eco
+
+    def fnc(image, scale=2, **_):
+        if scale is None:
+            raise ValueError('scale is required')
+        return image * scale
+
+    return eco.Lambda(fnc)
+
+
+def _batch_factory(scale: int = 1):
+    import epta.core.base_ops as eco
+
+    return eco.Sequential([
+        eco.Lambda(lambda image: image[..., 0], name='channel'),
+        eco.Lambda(lambda channel: {'mean': float(channel.mean()) * scale}, name='mean'),
+    ], name='batch_pipeline')
+
+
+def _tuner_factory():
+    import time
+    import epta.core.base_ops as eco
+
+    def slow(x):
+        time.sleep(0.004)  # releases the gil like native code
+        return x * 2
+
+    def settings(_):
+        time.sleep(0.003)
+        return 7
+
+    def item(x):
+        time.sleep(0.002)
+        return x + 1
+
+    return eco.Sequential([
+        eco.Concatenate([eco.Lambda(slow, name='a'), eco.Lambda(slow, name='b'), eco.Lambda(settings, name='settings')],
+                        name='fan_out'),
+        eco.Parallel(eco.Lambda(item, name='item'), name='items'),
+        eco.Lambda(sum, name='sum'),
+    ], name='tuned_pipeline')
+
+
+class _TwoArgumentError(Exception):
+    # pickled with its first argument only: unpickling it raises TypeError
+    def __init__(self, value, reason):
+        super(_TwoArgumentError, self).__init__(value)
+        self.reason = reason
+
+
+def remote_test():
+    import os
+    import time
+    import pickle
+    import tempfile
+    import numpy as np
+    import epta.core.base_ops as eco
+    from epta.runtime import RemoteTool, ToolServer
+
+    process, address = ToolServer.spawn(_remote_tool_factory)
+    try:
+        remote = RemoteTool(address, connections=2, timeout=5)
+        image = np.arange(12, dtype=np.uint8).reshape(2, 2, 3)
+        pipeline = eco.Sequential([remote, eco.Lambda(lambda x: x + 1)])
+        assert (pipeline(image) == image * 2 + 1).all()
+        results = remote.map([image, image[..., 0], image[:, ::-1]], scale=3)
+        assert all((r == i * 3).all() for r, i in zip(results, [image, image[..., 0], image[:, ::-1]]))
+        try:
+            remote(image, scale=None)
+            assert False
+        except ValueError:
+            pass
+        remote.close()
+    finally:
+        process.terminate()
+
+    with tempfile.TemporaryDirectory() as path:
+        server = ToolServer(eco.Lambda(lambda x: x + 1), os.path.join(path, 'tool.sock'))
+        server.start()
+        remote = RemoteTool(server.address)
+        assert remote(1) == 2
+        remote.close()
+        server.close()
+
+    # a result that can not be pickled is reported as such, the connection stays usable
+    server = ToolServer(eco.Lambda(lambda x: (lambda: x) if x else x))
+    server.start()
+    remote = RemoteTool(server.address, timeout=5)
+    try:
+        remote(1)
+    except (pickle.PicklingError, AttributeError) as error:
+        assert 'pickle' in str(error)
+    else:
+        raise AssertionError('unpicklable result was returned')
+    assert remote(0) == 0
+    remote.close()
+    server.close()
+
+    # a response that can not be unpickled fails its own request only
+    def answer(x):
+        if x == 'slow':
+            time.sleep(0.3)
+        elif x < 0:
+            raise _TwoArgumentError(x, 'negative')
+        return x
+
+    server = ToolServer(eco.Lambda(answer), concurrent=True)
+    server.start()
+    remote = RemoteTool(server.address, timeout=5)
+    try:
+        remote(-1)
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('unpickling error was not raised')
+    assert remote(2) == 2 and remote.map([3, 4]) == [3, 4]
+
+    remote.timeout = 0.05
+    try:
+        remote('slow')
+    except TimeoutError:
+        pass
+    else:
+        raise AssertionError('slow call did not time out')
+    assert sum(len(connection) for connection in remote._pool) == 0  # timed out request is not kept
+    remote.timeout = 5
+    assert remote(5) == 5
+    remote.close()
+    server.close()
+
+
+def record_test():
+    import os
+    import json
+    import pickle
+    import tempfile
+    import numpy as np
+    import epta.core.base_ops as eco
+    from epta.core import Record, json_default
+    from epta.utils.utils import save_crops
+
+    spread = eco.DataSpread(['image', 'position', 'score'])
+    data = spread((1, (0, 0, 10, 10), 0.5))
+    assert isinstance(data, Record)
+    assert data['image'] == 1 and data.get('missing') is None and 'score' in data
+    assert data == {'image': 1, 'position': (0, 0, 10, 10), 'score': 0.5}
+    assert list(data) == ['image', 'position', 'score']
+    assert type(data) is type(spread((2, 3, 4)))  # schema type is made once
+    assert spread((1, 2)) == {'image': 1, 'position': 2}
+
+    assert eco.DataReduce(['score', 'image'])(data) == (0.5, 1)
+    assert eco.DataReduce('score')(data) == (0.5,)
+    assert eco.DataReduce(['score', 'missing'])(data) == (0.5, None)
+    assert eco.DataReduce(['score', 'image'])(data.to_dict()) == (0.5, 1)
+    assert eco.DataGather(['score', 'missing'])(data) == {'score': 0.5, 'missing': None}
+    assert eco.DataMergeDict()((data, {'extra': 1}))['extra'] == 1
+    assert eco.Atomic('position')(data) == (0, 0, 10, 10)
+    assert pickle.loads(pickle.dumps(data)) == data
+
+    # records are mappings for consumers: saving, copying, serializing
+    crops = eco.DataSpread(['left', 'right'])((np.zeros((4, 4, 3), np.uint8), np.full((4, 4, 3), 255, np.uint8)))
+    with tempfile.TemporaryDirectory() as path:
+        save_crops({'frame': crops}, os.path.join(path, 'crops', ''))
+        assert sorted(os.listdir(os.path.join(path, 'crops'))) == ['frame_left.png', 'frame_right.png']
+    editable = data.to_dict()
+    editable['score'] = 1.0
+    assert data['score'] == 0.5
+    nested = eco.DataSpread(['inner', 'value'])((data, 1))
+    assert json.loads(nested.to_json()) == {'inner': {'image': 1, 'position': [0, 0, 10, 10], 'score': 0.5},
+                                            'value': 1}
+    assert json.loads(json.dumps([data], default=json_default)) == [json.loads(data.to_json())]
+
+
+def frame_test():
+    import os
+    import tempfile
+    import numpy as np
+    import cv2 as cv
+    import epta.tools.hookers.image_hookers as eti
+    from epta.utils.frame import Frame, as_color
+    from epta.utils.utils import save_crops
+
+    bgr = np.zeros((40, 60, 3), dtype=np.uint8)
+    bgr[..., 0] = 255  # blue
+    with tempfile.TemporaryDirectory() as path:
+        image_path = os.path.join(path, 'image.png')
+        cv.imwrite(image_path, bgr)
+
+        rgb = eti.ImreadHooker()(image_path)
+        assert rgb.color == 'RGB' and (rgb[..., 2] == 255).all()
+        native = eti.ImreadHooker(color=None)(image_path)
+        assert native.color == 'BGR' and (native == bgr).all()
+
+        # converting back cancels out, crops are converted alone
+        assert rgb.to('BGR') is rgb._source
+        crop = rgb[10:20, 5:15]
+        assert crop.color == 'RGB'
+        assert np.shares_memory(crop.to('BGR'), rgb._source)
+        assert crop.to('GRAY').shape == (10, 10)
+        assert rgb[..., 0].color is None
+
+        assert (as_color(np.asarray(rgb), 'BGR') == bgr).all()  # untagged arrays are RGB
+        save_crops({'crop': crop}, os.path.join(path, 'crops', ''))
+        assert (cv.imread(os.path.join(path, 'crops', 'crop.png')) == bgr[10:20, 5:15]).all()
+
+    assert Frame(bgr, 'BGR').to('RGB').to('BGR').base is bgr
+
+
+def integral_test():
+    import numpy as np
+    import epta.core as ec
+    import epta.tools.base as eb
+
+    position_manager = ec.ToolDict(tools={
+        'hp': {'x': 10, 'y': 5, 'w': 20, 'h': 8},
+        'map': {'x': 40, 'y': 30},  # up to the border
+    })
+
+    rng = np.random.default_rng(0)
+    image = rng.integers(0, 255, size=(50, 60, 3), dtype=np.uint8)
+    keys = ['hp', 'map', 'missing']
+    integral = eb.Integral(squares=True, thresholds=[128])(image)
+
+    means = eb.RegionStatistics(position_manager, keys, statistic='mean')
+    counts = eb.RegionStatistics(position_manager, keys, statistic='count', threshold=128)
+    variances = eb.RegionStatistics(position_manager, keys, statistic='variance')
+    for tool in (means, counts, variances):
+        tool.update()
+
+    regions = [image[5:13, 10:30], image[30:, 40:]]
+    assert np.allclose(means(integral)[:2], [r.reshape(-1, 3).mean(0) for r in regions])
+    assert np.isnan(means(integral)[2]).all()
+    assert (counts(integral)[:2] == [(r > 128).reshape(-1, 3).sum(0) for r in regions]).all()
+    assert (counts(integral)[2] == 0).all()
+    assert np.allclose(variances(integral)[:2], [r.reshape(-1, 3).var(0) for r in regions])
+
+    gray = image[..., 0]
+    assert np.allclose(eb.IntegralImage(gray).sum([[0, 0, -1, -1]]), gray.sum())
+
+
+def metrics_test():
+    import os
+    import time
+    import tempfile
+    import threading
+    import urllib.request
+    import epta.core.base_ops as eco
+    from epta.core.metrics import MetricsRegistry
+
+    def fail(x):
+        if x < 0:
+            raise ValueError(x)
+        return x
+
+    pipeline = eco.Sequential([eco.Lambda(fail, name='check'), eco.Lambda(lambda x: x + 1, name='add')],
+                              name='pipeline')
+    registry = MetricsRegistry().enable()
+    try:
+        threads = [threading.Thread(target=lambda: [pipeline(i) for i in range(100)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        try:
+            pipeline(-1)
+        except ValueError:
+            pass
+        registry.inc('cache_hits', 3)
+        registry.set('queue_depth', 2)
+    finally:
+        registry.disable()
+    pipeline(1)  # not recorded
+
+    snapshot = registry.snapshot()
+    assert snapshot['tools']['pipeline']['calls'] == 401
+    assert snapshot['tools']['check']['errors'] == 1
+    assert snapshot['tools']['add']['calls'] == 400
+    assert 0 < snapshot['tools']['add']['p50'] <= snapshot['tools']['pipeline']['p99']
+    assert snapshot['counters'] == {'cache_hits': 3} and snapshot['gauges'] == {'queue_depth': 2}
+
+    text = registry.to_prometheus()
+    assert 'epta_tool_calls_total{tool="pipeline"} 401' in text
+    server = registry.serve()
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.server_address[1]}/metrics') as response:
+            assert response.read().decode() == registry.to_prometheus()
+    finally:
+        server.shutdown()
+    with tempfile.TemporaryDirectory() as path:
+        registry.write_textfile(os.path.join(path, 'epta.prom'))
+        assert os.path.exists(os.path.join(path, 'epta.prom'))
+
+    # cache hits and queue depths are reported by the tools and the host
+    from epta.runtime import PipelineHost
+    from epta.tools.recognition import MicroBatch
+
+    registry = MetricsRegistry().enable()
+    try:
+        every = eco.Every(eco.Lambda(lambda x: x, name='slow'), frames=4, name='every')
+        for i in range(8):
+            every(i)
+        with PipelineHost(workers=1, name='host') as host:
+            host.add(eco.Lambda(lambda: time.sleep(0.001), name='job'))
+            time.sleep(0.05)
+        batch = MicroBatch(None, eco.Lambda(lambda x: x * 2), name='batch')
+        batch.tool = eco.Concatenate([batch.slot(), batch.slot(), batch.slot()])
+        assert batch(1) == [2, 2, 2]
+    finally:
+        registry.disable()
+    snapshot = registry.snapshot()
+    assert snapshot['tools']['every']['counters'] == {'cache_hits': 6}
+    assert snapshot['tools']['batch']['counters'] == {'batched_images': 3}
+    assert snapshot['gauges']['micro_batch_queue_depth{tool="batch"}'] == 3
+    assert 'host_running{host="host"}' in snapshot['gauges']
+
+    text = registry.to_prometheus()
+    assert 'epta_tool_cache_hits_total{tool="every"} 6' in text
+    assert 'epta_host_queue_depth{host="host"}' in text
+    families = list()
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            families.append(line.split()[2])
+        else:  # samples follow the TYPE line of their own family, families are not repeated
+            assert line.split('{')[0].split()[0].startswith(families[-1]), line
+    assert len(families) == len(set(families))
+
+
+def rate_divider_test():
+    import time
+    import epta.core.base_ops as eco
+
+    calls = list()
+    counter = eco.Lambda(lambda x: calls.append(x) or len(calls))
+
+    every = eco.Every(counter, frames=3)
+    assert [every(i) for i in range(7)] == [1, 1, 1, 2, 2, 2, 3]
+    assert calls == [0, 3, 6]
+    assert (every.executions, every.reuses) == (3, 4)
+
+    calls.clear()
+    shifted = eco.Every(counter, frames=3, phase=1)
+    assert [shifted(i) for i in range(9)] == [1, 1, 1, 1, 2, 2, 2, 3, 3]  # first call always runs
+    assert calls == [0, 4, 7]  # phase delays the first scheduled use only
+    shifted.update()
+    assert shifted(9) == 4
+
+    # uses are one period apart, whatever the phase
+    for frames, phase in ((4, 0), (4, 2), (3, 5)):
+        calls.clear()
+        spread = eco.Every(counter, frames=frames, phase=phase)
+        for i in range(40):
+            spread(i)
+        gaps = [b - a for a, b in zip(calls, calls[1:])]
+        assert gaps[0] == frames + phase and all(gap == frames for gap in gaps[1:]), (frames, phase, calls)
+
+    calls.clear()
+    throttle = eco.Throttle(counter, interval=0.05)
+    assert throttle(0) == throttle(1) == 1
+    time.sleep(0.06)
+    assert throttle(2) == 2
+    assert (throttle.executions, throttle.reuses) == (2, 1)
+
+    # at most once per interval: spacing between uses, not a count per clock slot
+    starts = list()
+    timed = eco.Throttle(eco.Lambda(lambda: starts.append(time.perf_counter())), interval=0.03, phase=0.02)
+    end = time.perf_counter() + 0.4
+    while time.perf_counter() < end:
+        timed()
+        time.sleep(0.002)
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert len(starts) >= 5 and gaps[0] >= 0.05 and min(gaps) >= 0.03, gaps
+
+
+def batch_recognition_test():
+    import numpy as np
+    import epta.core as ec
+    import epta.core.base_ops as eco
+    import epta.tools.recognition as etr
+
+    class MeanRecogniser(etr.Recogniser):
+        def __init__(self, **kwargs):
+            super(MeanRecogniser, self).__init__(**kwargs)
+            self.batches = list()
+
+        def image_to_data(self, image, **kwargs):
+            return float(image.mean())
+
+        def image_to_data_batch(self, images, **kwargs):
+            self.batches.append(len(images))
+            return [float(m) for m in np.stack(images).reshape(len(images), -1).mean(1)]
+
+    recogniser = MeanRecogniser()
+    image = np.arange(16, dtype=np.float32).reshape(4, 4)
+    assert recogniser.use_batch(np.stack([image, image * 2])) == [7.5, 15.0]
+    assert etr.Recogniser.image_to_data_batch(recogniser, [image]) == [7.5]
+
+    batch = etr.MicroBatch(None, recogniser, max_batch=2)
+    batch.tool = eco.Sequential([
+        eco.Concatenate([
+            eco.Sequential([eco.Lambda(lambda x: x[:2, :2]), batch.slot()]),
+            eco.Sequential([eco.Lambda(lambda x: x[2:, 2:]), batch.slot()]),
+            ec.ToolDict({'bottom': eco.Sequential([eco.Lambda(lambda x: x[2:, :2]), batch.slot()])}),
+        ]),
+        eco.DataSpread(['top', 'right', 'rest']),
+    ])
+    result = batch(image)
+    assert result == {'top': 2.5, 'right': 12.5, 'rest': {'bottom': 10.5}}
+    assert recogniser.batches == [2, 2, 1]
+    assert batch.slot()(image) == 7.5  # outside of the micro batch
+
+
+def video_hooker_test():
+    import os
+    import tempfile
+    import numpy as np
+    import cv2 as cv
+    import epta.tools.hookers.image_hookers as eti
+
+    with tempfile.TemporaryDirectory() as path:
+        video_path = os.path.join(path, 'video.avi')
+        writer = cv.VideoWriter(video_path, cv.VideoWriter_fourcc(*'MJPG'), 10, (32, 24))
+        for i in range(20):
+            writer.write(np.full((24, 32, 3), i * 10, dtype=np.uint8))
+        writer.release()
+
+        hooker = eti.VideoFileHooker(video_path, stride=3, queue_size=2)
+        frames = list(hooker)
+        assert [f['index'] for f in frames] == list(range(0, 20, 3))
+        assert np.allclose([f['timestamp'] for f in frames], np.arange(0, 20, 3) / 10)
+        assert all(abs(float(f['image'].mean()) - f['index'] * 10) < 3 for f in frames)
+        assert frames[0]['image'].color == 'RGB' and frames[0]['image'].shape == (24, 32, 3)
+        assert hooker() is None
+
+        hooker.seek(10)
+        assert hooker()['index'] == 10
+        hooker.close()
+
+        seeking = eti.VideoFileHooker(video_path, stride=5, seek_stride=2, start=1, stop=15)
+        assert [f['index'] for f in seeking] == [1, 6, 11]
+
+        parts = eti.VideoFileHooker.split(video_path, 3, stride=2)
+        indices = [f['index'] for start, stop in parts
+                   for f in eti.VideoFileHooker(video_path, stride=2, start=start, stop=stop)]
+        assert indices == list(range(0, 20, 2))
+
+        failing = eti.VideoFileHooker(video_path, color='FOO')  # the decoder fails on the first frame
+        for _ in range(2):
+            try:
+                failing()
+            except Exception as error:
+                assert not isinstance(error, RuntimeError) or 'decoder' not in str(error)
+            else:
+                raise AssertionError('decoder error was not raised')
+        failing.close()
+
+
+def sink_test():
+    import os
+    import time
+    import tempfile
+    import numpy as np
+    import epta.core.base_ops as eco
+    import epta.tools.sinks as ets
+
+    with tempfile.TemporaryDirectory() as path:
+        pipeline = eco.Sequential([
+            eco.Lambda(lambda i: (i, np.float32(i / 2), [i, i])),
+            eco.DataSpread(['frame', 'score', 'position']),
+            ets.BufferedSink(path, max_rows=4, rotate_rows=6, max_interval=None),
+        ])
+        for i in range(10):
+            assert pipeline(i)['frame'] == i
+        sink = pipeline.tools[-1]
+        sink.write({'frame': 10, 'extra': 'x'})
+        sink.close()
+        assert len(sink._files()) == 2 and sink.rows == 11
+        rows = list(ets.iter_rows(path))
+        assert rows[3] == {'frame': 3, 'score': 1.5, 'position': [3, 3]}
+        assert rows[10] == {'frame': 10, 'score': None, 'position': None, 'extra': 'x'}
+        assert sum(len(chunk['frame']) for chunk in ets.iter_chunks(path)) == 11
+        for call in (lambda: sink.write({'frame': 11}), sink.flush):
+            try:
+                call()
+            except ValueError:
+                pass
+            else:
+                raise AssertionError('closed sink')
+
+        os.remove(sink._files()[0])  # chunks continue after the last one left
+        with ets.BufferedSink(path) as sink:
+            sink.write({'frame': 11})
+        assert [os.path.basename(file) for file in sink._files()] == ['sink-00001.jsonl', 'sink-00002.jsonl']
+
+    with tempfile.TemporaryDirectory() as path:
+        with ets.BufferedSink(path, format='npz', keys=['frame', 'mask'], max_rows=100, max_interval=0.01) as sink:
+            sink((0, np.zeros((2, 2), dtype=bool)))
+            time.sleep(0.1)  # flushed on time
+            assert sink.flushes == 1
+            sink((1, np.ones((2, 2), dtype=bool)))
+        chunks = list(ets.iter_chunks(path))
+        assert len(chunks) == 2 and chunks[1]['mask'].shape == (1, 2, 2)
+        assert [row['frame'] for row in ets.iter_rows(path)] == [0, 1]
+
+
+def reduction_test():
+    import numpy as np
+    import epta.core.base_ops as eco
+
+    assert eco.Sum([eco.Lambda(lambda x: x), eco.Lambda(lambda x: x * 2)])(3) == 9
+    assert eco.Product([eco.Lambda(lambda x: x), eco.Lambda(lambda x: x * 2)])(3) == 18
+    assert eco.Sum()([]) == 0 and eco.Max()([]) is None and eco.LogicalAnd()([]) is True
+    assert eco.Sum()(5) == 0 and eco.Product()(5) == 1 and eco.Max()(5) is None  # nothing to reduce
+
+    images = [np.full((2, 2), i, dtype=np.uint8) for i in (1, 5, 3)]
+    first = images[0].copy()
+    heatmap = eco.Sum([eco.Lambda(lambda x, i=i: x[i]) for i in range(3)])(images)
+    assert (heatmap == 9).all() and heatmap.dtype == np.uint8
+    assert (images[0] == first).all()  # inputs are not modified in place
+
+    stream = eco.Parallel(eco.Lambda(lambda x: x * 2), lazy=True)
+    assert (eco.Sequential([stream, eco.Max()])(images) == 10).all()
+    assert (eco.Sequential([stream, eco.Min()])(images) == 2).all()
+    mean = eco.Sequential([stream, eco.Mean()])(images)
+    assert mean.dtype == np.float64 and np.allclose(mean, 6)
+    assert eco.Mean()([1, 2, 3, 4]) == 2.5
+    assert eco.Sum()([np.ones(2, dtype=np.uint8), 0.5]).dtype == np.float64
+
+    masks = [np.array([True, False, False]), np.array([False, False, True]), np.array([1, 0, 1])]
+    assert (eco.LogicalOr()(masks) == [True, False, True]).all()
+    assert (eco.LogicalAnd()(masks) == [False, False, False]).all()
+    assert eco.LogicalOr()([0, 0, 2]) is True
+
+
+def memory_test():
+    import epta.core as ec
+    import epta.core.base_ops as eco
+    import numpy as np
+    import tracemalloc
+
+    frame = np.zeros((256, 256, 3), dtype=np.uint8)
+    crop = eco.Lambda(lambda image: image[:16, :16], name='crop')
+    every = eco.Every(crop, frames=4, name='every_crop')
+    pipeline = eco.Sequential([eco.Lambda(lambda image: image, name='source'), every], name='memory_pipeline')
+
+    accountant = ec.memory.MemoryAccountant(budget=4096).track(pipeline)
+    assert list(accountant.tracked.values()) == [every]
+    accountant.enable(trace=True)
+    try:
+        result = pipeline(frame)
+        assert accountant.snapshot(limit=3)
+    finally:
+        accountant.disable()
+        tracemalloc.stop()
+
+    stats = accountant.report()['tools']
+    assert stats['crop']['last_bytes'] == 16 * 16 * 3 and stats['crop']['views'] == 1
+    assert stats['source']['views'] == 0
+    assert result.base is not None and every.last_result.base is None  # compacted, result untouched
+    assert accountant.actions == [('every_crop', 'compact', frame.nbytes)]
+    assert accountant.retained()['every_crop'] == 16 * 16 * 3
+
+    accountant.budget = 16
+    assert accountant.enforce(every) == 'evict' and every.last_result is None
+
+
+def grab_coordinator_test():
+    import numpy as np
+    import epta.core as ec
+    import epta.tools.hookers.image_hookers as eti
+
+    position_manager = ec.ToolDict(tools={
+        'hp': {'x': 10, 'y': 5, 'w': 20, 'h': 8},
+        'mana': {'x': 12, 'y': 15, 'w': 20, 'h': 8},
+        'minimap': {'x': 300, 'y': 200, 'w': 40, 'h': 40},
+    })
+    screen = np.random.default_rng(0).integers(0, 255, size=(240, 360, 4), dtype=np.uint8)
+    backend = eti.SyntheticBackend(lambda grab: screen + np.uint8(grab))
+
+    coordinator = eti.GrabCoordinator(backend=backend, color='BGRA')
+    hookers = [eti.MssScreenHooker(position_manager=position_manager, key=key, color='BGRA', coordinator=coordinator)
+               for key in ('hp', 'mana', 'minimap')]
+    for hooker in hookers:
+        hooker.update()
+    coordinator.update()
+    assert coordinator.boxes == [(10, 5, 340, 240)]
+
+    regions = [hooker() for hooker in hookers]
+    assert backend.grabs == 1
+    assert (regions[0] == screen[5:13, 10:30]).all() and (regions[2] == screen[200:, 300:340]).all()
+    assert all(region.base is not None for region in regions)  # views of the shared grab
+    assert (hookers[1]() == screen[15:23, 12:32] + 1).all()  # asked again: next tick
+    assert backend.grabs == 2
+
+    coordinator.max_waste = 2.0
+    coordinator.update()
+    assert sorted(coordinator.boxes) == [(10, 5, 32, 23), (300, 200, 340, 240)]
+    coordinator()
+    assert (hookers[2]() == screen[200:, 300:340] + 2).all() and backend.grabs == 4
+
+    # colors are converted by the coordinator only: a hooker without color gets the raw BGRA grab
+    coordinator = eti.GrabCoordinator(backend=eti.SyntheticBackend(screen), color='RGB')
+    raw = eti.MssScreenHooker(position_manager=position_manager, key='hp', color=None, coordinator=coordinator)
+    rgb = eti.MssScreenHooker(position_manager=position_manager, key='hp', color='RGB', coordinator=coordinator)
+    full = eti.MssScreenHooker(position_manager=position_manager, key='hp', color=None, coordinator=coordinator)
+    raw.update()
+    rgb.update()
+    coordinator.register(full)  # not updated: no position, the whole screen
+    coordinator()
+    assert raw().color == 'BGRA' and (raw() == screen[5:13, 10:30]).all()
+    assert rgb().color == 'RGB' and (rgb() == screen[5:13, 10:30][..., 2::-1]).all()
+    assert full().shape == screen.shape and (full() == screen).all()
+
+
+def pyramid_test():
+    import numpy as np
+    import cv2 as cv
+    import epta.core as ec
+    import epta.tools.base as eb
+    from epta.utils.frame import Frame
+
+    position_manager = ec.ToolDict(tools={'hp': {'x': 10, 'y': 6, 'w': 21, 'h': 9}})
+    image = Frame(np.random.default_rng(0).integers(0, 255, size=(101, 57, 3), dtype=np.uint8), 'BGR')
+    pyramid = eb.Pyramid(levels=(2,), buffers=2)
+
+    levels = pyramid(image)
+    assert levels.built == 0 and levels[0] is image
+    quarter = levels[2]
+    assert levels.built == 2 and levels[2] is quarter and quarter.color == 'BGR'
+    assert (quarter == cv.pyrDown(cv.pyrDown(image.view(np.ndarray)))).all()
+    try:
+        levels[3]
+        assert False
+    except KeyError:
+        pass
+
+    buffer = quarter.base
+    pyramid(image)[2]
+    assert pyramid(image)[2].base is buffer  # ring of 2 frames reuses buffers
+
+    cropper = eb.PyramidCropper(position_manager=position_manager, key='hp', level=1)
+    cropper.update()
+    assert cropper.level_position == (5, 3, 16, 8)
+    frame = pyramid(image)
+    assert (cropper(frame) == frame[1][3:8, 5:16]).all()
+    assert (cropper(image) == image[6:15, 10:31]).all()
+
+
+def copy_on_write_test():
+    import sys
+    import threading
+    import epta.core as ec
+    import epta.core.base_ops as eco
+    import epta.tools.base as eb
+
+    keys = [f'region_{i}' for i in range(32)]
+    manager = ec.ToolDict({key: {'x': 0, 'y': 0} for key in keys}, copy_on_write=True)
+    first = manager.snapshot()
+    manager['extra'] = {'x': 1}
+    assert 'extra' not in first and manager.version == first.version + 1
+
+    with manager.batch() as table:
+        del table['extra']
+        assert 'extra' in manager  # not published yet
+    assert 'extra' not in manager and manager.version == first.version + 2
+
+    stop = threading.Event()
+    torn = list()
+
+    def read():
+        version = 0
+        while not stop.is_set():
+            snapshot = manager.snapshot()
+            values = {snapshot[key]['x'] for key in keys}
+            if len(values) != 1 or snapshot.version < version:
+                torn.append((snapshot.version, values))
+            version = snapshot.version
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for i in range(1, 300):
+        with manager.batch() as table:
+            for key in keys:
+                table[key] = {'x': i, 'y': i}
+    stop.set()
+    for reader in readers:
+        reader.join()
+    assert not torn
+
+    scale = eco.Wrapper(1)
+    mapper = ec.ToolDict({'hp': eco.Lambda(lambda: {'x': 10 * scale.tool, 'y': 5})})
+    wrapper = eb.PositionMapperWrapper(mapper)
+    wrapper.update()
+    before = wrapper.snapshot()
+    scale.tool = 2
+    wrapper.update()
+    assert before['hp']['x'] == 10 and wrapper['hp']['x'] == 20 and wrapper.version == before.version + 1
+
+    plain = ec.ToolDict({'a': 1})
+    plain['b'] = 2
+    plain.pop('a')
+    plain.clear()
+    assert plain.version == 3 and not plain.snapshot()
+
+    # positions of a key are read at once: x and y always come from the same update
+    step = eco.Wrapper(0)
+    coordinates = eb.ToolWrapper(ec.ToolDict({key: eco.Lambda(lambda: step.tool) for key in 'xywh'}))
+    region = ec.PositionDependent(ec.ToolDict({'hp': coordinates}), key='hp')
+    stop.clear()
+    torn.clear()
+
+    def read_position():
+        while not stop.is_set():
+            x, y, x_end, y_end = region.make_single_position()
+            if x != y or (x and x_end != 2 * x):
+                torn.append((x, y, x_end, y_end))
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often enough to interleave with the reads
+    try:
+        readers = [threading.Thread(target=read_position) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(1, 2000):
+            step.tool = i
+            coordinates()
+        stop.set()
+        for reader in readers:
+            reader.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not torn
+
+
+def batch_test():
+    import os
+    import io
+    import tempfile
+    import contextlib
+    import numpy as np
+    import cv2 as cv
+    from epta.main import main
+    from epta.core import metrics
+    from epta.runtime import BatchRunner, FrameSource, open_source, iter_results
+
+    with tempfile.TemporaryDirectory() as directory:
+        images = os.path.join(directory, 'images')
+        output = os.path.join(directory, 'output')
+        os.makedirs(images)
+        for i in range(10):
+            cv.imwrite(os.path.join(images, f'{i:02d}.png'), np.full((8, 8, 3), i, dtype=np.uint8))
+
+        source = open_source(images)
+        assert len(source) == 10 and source.ranges(3) == [(0, 3), (3, 7), (7, 10)]
+
+        # interrupted run: 2 frames per shard, then resume in worker processes
+        runner = BatchRunner(_batch_factory, source, output, workers=2, factory_kwargs={'scale': 2},
+                             checkpoint_every=1, max_frames=2)
+        result = runner.run()
+        assert sum(shard['frames'] for shard in result['shards']) == 4
+        with open(os.path.join(output, 'shard000-00099.jsonl'), 'w') as f:
+            f.write('{"index": 1}\n')  # written after the last checkpoint: dropped on resume
+        runner.max_frames = None
+        result = runner.run()
+        assert sum(shard['frames'] for shard in result['shards']) == 6
+        assert all(shard['done'] for shard in result['shards'])
+        rows = list(iter_results(output))
+        assert [row['index'] for row in rows] == list(range(10))
+        assert [row['mean'] for row in rows] == [2.0 * i for i in range(10)]
+        assert 'mean' in runner.report(result)
+
+        stdout = io.StringIO()
+        registry = metrics.registry.enable()  # metrics of the embedding code survive in-process runs
+        try:
+            registry.inc('host_counter')
+            with contextlib.redirect_stdout(stdout):
+                assert main(['sanity_tests:_batch_factory', images, output, '--workers', '2']) == 0  # all done
+                assert main(['sanity_tests:_batch_factory', images, output, '--restart', '--format', 'npz']) == 0
+            assert registry.enabled and registry.snapshot()['counters'] == {'host_counter': 1}
+        finally:
+            registry.disable()
+            registry.reset()
+        assert 'frames: 10' in stdout.getvalue()
+        assert len(list(iter_results(output))) == 10
+
+    try:
+        FrameSource()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('FrameSource is abstract')
+
+
+def load_test():
+    import time
+    import epta.core.base_ops as eco
+    from epta.runtime import LoadGenerator
+
+    def factory():
+        def work(frame):
+            time.sleep(0.01)  # releases the gil like native code
+            return frame.mean()
+
+        return eco.Lambda(work)
+
+    generator = LoadGenerator(factory, streams=(1, 2, 4, 16), rates=(20.0,), duration=0.5, warmup=0.1,
+                              latency_target=0.05, max_drop_ratio=0.2, workers=2,
+                              hooker_kwargs={'shape': (16, 16, 3)})
+    result = generator.run()[20.0]
+    steps = {step['streams']: step for step in result['steps']}
+    assert steps[1]['ok'] and 15 < steps[1]['fps'] < 25 and steps[1]['p50'] >= 0.01
+    assert result['knee'] is steps[16] and result['capacity'] == 4  # 2 workers serve ~200 fps of 10 ms work
+    assert steps[16]['dropped'] > 0
+    assert steps[16]['p50'] > 2 * steps[4]['p50']  # frames wait for a worker past their due time
+    assert steps[4]['errors'] == 0
+    assert 'knee' in generator.report({20.0: result})
+
+    # the knee is found on latency alone as well
+    generator.max_drop_ratio = 1.0
+    step = generator.run_step(32, 20.0)
+    assert not step['ok'] and step['p95'] > 0.05
+
+
+def tuner_test():
+    import os
+    import tempfile
+    import epta.core as ec
+    import epta.core.base_ops as eco
+    from epta.core.deadline import Deadline, current_deadline
+    from epta.runtime import AutoTuner, Tuning
+
+    samples = list(range(8))
+    tuner = AutoTuner(_tuner_factory, samples, min_cost=1e-3, cache_frames=4, batch_sizes=(1, 3))
+    tuning = tuner.tune()
+    nodes = {node['name']: node for node in tuning.nodes.values()}
+    assert nodes['fan_out']['threaded'] is True
+    assert nodes['items']['batch_size'] in (1, 3)
+    assert nodes['settings']['cache_frames'] == 4 and 'a' not in nodes and 'b' not in nodes
+    assert tuning.profile['.tools[0]']['name'] == 'fan_out'
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tuning.json')
+        tuning.save(path)
+        loaded = Tuning.load(path)
+    pipeline = _tuner_factory()
+    assert loaded.apply(pipeline) == []
+    fan_out = pipeline.tools[0]
+    assert fan_out.threaded and isinstance(fan_out.tools[2], eco.Every) and fan_out.tools[2].name == 'settings'
+    assert [pipeline(x) for x in samples] == [_tuner_factory()(x) for x in samples]
+
+    # threaded fan-outs see the caller context
+    check = eco.Lambda(lambda _: current_deadline() is not None)
+    assert Deadline(eco.Concatenate([check, check, check], threaded=True), budget=1.0)(0) == [True] * 3
+    assert ec.ToolDict({'x': check, 'y': eco.Lambda(lambda x: x + 1)}, threaded=True)(1) == {'x': False, 'y': 2}
+
+    # stale entries are skipped
+    assert Tuning({'.tools[5]': {'type': 'Concatenate', 'name': 'gone', 'threaded': True}}).apply(pipeline) \
+        == ['.tools[5]']
+
+
 if __name__ == '__main__':
     mapper_test()
     hooker_test()
     cropper_test()
     render_test()
     tool_dict_test()
+    tool_slots_test()
+    control_flow_test()
+    deadline_test()
+    host_test()
+    remote_test()
+    record_test()
+    frame_test()
+    integral_test()
+    metrics_test()
+    rate_divider_test()
+    batch_recognition_test()
+    video_hooker_test()
+    sink_test()
+    reduction_test()
+    memory_test()
+    grab_coordinator_test()
+    pyramid_test()
+    copy_on_write_test()
+    batch_test()
+    load_test()
+    tuner_test()